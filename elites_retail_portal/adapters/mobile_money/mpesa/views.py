@@ -2,7 +2,6 @@
 
 import json
 import logging
-import requests
 
 from django.http import HttpResponse
 
@@ -13,11 +12,10 @@ from rest_framework.decorators import authentication_classes, permission_classes
 
 from . import serializers
 from django.conf import settings
-from elites_retail_portal.transactions.helpers.payments.gateways import MpesaGateWay
+from elites_retail_portal.transactions.helpers.payments.gateways import (
+    MPESA_REGISTER_URL_PATH, MpesaGateWay)
 from .models import MpesaAuthorization
 
-mpesa_gateway = MpesaGateWay()
-
 
 @authentication_classes([])
 @permission_classes((AllowAny,))
@@ -39,7 +37,7 @@ class MpesaCheckout(APIView):
         serializer = self.serializer(data=request.data)
         if serializer.is_valid(raise_exception=True):
             payload = {"data": serializer.validated_data, "request": request}
-            res = mpesa_gateway.stk_push_request(payload)
+            res = MpesaGateWay().stk_push_request(payload)
             return Response(res, status=200)
 
 
@@ -54,8 +52,9 @@ class MpesaRegister(APIView):
 
     def post(self, request, *args, **kwargs):
         """."""
-        api_url = "https://sandbox.safaricom.co.ke/mpesa/c2b/v1/registerurl"
-        headers = {"Authorization": f"Bearer {mpesa_gateway.get_access_token()}"}
+        mpesa_gateway = MpesaGateWay()
+        api_url = mpesa_gateway.api_url + MPESA_REGISTER_URL_PATH
+        headers = mpesa_gateway.headers
         options = {
             "ShortCode": '600426',
             "ResponseType": "Completed",
@@ -63,9 +62,12 @@ class MpesaRegister(APIView):
             "ValidationURL": f"{settings.NGROK_BASE_URL}/v1/adapters/mobile_money/safaricom/c2b/validation/",   # noqa
         }
         try:
-            response = requests.post(api_url, json=options, headers=headers)
+            response = mpesa_gateway.session.post(
+                api_url, json=options, headers=headers, timeout=mpesa_gateway.timeout)
         except Exception:
-            response = requests.post(api_url, json=options, headers=headers, verify=False)
+            response = mpesa_gateway.session.post(
+                api_url, json=options, headers=headers, timeout=mpesa_gateway.timeout,
+                verify=False)
 
         return HttpResponse(response.text)
 
@@ -83,7 +85,7 @@ class MpesaCallBack(APIView):
         """."""
         logging.info("{}".format("Callback from MPESA"))
         data = request.body
-        return mpesa_gateway.callback_handler(json.loads(data))
+        return MpesaGateWay().callback_handler(json.loads(data))
 
 
 @authentication_classes([])
@@ -101,7 +103,7 @@ class MpesaValidation(APIView):
 
     def post(self, request):
         """."""
-        return mpesa_gateway.validation(request)
+        return MpesaGateWay().validation(request)
 
 
 @authentication_classes([])
@@ -0,0 +1,91 @@
+"""Catalog cache file."""
+
+import uuid
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from rest_framework.response import Response
+
+CATALOG_CACHE_VERSION_KEY = 'catalog_cache_version:{}'
+CATALOG_RESPONSE_CACHE_KEY = 'catalog_response:{}:{}:{}'
+
+
+def get_catalog_cache_version(enterprise_code):
+    """Get the version the enterprise's catalog responses are cached under."""
+    version_key = CATALOG_CACHE_VERSION_KEY.format(enterprise_code)
+    version = cache.get(version_key)
+    if version is None:
+        cache.add(version_key, uuid.uuid4().hex, None)
+        version = cache.get(version_key)
+
+    return version
+
+
+def invalidate_catalog_cache(enterprise_code):
+    """Drop the cached catalog responses of the enterprise.
+
+    The version is changed again once the transaction commits, since a concurrent request
+    could have cached a response as it was before the change was committed.
+    """
+    version_key = CATALOG_CACHE_VERSION_KEY.format(enterprise_code)
+    cache.set(version_key, uuid.uuid4().hex, None)
+    transaction.on_commit(lambda: cache.set(version_key, uuid.uuid4().hex, None))
+
+
+def get_catalog_response_cache_key(request, view):
+    """Get the key a catalog response is cached under.
+
+    The key is made of the user's enterprise, the enterprise's catalog version and the
+    view, action, record and query parameters of the request.
+    """
+    enterprise_code = request.user.enterprise
+    request_data = [
+        request.get_host(), request.path, view.basename, view.action,
+        sorted(view.kwargs.items()), sorted(request.query_params.lists())]
+    request_key = hashlib.sha256(str(request_data).encode()).hexdigest()
+
+    return CATALOG_RESPONSE_CACHE_KEY.format(
+        enterprise_code, get_catalog_cache_version(enterprise_code), request_key)
+
+
+class CatalogCacheMixin(object):
+    """Cache the list and retrieve responses of a catalog viewset.
+
+    The responses are cached per enterprise until a record they are read from changes.
+    Responses read inside a transaction are not cached since the transaction could be
+    rolled back.
+    """
+
+    def list(self, request, *args, **kwargs):
+        """List the records from the cache."""
+        return self.get_cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        """Retrieve the record from the cache."""
+        return self.get_cached_response(super().retrieve, request, *args, **kwargs)
+
+    def upsert_rows(self, rows):
+        """Drop the cached catalog responses of the records bulk_upsert wrote.
+
+        The records are written without their save signals, which drop them otherwise.
+        """
+        records, errors = super().upsert_rows(rows)
+        for enterprise_code in {record.enterprise for record in records}:
+            invalidate_catalog_cache(enterprise_code)
+
+        return records, errors
+
+    def get_cached_response(self, action, request, *args, **kwargs):
+        """Get the cached response of the request or cache the action's response."""
+        cache_key = get_catalog_response_cache_key(request, self)
+        data = cache.get(cache_key)
+        if data is not None:
+            return Response(data)
+
+        response = action(request, *args, **kwargs)
+        if response.status_code == 200 and not connection.in_atomic_block:
+            cache.set(cache_key, response.data, settings.CATALOG_CACHE_TIMEOUT)
+
+        return response
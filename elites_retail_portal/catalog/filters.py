@@ -1,11 +1,9 @@
 """Catalog filters file."""
 
-from django.db.models import Q
 from rest_framework import filters
 
 from elites_retail_portal.common.filters import SearchComboboxBaseFilter
 from elites_retail_portal.catalog import models
-from elites_retail_portal.items.models import Product
 
 
 class SectionFilter(SearchComboboxBaseFilter):
@@ -58,27 +56,17 @@ class CatalogItemAuditLogFilter(SearchComboboxBaseFilter):
         fields = '__all__'
 
 
-class ProductSearchFilter(filters.SearchFilter):
-    """Search Catalog item by Product."""
+class CatalogItemSearchFilter(filters.SearchFilter):
+    """Search catalog items by their indexed search documents.
+
+    The search document holds the item, brand, model, type, category, section, codes
+    and product serial numbers of a catalog item, so a search runs as one query.
+    """
 
     def filter_queryset(self, request, queryset, view):
         """Filter the queryset."""
-        search_fields = getattr(view, 'search_fields', None)
-        if not search_fields:
-            return queryset
-
         search_terms = self.get_search_terms(request)
         if not search_terms:
             return queryset
 
-        search_queries = Q()
-        for term in search_terms:
-            for field in search_fields:
-                search_queries |= Q(**{f"{field}__icontains": term})
-                item_ids = list(map(str, Product.objects.filter(
-                    serial_number__icontains=term).values_list('item__id', flat=True)))
-                if len(item_ids) >= 1:
-                    search_queries |= Q(**{"inventory_item__item__id__in": item_ids})
-
-        queryset = queryset.filter(search_queries).distinct()
-        return queryset
+        return queryset.search(search_terms)
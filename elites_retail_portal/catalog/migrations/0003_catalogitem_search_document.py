@@ -0,0 +1,72 @@
+# Generated by Django 4.1.1 on 2026-10-18 15:00
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+def compose_search_documents(apps, schema_editor):
+    """Compose the search documents of the existing catalog items."""
+    CatalogItem = apps.get_model('catalog', 'CatalogItem')
+    Product = apps.get_model('items', 'Product')
+    catalog_items = CatalogItem.objects.select_related(
+        'section', 'inventory_item__item__item_model__brand',
+        'inventory_item__item__item_model__item_type__category')
+    updated_catalog_items = []
+    for catalog_item in catalog_items.iterator():
+        item = catalog_item.inventory_item.item
+        item_model = item.item_model
+        serial_numbers = Product.objects.filter(item=item).values_list(
+            'serial_number', flat=True)
+        values = [
+            item.item_name, item_model.model_name, item_model.brand.brand_name,
+            item_model.item_type.type_name, item_model.item_type.category.category_name,
+            item.item_code, item.barcode, catalog_item.section.section_name,
+            *serial_numbers]
+        catalog_item.search_document = ' '.join(
+            str(value).lower() for value in values if value)
+        updated_catalog_items.append(catalog_item)
+
+    CatalogItem.objects.bulk_update(
+        updated_catalog_items, ['search_document'], batch_size=500)
+
+
+def create_search_document_indexes(apps, schema_editor):
+    """Index the search documents for text search and trigram lookups on Postgres."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS catalog_item_search_vector_idx "
+        "ON catalog_catalogitem USING gin "
+        "(to_tsvector('simple'::regconfig, COALESCE(search_document, '')))")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS catalog_item_search_trigram_idx "
+        "ON catalog_catalogitem USING gin (search_document gin_trgm_ops)")
+
+
+def drop_search_document_indexes(apps, schema_editor):
+    """Drop the search document indexes."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute("DROP INDEX IF EXISTS catalog_item_search_vector_idx")
+    schema_editor.execute("DROP INDEX IF EXISTS catalog_item_search_trigram_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0002_initial'),
+        ('items', '0005_alter_product_serial_number'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='catalogitem',
+            name='search_document',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(compose_search_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_search_document_indexes, drop_search_document_indexes),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.1 on 2026-10-18 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0003_catalogitem_search_document'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='catalogitemauditlog',
+            index=models.Index(fields=['enterprise', '-created_on', '-id'], name='catalog_item_audit_keyset_idx'),
+        ),
+    ]
@@ -1,8 +1,11 @@
 """Catalog model file."""
 
 from decimal import Decimal
-from django.db import models
-from django.core.cache import cache
+from functools import reduce
+from operator import or_
+from django.db import connections, models
+from django.db.models import Case, OuterRef, Prefetch, Q, Subquery, Value, When
+from django.db.models.signals import post_delete, post_save
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 
@@ -10,11 +13,14 @@ from elites_retail_portal.common.choices import CURRENCY_CHOICES
 from elites_retail_portal.debit.models import (
     Inventory, InventoryItem, InventoryRecord)
 from elites_retail_portal.items.models import (
-    ItemUnits, ItemAttribute, Product)
-from elites_retail_portal.common.models import AbstractBase
+    Brand, Category, Item, ItemAttribute, ItemImage, ItemModel, ItemType, ItemUnits,
+    Product, Units)
+from elites_retail_portal.catalog.cache import invalidate_catalog_cache
+from elites_retail_portal.common.models import AbstractBase, BaseQuerySet
 from elites_retail_portal.common.validators import (
     items_enterprise_code_validator)
 from elites_retail_portal.customers.models import Customer
+from elites_retail_portal.enterprises.models import Enterprise
 from django.contrib.auth import get_user_model
 from elites_retail_portal.users.models import retrieve_user_email
 from elites_retail_portal.common.code_generators import (
@@ -56,6 +62,9 @@ CATALOG_ITEM_AUDIT_SOURCES = (
 INVENTORY_RECORD = 'INVENTORY RECORD'
 CREATE_CATALOG_ITEM = 'CREATE CATALOG ITEM'
 
+# Text search configuration of the catalog item search document index
+SEARCH_DOCUMENT_CONFIG = 'simple'
+
 
 class Section(AbstractBase):
     """Sections for items in the premise."""
@@ -80,6 +89,13 @@ class Section(AbstractBase):
         self.create_section_code()
         return super().clean()
 
+    def save(self, *args, **kwargs):
+        """Perform pre save and post save actions."""
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if not adding:
+            CatalogItem.objects.filter(section=self).refresh_search_documents()
+
     def __str__(self):
         """Str representation for the section model."""
         return '{}'.format(
@@ -92,6 +108,129 @@ class Section(AbstractBase):
         ordering = ['-section_name']
 
 
+def compose_item_heading(item, units, item_attributes):
+    """Compose an item heading from the item, its sale units and its attributes."""
+    type = item.item_model.item_type.type_name
+    brand = item.item_model.brand.brand_name
+    model = item.item_model.model_name
+
+    special_features = []
+    special_offers = []
+    year = ''
+
+    if item_attributes:
+        special_features = [
+            attribute.attribute_value for attribute in item_attributes
+            if attribute.attribute_type == 'SPECIAL FEATURE']
+        special_offers = [
+            attribute.attribute_value for attribute in item_attributes
+            if attribute.attribute_type == 'SPECIAL OFFER']
+
+    special_offer = ''
+    if special_offers:
+        str_special_offers = ", ".join(special_offers)
+        special_offer = ' {}'.format(str_special_offers)
+
+    str_special_features = ''
+    if special_features:
+        str_special_features = ", ".join(special_features)
+
+    item_heading = brand + ' ' + model + ' ' + \
+        str_special_features + ' ' + type + ', ' + \
+        year + units + special_offer
+
+    return item_heading
+
+
+def compose_search_document(catalog_item, serial_numbers):
+    """Compose the text a catalog item is searched by."""
+    item = catalog_item.inventory_item.item
+    item_model = item.item_model
+    values = [
+        item.item_name, item_model.model_name, item_model.brand.brand_name,
+        item_model.item_type.type_name, item_model.item_type.category.category_name,
+        item.item_code, item.barcode, catalog_item.section.section_name, *serial_numbers]
+
+    return ' '.join(str(value).lower() for value in values if value)
+
+
+class CatalogItemQuerySet(BaseQuerySet):
+    """Catalog item queryset."""
+
+    def refresh_search_documents(self):
+        """Recompose the search documents of the catalog items."""
+        catalog_items = list(self.select_related(
+            'section', 'inventory_item__item__item_model__brand',
+            'inventory_item__item__item_model__item_type__category').prefetch_related(
+                'inventory_item__item__product_set'))
+        for catalog_item in catalog_items:
+            serial_numbers = [
+                product.serial_number
+                for product in catalog_item.inventory_item.item.product_set.all()]
+            catalog_item.search_document = compose_search_document(
+                catalog_item, serial_numbers)
+
+        return self.model.objects.bulk_update(
+            catalog_items, ['search_document'], batch_size=500)
+
+    def search(self, search_terms):
+        """Search the catalog items by their search documents.
+
+        Each catalog item matching any of the terms is ranked by the number of terms it
+        matches. On Postgres the text search rank and the trigram similarity of the
+        document are added to the rank and the lookups use the document's GIN indexes.
+        """
+        search_terms = [term.lower() for term in search_terms]
+        matches = reduce(or_, [Q(search_document__contains=term) for term in search_terms])
+        search_rank = reduce(lambda rank, term: rank + Case(
+            When(search_document__contains=term, then=Value(1.0)), default=Value(0.0),
+            output_field=models.FloatField()), search_terms, Value(0.0))
+
+        if connections[self.db].vendor == 'postgresql':
+            from django.contrib.postgres.search import (
+                SearchQuery, SearchRank, SearchVector, TrigramSimilarity)
+            search_vector = SearchVector('search_document', config=SEARCH_DOCUMENT_CONFIG)
+            search_query = reduce(or_, [
+                SearchQuery(term, config=SEARCH_DOCUMENT_CONFIG) for term in search_terms])
+            search_rank = search_rank + SearchRank(search_vector, search_query) + \
+                TrigramSimilarity('search_document', ' '.join(search_terms))
+            matches |= Q(search_vector=search_query)
+            queryset = self.annotate(search_vector=search_vector)
+        else:
+            queryset = self
+
+        return queryset.annotate(search_rank=search_rank).filter(matches).order_by(
+            '-search_rank', *self.query.order_by)
+
+    def for_listing(self):
+        """Load what the catalog item list shows in a fixed number of queries.
+
+        The related records are joined, the unit price and units are annotated and the
+        catalogs and item attributes are prefetched, so listing more items does not run
+        more queries.
+        """
+        latest_add_records = InventoryRecord.objects.filter(
+            inventory_item=OuterRef('inventory_item'), record_type='ADD').order_by(
+                '-record_date')
+        item_units = ItemUnits.objects.filter(
+            item=OuterRef('inventory_item__item')).order_by('pk')
+        active_catalog_catalog_items = CatalogCatalogItem.objects.filter(
+            is_active=True).select_related('catalog')
+
+        return self.select_related(
+            'section', 'inventory_item__item__item_model__brand',
+            'inventory_item__item__item_model__item_type').annotate(
+                latest_unit_price=Subquery(latest_add_records.values('unit_price')[:1]),
+                sale_units_name=Subquery(
+                    item_units.filter(is_active=True).values('sales_units__units_name')[:1]),
+                heading_units_name=Subquery(item_units.values('sales_units__units_name')[:1]),
+            ).prefetch_related(
+                Prefetch(
+                    'catalog_item_catalogcatalogitem', queryset=active_catalog_catalog_items,
+                    to_attr='active_catalog_catalog_items'),
+                'inventory_item__item__itemattribute_set')
+
+
 class CatalogItem(AbstractBase):
     """Catalog item model."""
 
@@ -117,9 +256,12 @@ class CatalogItem(AbstractBase):
     on_display = models.BooleanField(default=True)
     is_active = models.BooleanField(default=True)
     pushed_to_edi = models.BooleanField(default=False)
+    search_document = models.TextField(null=True, blank=True, editable=False)
     creator = retrieve_user_email('created_by')
     updater = retrieve_user_email('updated_by')
 
+    objects = CatalogItemQuerySet.as_manager()
+
     @property
     def products(self):
         """Get products."""
@@ -144,37 +286,12 @@ class CatalogItem(AbstractBase):
     @property
     def item_heading(self):
         """Compose an item heading to display item."""
-        type = self.inventory_item.item.item_model.item_type.type_name
-        brand = self.inventory_item.item.item_model.brand.brand_name
-        model = self.inventory_item.item.item_model.model_name
-
-        item_units = ItemUnits.objects.filter(item=self.inventory_item.item).first()
+        item = self.inventory_item.item
+        item_units = ItemUnits.objects.filter(item=item).first()
         units = item_units.sales_units.units_name if item_units else ''
+        item_attributes = ItemAttribute.objects.filter(item=item)
 
-        special_features = []
-        special_offers = []
-        year = ''
-
-        item_attributes = ItemAttribute.objects.filter(
-            item=self.inventory_item.item)
-        if item_attributes.exists():
-            special_features = item_attributes.last().special_features
-            special_offers = item_attributes.last().special_offers
-
-        special_offer = ''
-        if special_offers:
-            str_special_offers = ", ".join(special_offers)
-            special_offer = ' {}'.format(str_special_offers)
-
-        str_special_features = ''
-        if special_features:
-            str_special_features = ", ".join(special_features)
-
-        item_heading = brand + ' ' + model + ' ' + \
-            str_special_features + ' ' + type + ', ' + \
-            year + units + special_offer
-
-        return item_heading
+        return compose_item_heading(item, units, item_attributes)
 
     def get_marked_price(self):
         """Get marked price."""
@@ -191,6 +308,12 @@ class CatalogItem(AbstractBase):
         if not self.threshold_price or self.threshold_price > self.selling_price:
             self.threshold_price = self.selling_price
 
+    def get_search_document(self):
+        """Compose the search document of the catalog item."""
+        serial_numbers = Product.objects.filter(
+            item=self.inventory_item.item).values_list('serial_number', flat=True)
+        self.search_document = compose_search_document(self, serial_numbers)
+
     def get_quantity(self):
         """Get quantity."""
         from elites_retail_portal.enterprise_mgt.helpers import (
@@ -202,15 +325,9 @@ class CatalogItem(AbstractBase):
                 {'inventory':
                     'Your enterprise does not have a master Inventory. Please set up one first'})
 
-        quantity = 0
         enterprise_setup_rules = get_valid_enterprise_setup_rules(self.enterprise)
         available_inventory = enterprise_setup_rules.available_inventory
-        if not available_inventory.summary == []:
-            quantities = [
-                data['quantity'] for data in available_inventory.summary
-                if data['inventory_item'] == self.inventory_item]
-
-            quantity = quantities[0] if quantities else 0
+        quantity = available_inventory.get_inventory_item_quantity(self.inventory_item)
 
         self.quantity = quantity
         return quantity
@@ -313,6 +430,7 @@ class CatalogItem(AbstractBase):
         self.get_marked_price()
         self.get_selling_price()
         self.get_threshold_price()
+        self.get_search_document()
         super().save(*args, **kwargs)
         if not Product.objects.filter(
                 item=self.inventory_item.item, enterprise=self.enterprise).exists():
@@ -337,8 +455,6 @@ class CatalogItem(AbstractBase):
                 audit_source='CATALOG ITEM', created_by=self.created_by,
                 updated_by=self.updated_by, enterprise=self.enterprise)
 
-        cache.delete('catalog_items_objects')
-
     class Meta:
         """Meta class for catalog."""
 
@@ -495,3 +611,31 @@ class CatalogItemAuditLog(AbstractBase):
         if self.__class__.objects.filter(id=self.id).exists():
             self.audit_date = self.__class__.objects.filter(id=self.id).first().audit_date
         return super().save(*args, **kwargs)
+
+    class Meta:
+        """Meta class for catalog item audit log model."""
+
+        indexes = [
+            models.Index(
+                fields=['enterprise', '-created_on', '-id'], name='catalog_item_audit_keyset_idx'),
+        ]
+
+
+CATALOG_CACHE_SENDERS = (
+    Section, Catalog, CatalogItem, CatalogCatalogItem, InventoryRecord, Category, ItemType,
+    Brand, ItemModel, Item, ItemAttribute, ItemImage, ItemUnits, Units, Product, Enterprise)
+
+
+def invalidate_catalog_cache_of_record(sender, instance, **kwargs):
+    """Drop the cached catalog responses of the enterprise of the changed record."""
+    invalidate_catalog_cache(
+        instance.enterprise_code if sender is Enterprise else instance.enterprise)
+
+
+for catalog_cache_sender in CATALOG_CACHE_SENDERS:
+    post_save.connect(
+        invalidate_catalog_cache_of_record, sender=catalog_cache_sender,
+        dispatch_uid='catalog_cache_post_save_{}'.format(catalog_cache_sender.__name__))
+    post_delete.connect(
+        invalidate_catalog_cache_of_record, sender=catalog_cache_sender,
+        dispatch_uid='catalog_cache_post_delete_{}'.format(catalog_cache_sender.__name__))
@@ -55,6 +55,42 @@ class CatalogItemSerializer(BaseSerializerMixin):
         fields = '__all__'
 
 
+class CatalogItemReadSerializer(CatalogItemSerializer):
+    """Catalog Item read serializer class.
+
+    It reads the values loaded by CatalogItemQuerySet.for_listing instead of querying
+    them for every catalog item.
+    """
+
+    unit_price = SerializerMethodField()
+    catalogs_names = SerializerMethodField()
+    sale_units_name = CharField(read_only=True)
+    item_heading = SerializerMethodField()
+
+    def get_unit_price(self, instance):
+        """Get the unit price of the latest inventory record of the item."""
+        unit_price = instance.latest_unit_price
+        return str(unit_price) if unit_price is not None else '0'
+
+    def get_catalogs_names(self, instance):
+        """Get the names of the catalogs the item is in."""
+        return ", ".join(sorted({
+            catalog_catalog_item.catalog.catalog_name
+            for catalog_catalog_item in instance.active_catalog_catalog_items}))
+
+    def get_item_heading(self, instance):
+        """Compose the heading of the item."""
+        item = instance.inventory_item.item
+        return models.compose_item_heading(
+            item, instance.heading_units_name or '', item.itemattribute_set.all())
+
+    class Meta:
+        """Serializer Meta class."""
+
+        model = models.CatalogItem
+        fields = '__all__'
+
+
 class CatalogCatalogItemSerializer(BaseSerializerMixin):
     """CatalogCatalogItem Serializer class."""
 
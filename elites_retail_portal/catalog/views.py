@@ -2,16 +2,19 @@
 
 from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
 from elites_retail_portal.catalog import serializers
+from elites_retail_portal.catalog.cache import CatalogCacheMixin
 from elites_retail_portal.catalog.models import (
     Catalog, CatalogItem, CatalogCatalogItem, CatalogItemAuditLog, Section)
 from elites_retail_portal.common.views import BaseViewMixin
+from elites_retail_portal.common.pagination import KeysetPagination
 from elites_retail_portal.catalog import filters
 
 
-class SectionViewSet(BaseViewMixin):
+class SectionViewSet(CatalogCacheMixin, BaseViewMixin):
     """Section Viewset class."""
 
     queryset = Section.objects.all()
@@ -25,7 +28,7 @@ class SectionViewSet(BaseViewMixin):
     }
 
 
-class CatalogViewSet(BaseViewMixin):
+class CatalogViewSet(CatalogCacheMixin, BaseViewMixin):
     """Catalog Viewset class."""
 
     queryset = Catalog.objects.all().order_by('catalog_name')
@@ -34,7 +37,7 @@ class CatalogViewSet(BaseViewMixin):
     search_fields = ('catalog_name', 'catalog_code')
 
 
-class CatalogItemViewSet(BaseViewMixin):
+class CatalogItemViewSet(CatalogCacheMixin, BaseViewMixin):
     """Catalog Item Viewset class."""
 
     queryset = CatalogItem.objects.all().order_by('inventory_item__item__item_name')
@@ -46,18 +49,43 @@ class CatalogItemViewSet(BaseViewMixin):
         'inventory_item__item__item_model__brand__brand_name',
         'inventory_item__item__item_model__item_type__type_name',
         'inventory_item__item__item_code', 'inventory_item__item__barcode')
-    filter_backends = [filters.ProductSearchFilter]
-
-    # @method_decorator(vary_on_cookie)
-    # @method_decorator(cache_page(60*60*14))
-    # def dispatch(self, *args, **kwargs):
-    #     """."""
-    #     if self.request.method in ['POST', 'PUT', 'DELETE', 'PATCH']:
-    #         cache.delete('catalog_items_objects')
-    #     catalog_items_objects = cache.get('catalog_items_objects')
-    #     if catalog_items_objects is None:
-    #         cache.set('catalog_items_objects', self.queryset)
-    #     return super(CatalogItemViewSet, self).dispatch(*args, **kwargs)
+    filter_backends = [filters.CatalogItemSearchFilter]
+    read_actions = ['list', 'retrieve']
+    bulk_upsert_fields = ('marked_price', 'discount_amount', 'threshold_price')
+
+    def get_queryset(self):
+        """Load what the catalog items are read with up front."""
+        queryset = super().get_queryset()
+        if self.action in self.read_actions:
+            queryset = queryset.for_listing()
+        return queryset
+
+    def get_serializer_class(self):
+        """Read the catalog items with the serializer of the loaded values."""
+        if self.action in self.read_actions:
+            return serializers.CatalogItemReadSerializer
+        return super().get_serializer_class()
+
+    def prepare_bulk_upsert_record(self, catalog_item):
+        """Derive the prices of a catalog item of a price list upload.
+
+        Catalog items are only updated in bulk, since creating one adds its product and
+        its audit log.
+        """
+        if catalog_item._state.adding:
+            raise ValidationError({'id': ['Catalog items can only be updated in bulk']})
+
+        catalog_item.get_marked_price()
+        catalog_item.get_selling_price()
+        catalog_item.get_threshold_price()
+        return ('marked_price', 'selling_price', 'threshold_price')
+
+    def serialize_bulk_upsert_records(self, catalog_items):
+        """Serialize the catalog items with the values the list loads up front."""
+        catalog_items = CatalogItem.objects.for_listing().filter(
+            id__in=[catalog_item.id for catalog_item in catalog_items])
+        return serializers.CatalogItemReadSerializer(
+            catalog_items, many=True, context=self.get_serializer_context()).data
 
     @action(methods=['post'], detail=True)
     def add_to_catalogs(self, request, *args, **kwargs):
@@ -71,7 +99,7 @@ class CatalogItemViewSet(BaseViewMixin):
         return Response(data={"status": "OK"}, status=status.HTTP_200_OK)
 
 
-class CatalogCatalogItemViewSet(BaseViewMixin):
+class CatalogCatalogItemViewSet(CatalogCacheMixin, BaseViewMixin):
     """CatalogCatalogItem Viewset class."""
 
     queryset = CatalogCatalogItem.objects.all().order_by('catalog__catalog_name')
@@ -89,6 +117,7 @@ class CatalogItemAuditLogViewSet(BaseViewMixin):
 
     queryset = CatalogItemAuditLog.objects.all().order_by('-audit_date')
     serializer_class = serializers.CatalogItemAuditLogSerializer
+    pagination_class = KeysetPagination
     filterset_class = filters.CatalogItemAuditLogFilter
     search_fields = (
         'catalog_item__inventory_item__item__item_name',
@@ -0,0 +1,34 @@
+"""Common middleware file."""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+REQUEST_CACHE = ContextVar('request_cache', default=None)
+
+
+def get_request_cache():
+    """Get the memo of the current request or None outside of a request."""
+    return REQUEST_CACHE.get()
+
+
+@contextmanager
+def request_cache_scope():
+    """Memoize the values looked up in the block and drop them at the end of it."""
+    token = REQUEST_CACHE.set({})
+    try:
+        yield
+    finally:
+        REQUEST_CACHE.reset(token)
+
+
+class RequestCacheMiddleware:
+    """Keep a memo of the values looked up while handling a request."""
+
+    def __init__(self, get_response):
+        """Initialize the middleware."""
+        self.get_response = get_response
+
+    def __call__(self, request):
+        """Handle the request in its own memo scope."""
+        with request_cache_scope():
+            return self.get_response(request)
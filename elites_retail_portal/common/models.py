@@ -1,8 +1,11 @@
 """Common models for Elites Age franchise portal."""
 
 import uuid
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Q, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
+from django.core.exceptions import ValidationError
 
 from elites_retail_portal.users.models import retrieve_user_email
 
@@ -18,6 +21,169 @@ ID_TYPE_CHOICES = (
     ('PASSPORT', 'PASSPORT'),
 )
 
+RETAINED_FIELDS = ('created_on', 'created_by')
+
+
+def total_related(related_records, related_field, total, output_field=None):
+    """Total the records related to each record of a queryset in a subquery.
+
+    related_records are filtered on the outer record, e.g. purchase=OuterRef('pk'), and
+    grouped by related_field, the field they are filtered on. A subquery per total keeps
+    totals over different relations from multiplying each other as joins would. Records
+    without related records get 0.
+    """
+    output_field = output_field or models.DecimalField(max_digits=30, decimal_places=2)
+    totals = related_records.order_by().values(related_field).annotate(
+        total=total).values('total')
+
+    return Coalesce(
+        Subquery(totals, output_field=output_field), Value(0), output_field=output_field)
+
+
+class BaseQuerySet(models.QuerySet):
+    """Base queryset for all models."""
+
+    def validate_unique_in_bulk(self, objs, errors, batch_size=500):
+        """Check the unique fields of many new records in one query per unique check.
+
+        The records are checked against the other rows and against each other. The
+        primary keys are left to the database since they are generated.
+        """
+        if not objs:
+            return
+
+        unique_checks, _ = objs[0]._get_unique_checks(include_meta_constraints=True)
+        for model_class, unique_fields in unique_checks:
+            fields = [model_class._meta.get_field(name) for name in unique_fields]
+            if any(field.primary_key for field in fields):
+                continue
+
+            keys = {}
+            for index, obj in enumerate(objs):
+                key = tuple(getattr(obj, field.attname) for field in fields)
+                if None in key:
+                    continue
+                if key in keys:
+                    errors.setdefault(index, []).extend(
+                        obj.unique_error_message(model_class, unique_fields).messages)
+                    continue
+                keys[key] = index
+
+            keys_list = list(keys)
+            for start in range(0, len(keys_list), batch_size):
+                lookups = Q()
+                for key in keys_list[start:start + batch_size]:
+                    lookups |= Q(**dict(zip(unique_fields, key)))
+                existing_keys = model_class._default_manager.filter(lookups).values_list(
+                    'pk', *unique_fields)
+                for pk, *key in existing_keys:
+                    index = keys[tuple(key)]
+                    if pk == objs[index].pk and not objs[index]._state.adding:
+                        continue
+                    errors.setdefault(index, []).extend(
+                        objs[index].unique_error_message(model_class, unique_fields).messages)
+
+    def validate_foreign_keys_in_bulk(self, objs, errors):
+        """Check the foreign keys of many records in one query per foreign key.
+
+        Missing required foreign keys and foreign keys to records that do not exist are
+        added to the errors, as clean_fields would add them.
+        """
+        for field in self.model._meta.concrete_fields:
+            if not isinstance(field, models.ForeignKey):
+                continue
+
+            values = {}
+            for index, obj in enumerate(objs):
+                value = getattr(obj, field.attname)
+                if value is None:
+                    if not field.null or not field.blank:
+                        errors.setdefault(index, []).append('{}: {}'.format(
+                            field.name, field.error_messages['blank' if field.null else 'null']))
+                    continue
+
+                try:
+                    values[index] = field.to_python(value)
+                except ValidationError as e:
+                    errors.setdefault(index, []).extend(
+                        '{}: {}'.format(field.name, message) for message in e.messages)
+
+            target_field = field.remote_field.field_name
+            existing_values = set(
+                field.remote_field.model._base_manager.using(self.db).complex_filter(
+                    field.get_limit_choices_to()).filter(**{
+                        '{}__in'.format(target_field): set(values.values())}).values_list(
+                            target_field, flat=True)) if values else set()
+            for index, value in values.items():
+                if value not in existing_values:
+                    errors.setdefault(index, []).append('{}: {}'.format(
+                        field.name, field.error_messages['invalid'] % {
+                            'model': field.remote_field.model._meta.verbose_name,
+                            'pk': value, 'field': target_field, 'value': value}))
+
+    def bulk_ingest(self, objs, batch_size=500):
+        """Validate and insert many new records in a few queries.
+
+        The records are validated with clean_in_bulk, then inserted in batches, so the
+        clean and save methods of the model are not run. This is meant for records that
+        stand on their own such as imported ones. Nothing is inserted if a record is
+        invalid, and the errors are raised keyed by the position of the record.
+        """
+        objs = list(objs)
+        errors = self.clean_in_bulk(objs, batch_size)
+        if errors:
+            raise ValidationError(errors)
+
+        return self.bulk_create(objs, batch_size=batch_size)
+
+    def clean_in_bulk(self, objs, batch_size=500):
+        """Validate the fields and the unique fields of many records in a few queries.
+
+        The fields of every record are validated in memory, and the foreign keys and the
+        unique fields of all the records are checked in one query per foreign key and per
+        unique check. The clean methods of the model, which hold its business rules, are
+        not run. Returns the errors keyed by the position of the record.
+        """
+        now = timezone.now()
+        errors = {}
+        foreign_keys = [
+            field.name for field in self.model._meta.concrete_fields
+            if isinstance(field, models.ForeignKey)]
+        for index, obj in enumerate(objs):
+            obj.updated_on = now
+            try:
+                obj.clean_fields(exclude=foreign_keys)
+            except ValidationError as e:
+                errors[index] = [
+                    '{}: {}'.format(field, message)
+                    for field, messages in e.message_dict.items() for message in messages]
+
+        self.validate_foreign_keys_in_bulk(objs, errors)
+        self.validate_unique_in_bulk(objs, errors, batch_size)
+        return errors
+
+    def bulk_upsert(self, objs, fields, batch_size=500):
+        """Validate many new and existing records and write the valid ones.
+
+        The records are validated like in bulk_ingest. The new records are inserted and
+        the given fields of the existing records are updated, in batches and in one
+        transaction. Invalid records are left out instead of failing the others. Like
+        bulk_ingest, the clean and save methods of the model are not run. Returns the
+        errors keyed by the position of the record.
+        """
+        objs = list(objs)
+        errors = self.clean_in_bulk(objs, batch_size)
+        valid_objs = [obj for index, obj in enumerate(objs) if index not in errors]
+        new_objs = [obj for obj in valid_objs if obj._state.adding]
+        existing_objs = [obj for obj in valid_objs if not obj._state.adding]
+        update_fields = [field for field in fields if field not in RETAINED_FIELDS]
+        with transaction.atomic(using=self.db):
+            self.bulk_create(new_objs, batch_size=batch_size)
+            if existing_objs and update_fields:
+                self.bulk_update(existing_objs, update_fields, batch_size=batch_size)
+
+        return errors
+
 
 class BaseModel(models.Model):
     """Base for all models."""
@@ -32,6 +198,8 @@ class BaseModel(models.Model):
     creator = retrieve_user_email('created_by')
     updater = retrieve_user_email('updated_by')
 
+    objects = BaseQuerySet.as_manager()
+
     def retain_created_on_and_created_by(self):
         """Retain values for created_on and created_by fields on update."""
         try:
@@ -41,11 +209,26 @@ class BaseModel(models.Model):
         except self.__class__.DoesNotExist:
             pass
 
-    def save(self, *args, **kwargs):
-        """Record today as the update date."""
+    def save(self, *args, fast=False, **kwargs):
+        """Record today as the update date.
+
+        A fast save leaves the unique checks to the database and keeps the creation
+        fields of an existing record by leaving them out of the update, instead of
+        reading the record before writing it.
+        """
         self.updated_on = timezone.now()
-        self.full_clean(exclude=None)
-        self.retain_created_on_and_created_by()
+        if not fast:
+            self.full_clean(exclude=None)
+            self.retain_created_on_and_created_by()
+            super(BaseModel, self).save(*args, **kwargs)
+            return
+
+        self.full_clean(exclude=None, validate_unique=False, validate_constraints=False)
+        if not self._state.adding and not kwargs.get('force_insert'):
+            update_fields = kwargs.get('update_fields') or [
+                field.name for field in self._meta.concrete_fields if not field.primary_key]
+            kwargs['update_fields'] = [
+                field for field in update_fields if field not in RETAINED_FIELDS]
         super(BaseModel, self).save(*args, **kwargs)
 
     class Meta:
@@ -73,6 +256,15 @@ class AbstractBase(BaseModel):
         abstract = True
 
 
+def compose_full_name(title, first_name, other_names, last_name):
+    """Compose a person's full name from their names."""
+    title = f"{title} " if title else ""
+    first_name = first_name or None
+    other_names = other_names + " " if other_names else ""
+    last_name = last_name or None
+    return f'{title}{first_name} {other_names}{last_name}'
+
+
 class BioData(AbstractBase):
     """A person's bio data  abstract model."""
 
@@ -92,11 +284,8 @@ class BioData(AbstractBase):
     @property
     def full_name(self):
         """Return a customer's full name."""
-        title = f"{self.title} " if self.title else ""
-        first_name = self.first_name or None
-        other_names = self.other_names + " " if self.other_names else ""
-        last_name = self.last_name or None
-        return f'{title}{first_name} {other_names}{last_name}'
+        return compose_full_name(
+            self.title, self.first_name, self.other_names, self.last_name)
 
     class Meta:
         """Initialize it as an abstract class."""
@@ -1,7 +1,14 @@
 """Custom pagination file."""
+import json
+import base64
+import binascii
 from collections import OrderedDict
+from django.db import connections
+from django.db.models import Q
 from rest_framework import pagination
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class EnhancedPagination(pagination.PageNumberPagination):
@@ -22,3 +29,136 @@ class EnhancedPagination(pagination.PageNumberPagination):
             ('end_index', self.page.end_index()),
             ('results', data)
         ]))
+
+
+class KeysetPagination(EnhancedPagination):
+    """Paginate large collections by the position of the records instead of a page number.
+
+    A request opts in by passing the cursor query parameter, which is empty for the first
+    page. The records are then ordered by the view's keyset_ordering, or by their creation
+    date and id, and each page is read from the position in its opaque cursor. Neither a
+    count nor an offset is needed, so a deep page is as fast as the first one. An
+    approximate count from the planner statistics is added on Postgres when the count
+    query parameter is approximate. Requests without a cursor are paginated by page number.
+    """
+
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    keyset_ordering = ('-created_on', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Paginate the queryset by the position in the cursor if one is passed."""
+        self.use_keyset = request.query_params.get(self.cursor_query_param) is not None
+        if not self.use_keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.base_url = remove_query_param(
+            request.build_absolute_uri(), self.page_query_param)
+        self.page_size = self.get_page_size(request)
+        self.ordering = getattr(view, 'keyset_ordering', self.keyset_ordering)
+        position, reverse = self.decode_cursor(request)
+        ordering = [
+            field[1:] if field.startswith('-') else '-' + field
+            for field in self.ordering] if reverse else list(self.ordering)
+
+        queryset = queryset.order_by(*ordering)
+        self.approximate_count = None
+        if request.query_params.get(self.count_query_param) == 'approximate':
+            self.approximate_count = self.get_approximate_count(queryset)
+
+        if position is not None:
+            queryset = queryset.filter(self.get_position_filter(ordering, position))
+
+        records = list(queryset[:self.page_size + 1])
+        has_more = len(records) > self.page_size
+        records = records[:self.page_size]
+        if reverse:
+            records.reverse()
+
+        self.has_next = position is not None if reverse else has_more
+        self.has_previous = has_more if reverse else position is not None
+        self.records = records
+        return records
+
+    def decode_cursor(self, request):
+        """Get the position and direction of the page from the cursor."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            position, reverse = cursor['p'], bool(cursor['r'])
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        return position, reverse
+
+    def encode_cursor(self, record, reverse):
+        """Get the link to the page after or before the record."""
+        position = [
+            str(getattr(record, field.lstrip('-'))) for field in self.ordering]
+        cursor = json.dumps({'p': position, 'r': reverse}, separators=(',', ':'))
+        encoded = base64.urlsafe_b64encode(cursor.encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_position_filter(self, ordering, position):
+        """Filter the records that come after the position in the ordering."""
+        position_filter = Q()
+        preceding = {}
+        for field, value in zip(ordering, position):
+            field_name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            position_filter |= Q(**preceding, **{f'{field_name}__{lookup}': value})
+            preceding[field_name] = value
+
+        return position_filter
+
+    def get_approximate_count(self, queryset):
+        """Estimate the number of records from the planner statistics on Postgres."""
+        if connections[queryset.db].vendor != 'postgresql':
+            return None
+
+        plan = json.loads(queryset.explain(format='json'))
+        return plan[0]['Plan']['Plan Rows']
+
+    def get_next_link(self):
+        """Get the link to the next page."""
+        if not self.use_keyset:
+            return super().get_next_link()
+
+        if not self.has_next or not self.records:
+            return None
+
+        return self.encode_cursor(self.records[-1], False)
+
+    def get_previous_link(self):
+        """Get the link to the previous page."""
+        if not self.use_keyset:
+            return super().get_previous_link()
+
+        if not self.has_previous or not self.records:
+            return None
+
+        return self.encode_cursor(self.records[0], True)
+
+    def get_paginated_response(self, data):
+        """Get the paged data without counts when paginating by position."""
+        if not self.use_keyset:
+            return super().get_paginated_response(data)
+
+        response_data = OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('page_size', self.page_size),
+        ])
+        if self.approximate_count is not None:
+            response_data['approximate_count'] = self.approximate_count
+        response_data['results'] = data
+
+        return Response(response_data)
@@ -1,12 +1,60 @@
 """Common serializers."""
 
 from rest_framework import serializers
-from rest_framework.serializers import ModelSerializer
-from rest_framework.fields import SerializerMethodField, CharField
+from rest_framework.serializers import LIST_SERIALIZER_KWARGS, ListSerializer, ModelSerializer
+from rest_framework.fields import SerializerMethodField
 
-from django.db.models import ForeignKey, ManyToManyField
+from django.db.models import ForeignKey, ManyToManyField, prefetch_related_objects
+from django.db.models.manager import BaseManager
+from django.db.models.fields.files import FieldFile
 from django.core.exceptions import ValidationError
 
+from elites_retail_portal.users.models import retrieve_user_emails
+
+AUDIT_USER_EMAILS = 'audit_user_emails'
+
+
+def get_serialized_relations(model, models_on_path=()):
+    """List the relations serialize_instance follows from a model as prefetch lookups.
+
+    These are the required foreign keys and the many to many fields, followed through the
+    related models. A model already on the path is not followed again.
+    """
+    models_on_path = models_on_path + (model,)
+    lookups = []
+    for field in model._meta.get_fields(include_hidden=True):
+        is_required_foreign_key = isinstance(field, ForeignKey) and not field.null
+        if not is_required_foreign_key and not isinstance(field, ManyToManyField):
+            continue
+        if field.related_model in models_on_path:
+            continue
+
+        lookups.append(field.name)
+        lookups.extend(
+            '{}__{}'.format(field.name, lookup)
+            for lookup in get_serialized_relations(field.related_model, models_on_path))
+
+    return lookups
+
+
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Primary key related field that looks its records up in the preloaded ones first.
+
+    A list serializer preloads the records its rows refer to in one query, see
+    AuditListSerializer.preload_related_records.
+    """
+
+    preloaded = None
+
+    def to_internal_value(self, data):
+        """Get the preloaded record of the primary key or read it."""
+        if self.preloaded is not None and self.pk_field is None:
+            record = self.preloaded.get(str(data))
+            if record is not None:
+                return record
+
+        return super().to_internal_value(data)
+
 
 class AuditFieldsMixin(ModelSerializer):
     """Handle audit fields.
@@ -71,16 +119,144 @@ class AuditFieldsMixin(ModelSerializer):
         return super().update(instance, cleaned_data)
 
 
+class AuditListSerializer(ListSerializer):
+    """List serializer that resolves the creators and updaters of all the records at once.
+
+    The emails are added to the serializer context, where the records look them up. The
+    related records of all_data are prefetched for all the records too.
+    """
+
+    def to_representation(self, data):
+        """Resolve the audit emails of the records before representing them."""
+        records = list(data.all() if isinstance(data, BaseManager) else data)
+        self.prefetch_all_data_relations(records)
+        user_ids = set()
+        for record in records:
+            user_ids.add(getattr(record, 'created_by', None))
+            user_ids.add(getattr(record, 'updated_by', None))
+
+        self.context.setdefault(AUDIT_USER_EMAILS, {}).update(retrieve_user_emails(user_ids))
+        return super().to_representation(records)
+
+    def prefetch_all_data_relations(self, records):
+        """Prefetch the related records all_data serializes for all the records at once."""
+        if not records or not hasattr(records[0], '_meta') or \
+                'all_data' not in self.child.fields:
+            return
+
+        if type(self.child).get_all_data is BaseSerializerMixin.get_all_data:
+            prefetch_related_objects(records, *get_serialized_relations(type(records[0])))
+
+    def preload_related_records(self):
+        """Read the records the rows refer to in one query per primary key related field."""
+        for field in self.child.fields.values():
+            if not isinstance(field, PreloadedPrimaryKeyRelatedField) or field.read_only:
+                continue
+
+            queryset = field.get_queryset()
+            pks = set()
+            for row in self.initial_data:
+                value = row.get(field.field_name) if isinstance(row, dict) else None
+                try:
+                    pks.add(queryset.model._meta.pk.to_python(value))
+                except (TypeError, ValueError, ValidationError):
+                    continue
+
+            pks.discard(None)
+            field.preloaded = {str(pk): record for pk, record in queryset.in_bulk(pks).items()}
+
+    def clear_preloaded_records(self):
+        """Stop looking the records of the rows up in the preloaded ones."""
+        for field in self.child.fields.values():
+            if isinstance(field, PreloadedPrimaryKeyRelatedField):
+                field.preloaded = None
+
+    def validate_upsert(self, instances):
+        """Validate each row of the data against the record it updates.
+
+        A row with an id updates the record with that id and a row without one creates a
+        record. Returns the record and validated data of the valid rows and the errors of
+        the invalid ones, both keyed by the position of the row.
+        """
+        validated_rows = {}
+        errors = {}
+        self.preload_related_records()
+        for index, row in enumerate(self.initial_data):
+            if not isinstance(row, dict):
+                errors[index] = {'non_field_errors': ['Expected a dictionary of items']}
+                continue
+
+            row_id = row.get('id')
+            instance = instances.get(str(row_id)) if row_id else None
+            if row_id and instance is None:
+                errors[index] = {'id': ['A record with this id does not exist']}
+                continue
+
+            self.child.instance = instance
+            self.partial = self.child.partial = instance is not None
+            try:
+                validated_rows[index] = (instance, self.child.run_validation(row))
+            except serializers.ValidationError as e:
+                errors[index] = e.detail
+
+        self.child.instance = None
+        self.clear_preloaded_records()
+        return validated_rows, errors
+
+
 class BaseSerializerMixin(AuditFieldsMixin):
     """Base Serializer class."""
 
+    serializer_related_field = PreloadedPrimaryKeyRelatedField
     created_by = serializers.UUIDField()
-    creator = CharField(read_only=True)
-    updater = CharField(read_only=True)
+    creator = SerializerMethodField()
+    updater = SerializerMethodField()
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        """Use a list serializer that resolves the audit emails of the records at once.
+
+        The list serializer is built the way DRF builds it, with a new child serializer.
+        Serializers that declare their own list_serializer_class keep it.
+        """
+        if hasattr(getattr(cls, 'Meta', None), 'list_serializer_class'):
+            return super().many_init(*args, **kwargs)
+
+        list_kwargs = {}
+        for key in ('allow_empty', 'max_length', 'min_length'):
+            value = kwargs.pop(key, None)
+            if value is not None:
+                list_kwargs[key] = value
+
+        list_kwargs['child'] = cls(*args, **kwargs)
+        list_kwargs.update({
+            key: value for key, value in kwargs.items() if key in LIST_SERIALIZER_KWARGS})
+        return AuditListSerializer(*args, **list_kwargs)
+
+    def get_audit_user_email(self, instance, id_field):
+        """Get the email of the user in an audit field of the record."""
+        user_id = getattr(instance, id_field, None)
+        if not user_id:
+            return None
+
+        emails = self.context.setdefault(AUDIT_USER_EMAILS, {})
+        if str(user_id) not in emails:
+            emails.update(retrieve_user_emails(
+                [getattr(instance, 'created_by', None), getattr(instance, 'updated_by', None)]))
+
+        return emails[str(user_id)]
+
+    def get_creator(self, instance):
+        """Get the email of the user who created the record."""
+        return self.get_audit_user_email(instance, 'created_by')
+
+    def get_updater(self, instance):
+        """Get the email of the user who last updated the record."""
+        return self.get_audit_user_email(instance, 'updated_by')
 
     def serialize_instance(self, instance, ignore_fields=[]):
         """Serialize a model instance."""
-        ignore_fields += [
+        ignore_fields = list(ignore_fields) + [
             'created_by', 'updated_by', 'created_on',
             'updated_on', 'enterprise', 'pushed_to_edi',
         ]
@@ -91,12 +267,9 @@ class BaseSerializerMixin(AuditFieldsMixin):
         for field in fields:
             if field.name not in ignore_fields:
                 if isinstance(field, ForeignKey):
-                    related_model = field.related_model
                     result = None
                     if not field.null:
-                        source_instance = related_model.objects.get(
-                            id=field.value_from_object(instance))
-                        result = self.serialize_instance(source_instance)
+                        result = self.serialize_instance(getattr(instance, field.name))
 
                     data[field.name] = result
 
@@ -112,7 +285,8 @@ class BaseSerializerMixin(AuditFieldsMixin):
                         data[f.name] = results
 
                 try:
-                    data[field.name] = instance.__dict__[field.name]
+                    value = instance.__dict__[field.name]
+                    data[field.name] = value.name if isinstance(value, FieldFile) else value
                     # data[field.name] = field.value_from_object(instance)
                 # except AttributeError:
                 #     pass
@@ -1,15 +1,19 @@
 """Common utilities file."""
 
 import logging
+import tempfile
 import xlsxwriter
 from io import BytesIO
 
 from .field_formatters import FIELD_FORMATTERS
 
 from django.core.exceptions import ValidationError
+from django.http import FileResponse
 
 LOGGER = logging.getLogger(__name__)
 
+EXCEL_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
 
 def validate_enterprise_exists(code):
     """Validate enterprise exists."""
@@ -60,64 +64,95 @@ def _format_field_types(field_format, value):
         return formatter.format_field_data(value)
 
 
-def _write_excel_file(header, labels, format_fields, data):
-    """Create an in-memory excel file.
+def _add_data_to_worksheet(workbook, header, labels, format_fields, data, name='sheet1'):
+    """Write the column titles and then the data rows to a new worksheet.
 
-    This creates an excel file in memory. This file can then be downloaded
-    through content negotiation.
+    The rows are written in order, one at a time, so data can be a generator.
     """
-    mem_file = BytesIO()
-    workbook = xlsxwriter.Workbook(mem_file)
     format_workbook = workbook.add_format(
             {
                 'bold': True,
                 'font_color': 'black',
                 'font_size': 12
             })
+    worksheet = workbook.add_worksheet(name)
+
+    # format the row and column size
+    worksheet.set_row(0, 50)
+    worksheet.set_column('A:Z', 18)
+
+    row = 0
+    col = 0
+
+    for title in header:
+        label = labels.get(title)
+        # write the column titles
+        worksheet.write(
+                row, col, label, format_workbook)
+        col = col + 1
+    row = 1
+    col = 0
+
+    # now write the data to excel file
+    for data_dict in data:
+        for key in header:
+            # format the fields to a more human readable format
+            field_format = format_fields.get(key)
+            formatted_value = _get_data_from_serializer_record(
+                    data_dict, key)
+            if field_format and formatted_value:
+                formatted_value = _format_field_types(
+                        field_format,
+                        _get_data_from_serializer_record(data_dict, key)
+                    )
+
+            # write the data to excel
+            worksheet.write(row, col, formatted_value)
+            col = col + 1
 
-    def _add_data_to_worksheet(name='sheet1'):
-
-        worksheet = workbook.add_worksheet(name)
-
-        # format the row and column size
-        worksheet.set_row(0, 50)
-        worksheet.set_column('A:Z', 18)
-
-        row = 0
         col = 0
+        row = row + 1
 
-        for title in header:
-            label = labels.get(title)
-            # write the column titles
-            worksheet.write(
-                    row, col, label, format_workbook)
-            col = col + 1
-        row = 1
-        col = 0
 
-        # now write the data to excel file
-        for data_dict in data:
-            for key in header:
-                # format the fields to a more human readable format
-                field_format = format_fields.get(key)
-                formatted_value = _get_data_from_serializer_record(
-                        data_dict, key)
-                if field_format and formatted_value:
-                    formatted_value = _format_field_types(
-                            field_format,
-                            _get_data_from_serializer_record(data_dict, key)
-                        )
-
-                # write the data to excel
-                worksheet.write(row, col, formatted_value)
-                col = col + 1
-
-            col = 0
-            row = row + 1
-
-    _add_data_to_worksheet()
+def _write_excel_file(header, labels, format_fields, data):
+    """Create an in-memory excel file.
+
+    This creates an excel file in memory. This file can then be downloaded
+    through content negotiation.
+    """
+    mem_file = BytesIO()
+    workbook = xlsxwriter.Workbook(mem_file)
+    _add_data_to_worksheet(workbook, header, labels, format_fields, data)
     workbook.close()
     mem_file_contents = mem_file.getvalue()
     mem_file.close()
 
     return mem_file_contents
+
+
+def _create_excel_file(header, labels, format_fields, data):
+    """Create an excel file that does not hold the rows in memory.
+
+    The workbook is written in constant memory mode to a temporary file as the rows
+    are read from data, which can be a generator over a queryset iterator. The file
+    is returned open and rewound, and is removed once it is closed.
+    """
+    excel_file = tempfile.TemporaryFile()
+    workbook = xlsxwriter.Workbook(excel_file, {'constant_memory': True})
+    _add_data_to_worksheet(workbook, header, labels, format_fields, data)
+    workbook.close()
+    excel_file.seek(0)
+
+    return excel_file
+
+
+def _stream_excel_file(file_name, header, labels, format_fields, data):
+    """Create an excel file download that does not hold the rows in memory.
+
+    The file is streamed to the client in chunks and removed once it is closed.
+    """
+    excel_file = _create_excel_file(header, labels, format_fields, data)
+
+    return FileResponse(
+        excel_file, as_attachment=True, filename=f'{file_name}.xlsx',
+        content_type=EXCEL_CONTENT_TYPE)
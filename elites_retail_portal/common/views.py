@@ -1,17 +1,41 @@
 """Common views file."""
 
+import uuid
+
+from django.core.exceptions import FieldDoesNotExist
 from django.db import transaction
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
+from elites_retail_portal.common.models import BaseQuerySet
+
+BULK_WRITE_BATCH_SIZE = 500
+AUDIT_FIELDS = ('created_by', 'updated_by', 'enterprise')
+
+
+def is_valid_id(value):
+    """Check that a value is a valid record id."""
+    try:
+        uuid.UUID(str(value))
+    except ValueError:
+        return False
+
+    return True
+
+
+def format_row_errors(errors):
+    """List the errors of the rows of a bulk request by the position of the row."""
+    return [{'row': index, 'errors': errors[index]} for index in sorted(errors)]
+
 
 class DataPartitionMixin(object):
     """Determines what data to return based on user's enterprise organisation."""
 
     def get_queryset(self):
         """Filter data based on field attribute."""
-        from elites_retail_portal.enterprises.models import Enterprise
+        from elites_retail_portal.enterprises.models import retrieve_enterprise
         queryset = super(DataPartitionMixin, self).get_queryset()
 
         partition_spec = getattr(self, 'partition_spec', None)
@@ -20,9 +44,8 @@ class DataPartitionMixin(object):
 
         enterprise_code = self.request.user.enterprise
 
-        try:
-            enterprise = Enterprise.objects.get(enterprise_code=enterprise_code)
-        except Enterprise.DoesNotExist:
+        enterprise = retrieve_enterprise(enterprise_code)
+        if enterprise is None:
             return queryset.none()
 
         enterprise_spec = partition_spec.get(enterprise.enterprise_type, None)
@@ -36,7 +59,14 @@ class DataPartitionMixin(object):
 
 
 class BaseViewMixin(DataPartitionMixin, viewsets.ModelViewSet):
-    """Base View mixin for model viewsets."""
+    """Base View mixin for model viewsets.
+
+    Set bulk_upsert_fields to the fields bulk_upsert may write to support it on a viewset
+    whose records have no save time side effects, or whose save time rules the viewset
+    applies in prepare_bulk_upsert_record.
+    """
+
+    bulk_upsert_fields = None
 
     def get_serializer(self, *args, **kwargs):
         """Update serializer selection logic to be aware of plain (non queryset) lists."""
@@ -47,23 +77,161 @@ class BaseViewMixin(DataPartitionMixin, viewsets.ModelViewSet):
 
         return super(BaseViewMixin, self).get_serializer(*args, **kwargs)
 
+    def upsert_rows(self, rows):
+        """Create and update the records of many rows in a few queries.
+
+        The records the rows update are fetched in one query from the records the user
+        can see, and the rows are validated with a list serializer. The bulk_upsert_fields
+        of the valid rows are then written in batches in one transaction, without running
+        the save methods of the records. Returns the written records and the errors keyed
+        by the position of the row.
+        """
+        serializer = self.get_serializer(data=rows, many=True)
+        queryset = self.filter_queryset(self.get_queryset())
+        ids = [
+            row['id'] for row in rows
+            if isinstance(row, dict) and row.get('id') and is_valid_id(row['id'])]
+        instances = {str(pk): instance for pk, instance in queryset.in_bulk(ids).items()}
+        validated_rows, errors = serializer.validate_upsert(instances)
+
+        model = queryset.model
+        writable_fields = set(self.bulk_upsert_fields) | set(AUDIT_FIELDS)
+        fields = {'updated_on', 'updated_by'}
+        records = {}
+        many_to_many_data = {}
+        for index, (instance, data) in validated_rows.items():
+            data = serializer.child._populate_audit_fields(dict(data), instance is None)
+            many_to_many_data[index] = {}
+            for name in list(data):
+                value = data.pop(name)
+                try:
+                    field = model._meta.get_field(name)
+                except FieldDoesNotExist:
+                    continue
+
+                if name not in writable_fields:
+                    continue
+                if field.many_to_many:
+                    many_to_many_data[index][name] = value
+                else:
+                    data[name] = value
+
+            if instance is None:
+                instance = model(**data)
+            else:
+                for attr, value in data.items():
+                    setattr(instance, attr, value)
+                fields.update(data)
+
+            try:
+                fields.update(self.prepare_bulk_upsert_record(instance))
+            except ValidationError as e:
+                errors[index] = e.detail
+                continue
+            records[index] = instance
+
+        indexes = list(records)
+        with transaction.atomic():
+            record_errors = BaseQuerySet(model=model, using=queryset.db).bulk_upsert(
+                list(records.values()), list(fields), batch_size=BULK_WRITE_BATCH_SIZE)
+            for position, error in record_errors.items():
+                errors[indexes[position]] = error
+                records.pop(indexes[position])
+
+            for index, record in records.items():
+                for name, value in many_to_many_data[index].items():
+                    getattr(record, name).set(value)
+
+        return list(records.values()), errors
+
+    def prepare_bulk_upsert_record(self, record):
+        """Prepare a record for bulk_upsert to write.
+
+        Viewsets set the fields the save method of their records would derive here, since
+        it is not run, and return the names of those fields. A ValidationError rejects the
+        row of the record.
+        """
+        return ()
+
+    def serialize_bulk_upsert_records(self, records):
+        """Serialize the records bulk_upsert wrote."""
+        return self.get_serializer(records, many=True).data
+
+    @action(detail=False, methods=['put'])
+    def bulk_upsert(self, request, *args, **kwargs):
+        """Create and update many records via HTTP PUT.
+
+        Rows with an id update the record with that id and rows without one create a
+        record. The valid rows are written even when some rows are invalid. Only viewsets
+        that set bulk_upsert_fields support it, since the rows are written without running
+        the save methods of the records.
+        """
+        if self.bulk_upsert_fields is None:
+            return Response(
+                data={'error': "Bulk upsert is not supported for these records"},
+                status=status.HTTP_405_METHOD_NOT_ALLOWED)
+
+        if not isinstance(request.data, list):
+            return Response(
+                data={'error': "Expected list"}, status=status.HTTP_400_BAD_REQUEST)
+
+        records, errors = self.upsert_rows(request.data)
+        data = {
+            'results': self.serialize_bulk_upsert_records(records),
+            'errors': format_row_errors(errors),
+        }
+        return Response(
+            data=data, status=status.HTTP_207_MULTI_STATUS if errors else status.HTTP_200_OK)
+
     @action(detail=False, methods=['put'])
     def bulk_update(self, request, *args, **kwargs):
-        """Implement support for bulk updates via HTTP PUT."""
-        if isinstance(request.data, list):
-            resp = []
-            with transaction.atomic():
-                for item in request.data:
-                    instance = self.queryset.get(id=item['id'])
-                    serializer = self.get_serializer(
-                        instance, data=item, partial=True)
-                    serializer.is_valid(raise_exception=True)
+        """Implement support for bulk updates via HTTP PUT.
+
+        Each row is saved through the serializer so the save rules of the records apply.
+        Nothing is updated if any of the rows is invalid.
+        """
+        if not isinstance(request.data, list):
+            return Response(
+                data={'error': "Expected list"}, status=status.HTTP_400_BAD_REQUEST)
+
+        errors = {
+            index: {'id': ['This field is required.']}
+            for index, item in enumerate(request.data)
+            if not isinstance(item, dict) or not item.get('id')}
+        if errors:
+            return Response(
+                data={'errors': format_row_errors(errors)},
+                status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        ids = [item['id'] for item in request.data if is_valid_id(item['id'])]
+        instances = {str(pk): instance for pk, instance in queryset.in_bulk(ids).items()}
+        resp = []
+        with transaction.atomic():
+            for index, item in enumerate(request.data):
+                instance = instances.get(str(item['id']))
+                if instance is None:
+                    errors[index] = {'id': ['A record with this id does not exist']}
+                    continue
+
+                serializer = self.get_serializer(instance, data=item, partial=True)
+                if not serializer.is_valid():
+                    errors[index] = serializer.errors
+                    continue
+
+                if not errors:
                     serializer.save()
                     resp.append(serializer.data)
-            return Response(data=resp, status=status.HTTP_200_OK)
-        else:
+
+            if errors:
+                transaction.set_rollback(True)
+
+        if errors:
             return Response(
-                data={'error': "Expected list"}, status=status.HTTP_400_BAD_REQUEST)
+                data={'errors': format_row_errors(errors)},
+                status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(data=resp, status=status.HTTP_200_OK)
 
 
 class ReadOnlyBaseViewMixin(viewsets.ReadOnlyModelViewSet):
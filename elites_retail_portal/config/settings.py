@@ -97,6 +97,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'elites_retail_portal.common.middleware.RequestCacheMiddleware',
 ]
 
 ROOT_URLCONF = 'elites_retail_portal.config.urls'
@@ -240,7 +241,7 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'elites_retail_portal.users.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -301,23 +302,32 @@ LOGIN_REDIRECT_URL = '/v1/errors/'
 LOGIN_URL = '/auth/login/'
 
 MPESA_C2B_URL = F'{NGROK_BASE_URL}/v1/adapters/mobile_money/safaricom/c2b/callback/'
-MPESA_CHECKOUT_URL = 'https://sandbox.safaricom.co.ke/safaricom/stkpush/v1/processrequest'
-MPESA_ACCESS_TOKEN_URL = 'https://sandbox.safaricom.co.ke/oauth/v1/generate?grant_type=client_credentials'  # noqa
+# The M-Pesa API the gateway calls, which can be a local stub server
+MPESA_BASE_URL = os.getenv('MPESA_BASE_URL', 'https://sandbox.safaricom.co.ke')
+MPESA_CONSUMER_KEY = os.getenv('MPESA_CONSUMER_KEY', '0uLw9wagDGvENbgRObMdu7dEX4Ex636m')
+MPESA_CONSUMER_SECRET = os.getenv('MPESA_CONSUMER_SECRET', 'gLiDGxDwiyhhcuBL')
 
 
 CORS_ORIGIN_ALLOW_ALL = True
 CORS_ALLOW_CREDENTIALS = True
 
 
-# CACHES = {
-#     'default': {
-#         'BACKEND': 'django_redis.cache.RedisCache',
-#         'LOCATION': 'redis://127.0.0.1:6379/1',
-#         'OPTIONS': {
-#             'CLIENT_CLASS': 'django_redis.client.DefaultClient',
-#         }
-#     }
-# }
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+if not ENVIRONMENT == 'DEVELOPMENT':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': os.getenv('REDIS_CACHE_URL', 'redis://127.0.0.1:6379/1'),
+            'OPTIONS': {
+                'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            }
+        }
+    }
 
 SESSION_ENGINE = "django.contrib.sessions.backends.cache"
 SESSION_CACHE_ALIAS = "default"
@@ -325,8 +335,8 @@ SESSION_CACHE_ALIAS = "default"
 CACHE_TTL = 60 * 1
 # @method_decorator(cache_page(CACHE_TTL))
 
-CELERY_BROKER_URL = "redis://localhost:6379"
-CELERY_RESULT_BACKEND = "redis://localhost:6379"
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', "redis://localhost:6379")
+CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', "redis://localhost:6379")
 CELERY_TASK_RESULT_EXPIRES = 30  # in seconds
 # CELERY_TASK_RESULT_EXPIRES = 300  # in seconds
 CELERY_TIMEZONE = TIME_ZONE
@@ -336,6 +346,37 @@ CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TASK_TIME_LIMIT = int(60 * 60 * 12)  # 12 hours in seconds
 CELERY_TASK_IGNORE_RESULT = True
 
+# Process customer encounters in the celery workers instead of the request
+ENCOUNTERS_ASYNC_PROCESSING = os.getenv('ENCOUNTERS_ASYNC_PROCESSING', 'False') == 'True'
+
+# Render report jobs in the celery workers instead of the request
+REPORT_JOBS_ASYNC_RENDERING = os.getenv('REPORT_JOBS_ASYNC_RENDERING', 'True') == 'True'
+
+# Seconds the enterprise setup rules are shared across requests for
+ENTERPRISE_SETUP_RULES_CACHE_TIMEOUT = int(
+    os.getenv('ENTERPRISE_SETUP_RULES_CACHE_TIMEOUT', '300'))
+
+# Seconds the user emails shown as record creators and updaters are cached for
+USER_EMAILS_CACHE_TIMEOUT = int(os.getenv('USER_EMAILS_CACHE_TIMEOUT', '300'))
+
+# Seconds the identities of authenticated users are cached for
+USER_IDENTITY_CACHE_TIMEOUT = int(os.getenv('USER_IDENTITY_CACHE_TIMEOUT', '300'))
+
+# Seconds the enterprises the requests are partitioned by are cached for
+ENTERPRISES_CACHE_TIMEOUT = int(os.getenv('ENTERPRISES_CACHE_TIMEOUT', '300'))
+
+# Seconds the catalog list and detail responses are cached for
+CATALOG_CACHE_TIMEOUT = int(os.getenv('CATALOG_CACHE_TIMEOUT', '300'))
+
+# Seconds before its expiry the shared M-Pesa access token is refreshed
+MPESA_ACCESS_TOKEN_EXPIRY_MARGIN = int(os.getenv('MPESA_ACCESS_TOKEN_EXPIRY_MARGIN', '200'))
+
+# Seconds the M-Pesa API requests wait for a response
+MPESA_REQUEST_TIMEOUT = int(os.getenv('MPESA_REQUEST_TIMEOUT', '30'))
+
+# Connections kept open to the M-Pesa API by each process
+MPESA_CONNECTION_POOL_SIZE = int(os.getenv('MPESA_CONNECTION_POOL_SIZE', '10'))
+
 # Email address: adminuser@email.com
 # First name: Admin
 # Last name: User
@@ -3,11 +3,12 @@
 import decimal
 
 from django.db import models
+from django.db.models import OuterRef, Sum
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 
-from elites_retail_portal.common.models import AbstractBase
+from elites_retail_portal.common.models import AbstractBase, BaseQuerySet, total_related
 from elites_retail_portal.warehouses.models import (
     WarehouseItem, WarehouseRecord)
 from elites_retail_portal.items.models import Item, ItemUnits
@@ -31,6 +32,28 @@ PAYMENT_METHOD_CHOICES = (
 )
 
 
+class PurchaseQuerySet(BaseQuerySet):
+    """Purchases queryset."""
+
+    def with_totals(self):
+        """Annotate the purchases with the totals of their items, returns and payments.
+
+        The total_cost, total_payments_amount and balance_amount of the purchases are then
+        read from the annotations instead of a few queries per purchase.
+        """
+        return self.annotate(
+            items_total_cost=total_related(
+                PurchaseItem.objects.filter(purchase=OuterRef('pk')),
+                'purchase', Sum('total_cost')),
+            returns_total_cost=total_related(
+                debit_models.PurchasesReturn.objects.filter(
+                    purchase_item__purchase=OuterRef('pk')),
+                'purchase_item__purchase', Sum('total_cost')),
+            payments_total_amount=total_related(
+                PurchasePayment.objects.filter(purchase=OuterRef('pk')),
+                'purchase', Sum('amount')))
+
+
 class Purchase(AbstractBase):
     """Purchases model."""
 
@@ -43,9 +66,14 @@ class Purchase(AbstractBase):
         null=True, blank=True, max_length=300)
     purchase_date = models.DateTimeField(db_index=True, default=timezone.now)
 
+    objects = PurchaseQuerySet.as_manager()
+
     @property
     def total_cost(self):
         """Get the total cost."""
+        if hasattr(self, 'items_total_cost'):
+            return float(self.items_total_cost) - float(self.returns_total_cost)
+
         items_costs = PurchaseItem.objects.filter(
             purchase=self).values_list('total_cost', flat=True)
         items_cost = sum(items_costs)
@@ -58,6 +86,9 @@ class Purchase(AbstractBase):
     @property
     def total_payments_amount(self):
         """Get total paid amount."""
+        if hasattr(self, 'payments_total_amount'):
+            return float(self.payments_total_amount)
+
         payment_amounts = PurchasePayment.objects.filter(
             purchase=self).values_list("amount", flat=True)
         return float(sum(payment_amounts))
@@ -303,7 +334,7 @@ class PurchaseItem(AbstractBase):
                             unit_price=self.recommended_retail_price, **audit_fields)
 
                 self.added_to_warehouse = True
-                self.save()
+                self.save(fast=True)
 
 
 class PurchasePayment(AbstractBase):
@@ -42,7 +42,9 @@ class SalesReturn(AbstractBase):
         self.unit_price = self.unit_price or sale_record.selling_price if sale_record else 0
         self.total_price = round(
             Decimal(float(self.unit_price) * float(self.quantity_returned)), 2)
+        old_contributions = self.sale_item.get_daily_sales_contributions()
         super().save(*args, **kwargs)
+        self.sale_item.update_daily_sales_summaries(old_contributions)
         enterprise_setup_rules = get_valid_enterprise_setup_rules(self.enterprise)
         inventory = enterprise_setup_rules.default_inventory
         inventory_item = InventoryItem.objects.get(
@@ -74,3 +76,10 @@ class SalesReturn(AbstractBase):
             inventory_record.quantity_recorded = self.quantity_returned
             inventory_record.unit_price = Decimal(self.unit_price)
             inventory_record.save()
+
+    def delete(self, *args, **kwargs):
+        """Perform post delete actions."""
+        old_contributions = self.sale_item.get_daily_sales_contributions()
+        deleted = super().delete(*args, **kwargs)
+        self.sale_item.update_daily_sales_summaries(old_contributions)
+        return deleted
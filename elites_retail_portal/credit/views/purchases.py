@@ -10,7 +10,7 @@ from elites_retail_portal.credit import filters
 class PurchaseViewSet(BaseViewMixin):
     """Purchases view model."""
 
-    queryset = Purchase.objects.all().order_by('-updated_on')
+    queryset = Purchase.objects.with_totals().order_by('-updated_on')
     serializer_class = serializers.PurchaseSerializer
     filterset_class = filters.PurchaseFilter
     search_fields = (
@@ -1,6 +1,7 @@
 """Debit side filters file."""
 
 import django_filters
+from django.db import models as django_models
 
 from elites_retail_portal.common.filters import SearchComboboxBaseFilter
 from elites_retail_portal.debit import models
@@ -85,3 +86,24 @@ class SaleItemFilter(SearchComboboxBaseFilter):
 
         model = models.SaleItem
         fields = '__all__'
+
+
+class ReportJobFilter(SearchComboboxBaseFilter):
+    """Filter report job."""
+
+    class Meta:
+        """Restrict filter fields."""
+
+        model = models.ReportJob
+        fields = '__all__'
+        filter_overrides = {
+            django_models.JSONField: {
+                'filter_class': django_filters.CharFilter,
+            },
+            django_models.FileField: {
+                'filter_class': django_filters.CharFilter,
+                'extra': lambda f: {
+                    'lookup_expr': 'icontains',
+                },
+            },
+        }
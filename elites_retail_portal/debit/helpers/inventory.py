@@ -1,21 +1,59 @@
 """Inventory model helpers."""
 
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+
 from elites_retail_portal.enterprise_mgt.helpers import get_valid_enterprise_setup_rules
-from elites_retail_portal.debit.models import InventoryRecord
+from elites_retail_portal.debit.models import InventoryRecord, StockLevel
 
 
 def get_available_quantity_of_inventory_item_in_inventory(inventory_item, inventory=None):
     """."""
-    quantity = 0
     if not inventory:
         enterprise = inventory_item.enterprise
         enterprise_setup_rules = get_valid_enterprise_setup_rules(enterprise)
         inventory = enterprise_setup_rules.default_inventory
 
-    inventory_records = InventoryRecord.objects.filter(
-        inventory=inventory, inventory_item=inventory_item)
-    if inventory_records.exists():
-        inventory_record = inventory_records.latest('updated_on')
-        quantity = inventory_record.closing_stock_quantity
+    stock_level = StockLevel.objects.filter(
+        inventory=inventory, inventory_item=inventory_item).first()
+    return stock_level.quantity if stock_level else 0
+
+
+def rebuild_stock_levels(enterprise=None, inventory_record_model=None, stock_level_model=None):
+    """Rebuild the stock levels from the inventory records history.
+
+    The stock level of each inventory item in an inventory is set to the closing balances of
+    its latest inventory record. Migrations pass their historical models.
+    """
+    inventory_record_model = inventory_record_model or InventoryRecord
+    stock_level_model = stock_level_model or StockLevel
+    records = inventory_record_model.objects.all()
+    if enterprise:
+        records = records.filter(enterprise=enterprise)
+
+    latest_records = inventory_record_model.objects.filter(
+        inventory=OuterRef('inventory'), inventory_item=OuterRef('inventory_item')).order_by(
+            '-record_date', '-created_on', '-id').values('id')[:1]
+    latest_record_ids = records.order_by().values(
+        'inventory', 'inventory_item').distinct().annotate(
+            latest_record=Subquery(latest_records)).values_list('latest_record', flat=True)
+
+    stock_levels = [
+        stock_level_model(
+            inventory_id=record.inventory_id, inventory_item_id=record.inventory_item_id,
+            latest_record=record, record_date=record.record_date,
+            quantity=float(record.closing_stock_quantity or 0),
+            total_amount=float(record.closing_stock_total_amount or 0),
+            created_by=record.created_by, updated_by=record.updated_by,
+            enterprise=record.enterprise)
+        for record in inventory_record_model.objects.filter(
+            id__in=list(latest_record_ids)).order_by().iterator()]
+
+    with transaction.atomic():
+        existing_stock_levels = stock_level_model.objects.all()
+        if enterprise:
+            existing_stock_levels = existing_stock_levels.filter(enterprise=enterprise)
+        existing_stock_levels.delete()
+        stock_level_model.objects.bulk_create(stock_levels, batch_size=500)
 
-    return quantity
+    return len(stock_levels)
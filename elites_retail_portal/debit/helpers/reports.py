@@ -0,0 +1,231 @@
+"""Report jobs helper file."""
+
+import pytz
+import logging
+import datetime
+from io import BytesIO
+from xhtml2pdf import pisa
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.exceptions import ValidationError
+from django.template.loader import get_template
+
+from elites_retail_portal.catalog.models import CatalogItem
+from elites_retail_portal.common.utils import EXCEL_CONTENT_TYPE, _create_excel_file
+from elites_retail_portal.debit.models import (
+    InventoryItem, ReportJob, Sale, SaleItem, StockLevel)
+from elites_retail_portal.debit.helpers.sales import (
+    generate_sales_report, get_sales_report_rows)
+from elites_retail_portal.debit.stock.reports import (
+    generate_stock_report, get_stock_report_rows)
+from elites_retail_portal.enterprises.models import Enterprise
+from elites_retail_portal.items.models import Item
+from elites_retail_portal.transactions.helpers.payments.reports import (
+    generate_payments_report, get_payments_report_rows)
+from elites_retail_portal.transactions.models import Payment
+from elites_retail_portal.warehouses.models import WarehouseRecord
+
+LOGGER = logging.getLogger(__name__)
+
+SALES_REPORT_HEADERS = (
+    'sale_date', 'receipt_number', 'item', 'customer', 'order_number',
+    'amount_paid', 'status', 'processing_status', 'quantity_sold',
+    'sale_type', 'selling_price', 'total_price')
+
+SALES_REPORT_LABELS = {
+    'sale_date': 'Sale Date',
+    'receipt_number': 'Receipt Number',
+    'item': 'Item',
+    'customer': 'Customer',
+    'order_number': 'Order Number',
+    'amount_paid': 'Amount Paid',
+    'status': 'Status',
+    'processing_status': 'Processing Status',
+    'quantity_sold': 'Quantity Sold',
+    'sale_type': 'Sale Type',
+    'selling_price': 'Selling Price',
+    'total_price': 'Total Amount',
+}
+
+STOCK_REPORT_HEADERS = (
+    'item', 'quantity_in_catalog', 'quantity_in_warehouse', 'quantity_in_inventory',
+    'order_number', 'status', 'marked_price', 'selling_price', 'threshold_price')
+
+STOCK_REPORT_LABELS = {
+    'item': 'Item',
+    'quantity_in_catalog': 'Quantity in Catalog',
+    'quantity_in_warehouse': 'Quantity in Warehouse',
+    'quantity_in_inventory': 'Quantity in Inventory',
+    'status': 'Status',
+    'marked_price': 'Marked Price',
+    'selling_price': 'Selling Price',
+    'threshold_price': 'Threshold Price'
+}
+
+PAYMENTS_REPORT_HEADERS = (
+    'payment_time', 'payment_code', 'transaction_code', 'account_number', 'customer',
+    'encounter', 'payment_method', 'required_amount', 'paid_amount', 'balance_amount',
+    'final_amount', 'is_confirmed', 'is_installment', 'is_processed')
+
+PAYMENTS_REPORT_LABELS = {
+    'payment_time': 'Payment Time',
+    'payment_code': 'Payment Code',
+    'transaction_code': 'Transaction Code',
+    'account_number': 'Account Number',
+    'customer': 'Customer',
+    'encounter': 'Receipt Number',
+    'payment_method': 'Payment Method',
+    'required_amount': 'Required Amount',
+    'paid_amount': 'Paid Amount',
+    'balance_amount': 'Balance Amount',
+    'final_amount': 'Final Amount',
+    'is_confirmed': 'Confirmation Status',
+    'is_installment': 'Payment Type',
+    'is_processed': 'Processing Status',
+}
+
+REPORT_TEMPLATES = {
+    'SALES': 'sales_report.html',
+    'STOCK': 'stock_report.html',
+    'PAYMENTS': 'payments_report.html',
+}
+
+REPORT_CONTENT_TYPES = {
+    'PDF': 'application/pdf',
+    'XLSX': EXCEL_CONTENT_TYPE,
+}
+
+REPORT_WATERMARK_MODELS = {
+    'SALES': [Sale, SaleItem],
+    'STOCK': [Item, InventoryItem, CatalogItem, StockLevel, WarehouseRecord],
+    'PAYMENTS': [Payment],
+}
+
+
+def get_report_file_name(report_job):
+    """Get the name of the file a report is downloaded as."""
+    enterprise = Enterprise.objects.filter(enterprise_code=report_job.enterprise).first()
+    site_name = enterprise.name if enterprise else report_job.enterprise
+    return '{}-{}-report-as-at-{}.{}'.format(
+        site_name, report_job.report_type.lower(), timezone.now().date(),
+        report_job.file_type.lower())
+
+
+def get_report_watermark(enterprise_code, report_type):
+    """Get a watermark of the data a report is generated from.
+
+    The watermark changes when a record the report reads is added, updated or removed
+    and when the day changes, since the reports default to today's records. Queryset
+    updates of these records must set updated_on for the watermark to see them.
+    """
+    today = datetime.datetime.now(tz=pytz.timezone('Africa/Nairobi')).date()
+    watermarks = [str(today)]
+    for model in REPORT_WATERMARK_MODELS[report_type]:
+        aggregates = model.objects.filter(enterprise=enterprise_code).aggregate(
+            count=Count('id'), last_updated_on=Max('updated_on'))
+        watermarks.append('{count}:{last_updated_on}'.format(**aggregates))
+
+    return ';'.join(watermarks)
+
+
+def render_pdf_report(template_name, data):
+    """Render the report data to a pdf file."""
+    template = get_template(template_name)
+    path_to_static = str(settings.STATIC_ROOT).split("/static")[0]
+    today = datetime.datetime.now(tz=pytz.timezone('Africa/Nairobi')).date()
+    context = {
+        'report_preview': {'report_date': today.strftime("%Y%m%d%H%M%S")},
+        'data': data,
+        'path_to_static': path_to_static
+    }
+    html = template.render(context)
+    pdf_file = BytesIO()
+    pdf_status = pisa.CreatePDF(html, dest=pdf_file)
+
+    if pdf_status.err:
+        raise ValidationError(
+            {'artifact': 'Some errors were encountered while rendering the report'})
+
+    return ContentFile(pdf_file.getvalue())
+
+
+def render_sales_report(report_job):
+    """Render the sales report of a report job."""
+    parameters = report_job.parameters or {}
+    item_id = parameters.get('item', None)
+    item = Item.objects.filter(id=item_id).first() if item_id else None
+    report_filters = [
+        report_job.enterprise, item, parameters.get('start_date', None),
+        parameters.get('end_date', None)]
+
+    if report_job.file_type == 'PDF':
+        data = generate_sales_report(*report_filters)
+        return render_pdf_report(REPORT_TEMPLATES['SALES'], data)
+
+    rows = get_sales_report_rows(*report_filters)
+    return File(_create_excel_file(SALES_REPORT_HEADERS, SALES_REPORT_LABELS, {}, rows))
+
+
+def render_stock_report(report_job):
+    """Render the stock report of a report job."""
+    if report_job.file_type == 'PDF':
+        data = generate_stock_report(report_job.enterprise)
+        return render_pdf_report(REPORT_TEMPLATES['STOCK'], data)
+
+    inventory_items = InventoryItem.objects.filter(enterprise=report_job.enterprise)
+    rows = get_stock_report_rows(inventory_items) if inventory_items.exists() else []
+    return File(_create_excel_file(STOCK_REPORT_HEADERS, STOCK_REPORT_LABELS, {}, rows))
+
+
+def render_payments_report(report_job):
+    """Render the payments report of a report job."""
+    parameters = report_job.parameters or {}
+    report_filters = [
+        report_job.enterprise, parameters.get('start_date', None),
+        parameters.get('end_date', None)]
+
+    if report_job.file_type == 'PDF':
+        data = generate_payments_report(*report_filters)
+        return render_pdf_report(REPORT_TEMPLATES['PAYMENTS'], data)
+
+    rows = (
+        {**row, 'payment_time': timezone.localtime(row['payment_time']).strftime(
+            "%Y-%m-%d %H:%M:%S")}
+        for row in get_payments_report_rows(*report_filters))
+    return File(_create_excel_file(PAYMENTS_REPORT_HEADERS, PAYMENTS_REPORT_LABELS, {}, rows))
+
+
+REPORT_RENDERERS = {
+    'SALES': render_sales_report,
+    'STOCK': render_stock_report,
+    'PAYMENTS': render_payments_report,
+}
+
+
+def render_report_job_artifact(report_job):
+    """Render the report of a report job and store it under the job's key.
+
+    A failure is recorded on the job instead of being raised.
+    """
+    report_jobs = ReportJob.objects.filter(id=report_job.id)
+    report_jobs.update(status='ONGOING', updated_on=timezone.now())
+    try:
+        report_file = REPORT_RENDERERS[report_job.report_type](report_job)
+        report_job.get_cached_artifact()
+        if not report_job.artifact:
+            report_job.artifact.save(
+                report_job.artifact_name.split('/')[-1], report_file, save=False)
+        report_file.close()
+    except Exception as e:
+        LOGGER.exception('Unable to render report job %s', report_job.id)
+        report_jobs.update(
+            status='FAILED', failure_reason=str(e), updated_on=timezone.now())
+        return
+
+    report_jobs.update(
+        artifact=report_job.artifact.name, status='SUCCESS', failure_reason=None,
+        completed_on=timezone.now(), updated_on=timezone.now())
@@ -2,26 +2,74 @@
 
 import pytz
 import datetime
+from decimal import Decimal
+from itertools import islice
 
-from elites_retail_portal.debit.models import Sale, SaleItem
+from django.db import transaction
+from django.db.models import F, FloatField, OuterRef, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 
+from elites_retail_portal.common.models import compose_full_name, total_related
+from elites_retail_portal.credit.models import SalesReturn
+from elites_retail_portal.debit.models import DailySalesSummary, SaleItem
+from elites_retail_portal.encounters.models import Encounter
 
-def get_sale_item_data(sale_item):
-    """Get sale item data."""
-    return {
-        'sale_date': sale_item.sale.sale_date.strftime("%Y-%m-%d"),
-        'receipt_number': sale_item.sale.receipt_number,
-        'customer': sale_item.sale.customer.full_name if sale_item.sale.customer else '',
-        'order_number': sale_item.sale.order.order_number if sale_item.sale.order else '',
-        'amount_paid': float(sale_item.amount_paid),
-        'item': sale_item.catalog_item.inventory_item.item.item_name,
-        'status': 'CLEARED' if sale_item.is_cleared else 'NOT CLEARED',
-        'processing_status': sale_item.processing_status,
-        'quantity_sold': sale_item.quantity_sold,
-        'sale_type': sale_item.sale_type,
-        'selling_price': float(sale_item.selling_price),
-        'total_price': float(sale_item.total_amount),
-    }
+SALES_REPORT_CHUNK_SIZE = 2000
+
+SALES_TIME_ZONE = pytz.timezone('Africa/Nairobi')
+
+MIXED_PAYMENT_METHODS = 'MIXED'
+
+DAILY_SALES_SUMMARY_TOTALS = ('quantity', 'gross_amount', 'discount_amount', 'cost_amount')
+
+DAILY_SALES_SUMMARY_KEY_FIELDS = (
+    'enterprise', 'summary_date', 'catalog_item_id', 'served_by_id', 'payment_method')
+
+SALES_REPORT_COLUMNS = {
+    'sale_date': F('sale__sale_date'),
+    'receipt_number': F('sale__receipt_number'),
+    'customer_id': F('sale__customer'),
+    'customer_title': F('sale__customer__title'),
+    'customer_first_name': F('sale__customer__first_name'),
+    'customer_other_names': F('sale__customer__other_names'),
+    'customer_last_name': F('sale__customer__last_name'),
+    'order_number': F('sale__order__order_number'),
+    'item_name': F('catalog_item__inventory_item__item__item_name'),
+}
+
+
+def get_sale_item_rows(sale_items, extra_columns=(), chunk_size=SALES_REPORT_CHUNK_SIZE):
+    """Yield the report rows of the sale items.
+
+    The columns of the sales, customers, orders and items are read along with the sale
+    items in one query, which is iterated in chunks. The extra columns, such as
+    annotations of the sale items, are added to the rows as they are.
+    """
+    sale_items = sale_items.values(
+        'amount_paid', 'is_cleared', 'processing_status', 'quantity_sold', 'sale_type',
+        'selling_price', 'total_amount', *extra_columns, **SALES_REPORT_COLUMNS)
+    for sale_item in sale_items.iterator(chunk_size=chunk_size):
+        customer = compose_full_name(
+            sale_item['customer_title'], sale_item['customer_first_name'],
+            sale_item['customer_other_names'], sale_item['customer_last_name'],
+        ) if sale_item['customer_id'] else ''
+        yield {
+            'sale_date': sale_item['sale_date'].strftime("%Y-%m-%d"),
+            'receipt_number': sale_item['receipt_number'],
+            'customer': customer,
+            'order_number': sale_item['order_number'] or '',
+            'amount_paid': float(sale_item['amount_paid']),
+            'item': sale_item['item_name'],
+            'status': 'CLEARED' if sale_item['is_cleared'] else 'NOT CLEARED',
+            'processing_status': sale_item['processing_status'],
+            'quantity_sold': sale_item['quantity_sold'],
+            'sale_type': sale_item['sale_type'],
+            'selling_price': float(sale_item['selling_price']),
+            'total_price': float(sale_item['total_amount']),
+            **{column: sale_item[column] for column in extra_columns},
+        }
 
 
 def create_report_data(sale_items):
@@ -31,8 +79,7 @@ def create_report_data(sale_items):
     total_amount_paid = 0
     total_price = 0
     total_quantity = 0
-    for sale_item in sale_items:
-        data = get_sale_item_data(sale_item)
+    for data in get_sale_item_rows(sale_items):
         sales_data.append(data)
         total_amount_paid += data['amount_paid']
         total_price += data['total_price']
@@ -48,37 +95,222 @@ def create_report_data(sale_items):
         }
 
 
-def generate_sales_report(enterprise_code, item=None, start_date=None, end_date=None):
-    """Generate sales report."""
+def get_sales_report_sale_items(enterprise_code, item=None, start_date=None, end_date=None):
+    """Get the sale items of the sales report.
+
+    Without a start and an end date, the report covers today's sales.
+    """
     if not start_date and not end_date:
-        today = datetime.datetime.now(tz=pytz.timezone('Africa/Nairobi')).date()
-        sales = Sale.objects.filter(enterprise=enterprise_code, sale_date__gte=today)
-        sale_items = SaleItem.objects.filter(sale__in=sales).order_by('-sale__sale_date')
-        if item:
-            sale_items = sale_items.filter(catalog_item__inventory_item__item=item)
-        return create_report_data(sale_items)
-
-    if start_date and end_date:
-        sales = Sale.objects.filter(
-            enterprise=enterprise_code, sale_date__gte=start_date,
-            sale_date__lte=end_date).order_by('-sale_date')
-        sale_items = SaleItem.objects.filter(sale__in=sales).order_by('-sale__sale_date')
-        if item:
-            sale_items = sale_items.filter(catalog_item__inventory_item__item=item)
-        return create_report_data(sale_items)
-
-    if start_date and not end_date:
-        sales = Sale.objects.filter(
-            enterprise=enterprise_code, sale_date__gte=start_date).order_by('-sale_date')
-        sale_items = SaleItem.objects.filter(sale__in=sales).order_by('-sale__sale_date')
-        if item:
-            sale_items = sale_items.filter(catalog_item__inventory_item__item=item)
-        return create_report_data(sale_items)
-
-    # Has end date and no start date
-    sales = Sale.objects.filter(
-        enterprise=enterprise_code, sale_date__lte=end_date).order_by('-sale_date')
-    sale_items = SaleItem.objects.filter(sale__in=sales).order_by('-sale__sale_date')
+        start_date = datetime.datetime.now(tz=pytz.timezone('Africa/Nairobi')).date()
+
+    sale_items = SaleItem.objects.filter(sale__enterprise=enterprise_code)
+    if start_date:
+        sale_items = sale_items.filter(sale__sale_date__gte=start_date)
+    if end_date:
+        sale_items = sale_items.filter(sale__sale_date__lte=end_date)
     if item:
         sale_items = sale_items.filter(catalog_item__inventory_item__item=item)
-    return create_report_data(sale_items)
+
+    return sale_items.order_by('-sale__sale_date')
+
+
+def get_sales_report_rows(enterprise_code, item=None, start_date=None, end_date=None):
+    """Yield the rows of the sales report without loading all the sale items."""
+    return get_sale_item_rows(
+        get_sales_report_sale_items(enterprise_code, item, start_date, end_date))
+
+
+def generate_sales_report(enterprise_code, item=None, start_date=None, end_date=None):
+    """Generate sales report."""
+    return create_report_data(
+        get_sales_report_sale_items(enterprise_code, item, start_date, end_date))
+
+
+def get_encounter_sales_details(order_ids):
+    """Get the staff who served and the payment method of the encounters of the orders.
+
+    The latest encounter of an order is used. An encounter paid by more than one means
+    has the mixed payment method.
+    """
+    encounters = Encounter.objects.filter(order_guid__in=order_ids).order_by(
+        'created_on').values_list('order_guid', 'served_by', 'payments')
+    encounter_details = {}
+    for order_id, served_by, payments in encounters:
+        payment_methods = {payment.get('means') for payment in payments or []} - {None}
+        payment_method = payment_methods.pop() if len(payment_methods) == 1 else (
+            MIXED_PAYMENT_METHODS if payment_methods else None)
+        encounter_details[order_id] = (served_by, payment_method)
+
+    return encounter_details
+
+
+def compose_daily_sales_summaries(sale_items, chunk_size=SALES_REPORT_CHUNK_SIZE):
+    """Total the sale items by day, catalog item, staff who served and payment method.
+
+    The returned quantities and amounts are net of the sales returns. The discount is the
+    difference between the marked price and the selling price, and the cost is the unit
+    cost, both as the sale item recorded them when it was sold.
+    """
+    sales_returns = SalesReturn.objects.filter(sale_item=OuterRef('pk'))
+    sale_items = sale_items.exclude(processing_status='CANCELED').order_by().annotate(
+        summary_date=TruncDate('sale__sale_date', tzinfo=SALES_TIME_ZONE),
+        returned_quantity=total_related(
+            sales_returns, 'sale_item', Sum('quantity_returned'), FloatField()),
+        returned_amount=total_related(sales_returns, 'sale_item', Sum('total_price')),
+    ).values_list(
+        'sale__enterprise', 'summary_date', 'catalog_item', 'sale__order', 'quantity_sold',
+        'selling_price', 'total_amount', 'marked_price', 'unit_cost',
+        'returned_quantity', 'returned_amount', 'created_by', 'updated_by')
+
+    summaries = {}
+    rows = sale_items.iterator(chunk_size=chunk_size)
+    chunk = list(islice(rows, chunk_size))
+    while chunk:
+        encounter_details = get_encounter_sales_details(
+            {row[3] for row in chunk if row[3]})
+        for (enterprise, summary_date, catalog_item_id, order_id, quantity_sold,
+                selling_price, total_amount, marked_price, unit_cost, returned_quantity,
+                returned_amount, created_by, updated_by) in chunk:
+            served_by, payment_method = encounter_details.get(order_id, (None, None))
+            key = (enterprise, summary_date, catalog_item_id, served_by, payment_method)
+            if key not in summaries:
+                summaries[key] = DailySalesSummary(
+                    enterprise=enterprise, summary_date=summary_date,
+                    catalog_item_id=catalog_item_id, served_by_id=served_by,
+                    payment_method=payment_method, quantity=0, gross_amount=Decimal(0),
+                    discount_amount=Decimal(0), cost_amount=Decimal(0),
+                    created_by=created_by, updated_by=updated_by)
+
+            quantity = quantity_sold - returned_quantity
+            discount = max((marked_price or 0) - (selling_price or 0), 0)
+            summary = summaries[key]
+            summary.quantity += quantity
+            summary.gross_amount += (total_amount or 0) - returned_amount
+            summary.discount_amount += round(discount * Decimal(str(quantity)), 2)
+            summary.cost_amount += round(
+                Decimal(str(unit_cost or 0)) * Decimal(str(quantity)), 2)
+        chunk = list(islice(rows, chunk_size))
+
+    return list(summaries.values())
+
+
+def get_day_sale_items(enterprise_code, summary_date):
+    """Get the sale items of the enterprise sold on the day."""
+    day_start = SALES_TIME_ZONE.localize(
+        datetime.datetime.combine(summary_date, datetime.time.min))
+    return SaleItem.objects.filter(
+        sale__enterprise=enterprise_code, sale__sale_date__gte=day_start,
+        sale__sale_date__lt=day_start + datetime.timedelta(days=1))
+
+
+def get_daily_sales_summary_key(summary):
+    """Get the enterprise, day, catalog item, server and payment method of a summary."""
+    return tuple(getattr(summary, field) for field in DAILY_SALES_SUMMARY_KEY_FIELDS)
+
+
+def get_daily_sales_contributions(sale_items):
+    """Get what the sale items add to each daily sales summary, keyed by the summary."""
+    return {
+        get_daily_sales_summary_key(summary): summary
+        for summary in compose_daily_sales_summaries(sale_items)}
+
+
+def update_daily_sales_summaries(old_contributions, new_contributions):
+    """Apply the change of what sale items add to the daily sales summaries.
+
+    The contributions are what the sale items added before and after they were written. An
+    empty summary is inserted for the key unless one exists, which the unique constraint on
+    the key makes safe when sales are written at the same time, then the change is added to
+    it in one update. Rows left empty by a change are deleted.
+    """
+    with transaction.atomic():
+        for key in sorted(
+                set(old_contributions) | set(new_contributions),
+                key=lambda summary_key: [str(key) for key in summary_key]):
+            old_summary = old_contributions.get(key)
+            new_summary = new_contributions.get(key)
+            changes = {
+                total: getattr(new_summary, total, 0) - getattr(old_summary, total, 0)
+                for total in DAILY_SALES_SUMMARY_TOTALS}
+            if not any(changes.values()):
+                continue
+
+            summary = new_summary or old_summary
+            for total in DAILY_SALES_SUMMARY_TOTALS:
+                setattr(summary, total, 0)
+            DailySalesSummary.objects.bulk_create([summary], ignore_conflicts=True)
+
+            summaries = DailySalesSummary.objects.filter(
+                **dict(zip(DAILY_SALES_SUMMARY_KEY_FIELDS, key)))
+            summaries.update(
+                updated_on=timezone.now(),
+                **{total: F(total) + change for total, change in changes.items()})
+            if new_summary is None:
+                summaries.filter(**dict.fromkeys(DAILY_SALES_SUMMARY_TOTALS, 0)).delete()
+
+
+def rebuild_daily_sales_summaries(enterprise=None):
+    """Rebuild the daily sales summaries from the sale items history."""
+    sale_items = SaleItem.objects.all()
+    if enterprise:
+        sale_items = sale_items.filter(sale__enterprise=enterprise)
+    summaries = compose_daily_sales_summaries(sale_items)
+
+    with transaction.atomic():
+        existing_summaries = DailySalesSummary.objects.all()
+        if enterprise:
+            existing_summaries = existing_summaries.filter(enterprise=enterprise)
+        existing_summaries.delete()
+        DailySalesSummary.objects.bulk_create(summaries, batch_size=500)
+
+    return len(summaries)
+
+
+def parse_report_date(value):
+    """Get the date of a report date parameter given as a date, a datetime or a string."""
+    if isinstance(value, str):
+        value = parse_datetime(value) or parse_date(value)
+    if isinstance(value, datetime.datetime):
+        return timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+
+    return value
+
+
+def get_daily_sales_totals(enterprise_code, start_date=None, end_date=None):
+    """Get the sales totals of each day in the period.
+
+    The closed days are read from the daily sales summaries and only today's sales are
+    totalled from the sale items. Without a start date, the period starts on the first day
+    of the month.
+    """
+    today = datetime.datetime.now(tz=SALES_TIME_ZONE).date()
+    start_date = parse_report_date(start_date) or today.replace(day=1)
+    end_date = parse_report_date(end_date) or today
+
+    daily_totals = {
+        day_totals['summary_date']: day_totals
+        for day_totals in DailySalesSummary.objects.filter(
+            enterprise=enterprise_code, summary_date__gte=start_date,
+            summary_date__lte=min(end_date, today - datetime.timedelta(days=1)),
+        ).order_by('summary_date').values('summary_date').annotate(**{
+            total: Sum(total) for total in DAILY_SALES_SUMMARY_TOTALS})}
+
+    today_summaries = compose_daily_sales_summaries(
+        get_day_sale_items(enterprise_code, today)) if start_date <= today <= end_date else []
+    if today_summaries:
+        daily_totals[today] = {
+            total: sum(getattr(summary, total) for summary in today_summaries)
+            for total in DAILY_SALES_SUMMARY_TOTALS}
+
+    daily_totals_data = [
+        {
+            'summary_date': summary_date.strftime("%Y-%m-%d"),
+            **{total: float(day_totals[total] or 0) for total in DAILY_SALES_SUMMARY_TOTALS},
+        } for summary_date, day_totals in sorted(daily_totals.items())]
+
+    return {
+        "daily_totals_data": daily_totals_data,
+        "totals_data": {
+            total: sum(day_totals[total] for day_totals in daily_totals_data)
+            for total in DAILY_SALES_SUMMARY_TOTALS},
+        }
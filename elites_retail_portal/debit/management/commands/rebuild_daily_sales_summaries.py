@@ -0,0 +1,23 @@
+"""Rebuild daily sales summaries command."""
+
+from django.core.management.base import BaseCommand
+
+from elites_retail_portal.debit.helpers.sales import rebuild_daily_sales_summaries
+
+
+class Command(BaseCommand):
+    """."""
+
+    help = 'Rebuilds the daily sales summaries from the sale items history'
+
+    def add_arguments(self, parser):
+        """."""
+        parser.add_argument(
+            '--enterprise', type=str, default=None,
+            help='Only rebuild the daily sales summaries of the given enterprise code')
+
+    def handle(self, *args, **options):
+        """."""
+        count = rebuild_daily_sales_summaries(enterprise=options['enterprise'])
+        self.stdout.write(self.style.SUCCESS(
+            'Successfully rebuilt {} daily sales summaries'.format(count)))
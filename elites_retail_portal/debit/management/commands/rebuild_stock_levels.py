@@ -0,0 +1,23 @@
+"""Rebuild stock levels command."""
+
+from django.core.management.base import BaseCommand
+
+from elites_retail_portal.debit.helpers.inventory import rebuild_stock_levels
+
+
+class Command(BaseCommand):
+    """."""
+
+    help = 'Rebuilds the inventory stock levels from the inventory records history'
+
+    def add_arguments(self, parser):
+        """."""
+        parser.add_argument(
+            '--enterprise', type=str, default=None,
+            help='Only rebuild the stock levels of the given enterprise code')
+
+    def handle(self, *args, **options):
+        """."""
+        count = rebuild_stock_levels(enterprise=options['enterprise'])
+        self.stdout.write(self.style.SUCCESS(
+            'Successfully rebuilt {} stock levels'.format(count)))
@@ -0,0 +1,41 @@
+# Generated by Django 4.1.1 on 2026-10-18 09:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('debit', '0002_remove_saleitem_closing_stock_amount_and_more'),
+        ('debit', '0004_sale_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockLevel',
+            fields=[
+                ('id', models.UUIDField(auto_created=True, default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('created_on', models.DateTimeField(db_index=True, default=django.utils.timezone.now, editable=False)),
+                ('created_by', models.UUIDField(editable=False)),
+                ('updated_on', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('updated_by', models.UUIDField()),
+                ('enterprise', models.CharField(max_length=250)),
+                ('record_date', models.DateTimeField(blank=True, null=True)),
+                ('quantity', models.FloatField(default=0)),
+                ('total_amount', models.FloatField(default=0)),
+                ('inventory', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='debit.inventory')),
+                ('inventory_item', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='debit.inventoryitem')),
+                ('latest_record', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='debit.inventoryrecord')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='stocklevel',
+            constraint=models.UniqueConstraint(fields=('inventory', 'inventory_item'), name='unique_stock_level_per_inventory_item'),
+        ),
+    ]
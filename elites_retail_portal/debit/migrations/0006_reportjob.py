@@ -0,0 +1,39 @@
+# Generated by Django 4.1.1 on 2026-10-18 13:00
+
+from django.db import migrations, models
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('debit', '0005_stocklevel'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportJob',
+            fields=[
+                ('id', models.UUIDField(auto_created=True, default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('created_on', models.DateTimeField(db_index=True, default=django.utils.timezone.now, editable=False)),
+                ('created_by', models.UUIDField(editable=False)),
+                ('updated_on', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('updated_by', models.UUIDField()),
+                ('enterprise', models.CharField(max_length=250)),
+                ('report_type', models.CharField(choices=[('SALES', 'SALES'), ('STOCK', 'STOCK')], max_length=300)),
+                ('file_type', models.CharField(choices=[('PDF', 'PDF'), ('XLSX', 'XLSX')], default='PDF', max_length=300)),
+                ('parameters', models.JSONField(blank=True, default=dict, null=True)),
+                ('file_name', models.CharField(blank=True, max_length=300, null=True)),
+                ('watermark', models.CharField(blank=True, max_length=300, null=True)),
+                ('cache_key', models.CharField(blank=True, db_index=True, max_length=300, null=True)),
+                ('artifact', models.FileField(blank=True, null=True, upload_to='reports')),
+                ('status', models.CharField(choices=[('PENDING', 'PENDING'), ('ONGOING', 'ONGOING'), ('SUCCESS', 'SUCCESS'), ('FAILED', 'FAILED')], default='PENDING', max_length=300)),
+                ('failure_reason', models.TextField(blank=True, null=True)),
+                ('completed_on', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.1.1 on 2026-10-18 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('debit', '0006_reportjob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inventoryrecord',
+            index=models.Index(fields=['enterprise', '-created_on', '-id'], name='inventory_record_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='saleitem',
+            index=models.Index(fields=['enterprise', '-created_on', '-id'], name='sale_item_keyset_idx'),
+        ),
+    ]
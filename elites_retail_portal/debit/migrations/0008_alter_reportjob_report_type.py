@@ -0,0 +1,18 @@
+# Generated by Django 4.1.1 on 2026-10-18 19:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('debit', '0007_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reportjob',
+            name='report_type',
+            field=models.CharField(choices=[('SALES', 'SALES'), ('STOCK', 'STOCK'), ('PAYMENTS', 'PAYMENTS')], max_length=300),
+        ),
+    ]
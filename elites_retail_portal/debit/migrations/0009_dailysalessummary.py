@@ -0,0 +1,44 @@
+# Generated by Django 4.1.1 on 2026-10-18 20:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0004_catalogitemauditlog_keyset_index'),
+        ('enterprises', '0002_enterprise_short_name'),
+        ('debit', '0008_alter_reportjob_report_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySalesSummary',
+            fields=[
+                ('id', models.UUIDField(auto_created=True, default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('created_on', models.DateTimeField(db_index=True, default=django.utils.timezone.now, editable=False)),
+                ('created_by', models.UUIDField(editable=False)),
+                ('updated_on', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('updated_by', models.UUIDField()),
+                ('enterprise', models.CharField(max_length=250)),
+                ('summary_date', models.DateField(db_index=True)),
+                ('payment_method', models.CharField(blank=True, max_length=300, null=True)),
+                ('quantity', models.FloatField(default=0)),
+                ('gross_amount', models.DecimalField(decimal_places=2, default=0, max_digits=30)),
+                ('discount_amount', models.DecimalField(decimal_places=2, default=0, max_digits=30)),
+                ('cost_amount', models.DecimalField(decimal_places=2, default=0, max_digits=30)),
+                ('catalog_item', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='catalog.catalogitem')),
+                ('served_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, to='enterprises.staff')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name='dailysalessummary',
+            index=models.Index(fields=['enterprise', 'summary_date', 'catalog_item'], name='daily_sales_summary_idx'),
+        ),
+    ]
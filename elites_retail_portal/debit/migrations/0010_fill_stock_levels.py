@@ -0,0 +1,23 @@
+# Generated by Django 4.1.1 on 2026-10-18 22:00
+
+from django.db import migrations
+
+
+def fill_stock_levels(apps, schema_editor):
+    """Set the stock levels of the existing inventory items from their inventory records."""
+    from elites_retail_portal.debit.helpers.inventory import rebuild_stock_levels
+
+    rebuild_stock_levels(
+        inventory_record_model=apps.get_model('debit', 'InventoryRecord'),
+        stock_level_model=apps.get_model('debit', 'StockLevel'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('debit', '0009_dailysalessummary'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_stock_levels, migrations.RunPython.noop),
+    ]
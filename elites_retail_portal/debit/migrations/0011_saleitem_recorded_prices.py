@@ -0,0 +1,59 @@
+# Generated by Django 4.1.1 on 2026-10-18 23:00
+
+import django.core.validators
+from django.db import migrations, models
+
+
+def record_sale_item_prices(apps, schema_editor):
+    """Record the marked price and unit cost of the existing sale items as of their sale.
+
+    The daily sales summaries are then rebuilt from the recorded prices. They are only
+    rebuilt where there are sale items, since the rebuild reads through the current models.
+    """
+    SaleItem = apps.get_model('debit', 'SaleItem')
+    InventoryRecord = apps.get_model('debit', 'InventoryRecord')
+    if not SaleItem.objects.exists():
+        return
+
+    sale_items = SaleItem.objects.filter(
+        models.Q(marked_price__isnull=True) | models.Q(unit_cost__isnull=True)).values_list(
+            'id', 'sale__sale_date', 'catalog_item__marked_price',
+            'catalog_item__inventory_item')
+    updated_sale_items = []
+    for sale_item_id, sale_date, marked_price, inventory_item_id in sale_items.iterator():
+        additions = InventoryRecord.objects.filter(
+            inventory_item=inventory_item_id, record_type='ADD')
+        unit_cost = additions.filter(record_date__lte=sale_date).order_by(
+            '-record_date').values_list('unit_price', flat=True).first()
+        if unit_cost is None:
+            unit_cost = additions.order_by('record_date').values_list(
+                'unit_price', flat=True).first()
+        updated_sale_items.append(
+            SaleItem(id=sale_item_id, marked_price=marked_price, unit_cost=unit_cost))
+
+    SaleItem.objects.bulk_update(
+        updated_sale_items, ['marked_price', 'unit_cost'], batch_size=500)
+
+    from elites_retail_portal.debit.helpers.sales import rebuild_daily_sales_summaries
+    rebuild_daily_sales_summaries()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('debit', '0010_fill_stock_levels'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='saleitem',
+            name='marked_price',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=30, null=True, validators=[django.core.validators.MinValueValidator(0.0)]),
+        ),
+        migrations.AddField(
+            model_name='saleitem',
+            name='unit_cost',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=30, null=True, validators=[django.core.validators.MinValueValidator(0.0)]),
+        ),
+        migrations.RunPython(record_sale_item_prices, migrations.RunPython.noop),
+    ]
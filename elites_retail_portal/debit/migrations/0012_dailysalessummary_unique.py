@@ -0,0 +1,49 @@
+# Generated by Django 4.1.1 on 2026-10-18 23:30
+
+from django.db import migrations, models
+import django.db.models.functions.comparison
+
+SUMMARY_KEY_FIELDS = (
+    'enterprise', 'summary_date', 'catalog_item', 'served_by', 'payment_method')
+
+SUMMARY_TOTALS = ('quantity', 'gross_amount', 'discount_amount', 'cost_amount')
+
+
+def merge_duplicate_daily_sales_summaries(apps, schema_editor):
+    """Merge the daily sales summaries that share a key into the oldest of them."""
+    DailySalesSummary = apps.get_model('debit', 'DailySalesSummary')
+    duplicate_keys = DailySalesSummary.objects.values(*SUMMARY_KEY_FIELDS).annotate(
+        summaries=models.Count('id')).filter(summaries__gt=1).values(*SUMMARY_KEY_FIELDS)
+
+    for key in duplicate_keys:
+        summaries = list(DailySalesSummary.objects.filter(**key).order_by('created_on'))
+        summary = summaries[0]
+        for total in SUMMARY_TOTALS:
+            setattr(summary, total, sum(
+                getattr(duplicate, total) for duplicate in summaries))
+        summary.save(update_fields=SUMMARY_TOTALS)
+        DailySalesSummary.objects.filter(
+            id__in=[duplicate.id for duplicate in summaries[1:]]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('debit', '0011_saleitem_recorded_prices'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_duplicate_daily_sales_summaries, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='dailysalessummary',
+            constraint=models.UniqueConstraint(
+                models.F('enterprise'), models.F('summary_date'), models.F('catalog_item'),
+                django.db.models.functions.comparison.Coalesce(
+                    django.db.models.functions.comparison.Cast(
+                        'served_by', models.CharField()), models.Value('')),
+                django.db.models.functions.comparison.Coalesce(
+                    'payment_method', models.Value('')),
+                name='unique_daily_sales_summary'),
+        ),
+    ]
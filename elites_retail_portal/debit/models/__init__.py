@@ -1,11 +1,12 @@
 """."""
 
 from elites_retail_portal.debit.models.inventory import (
-    Inventory, InventoryItem, InventoryInventoryItem, InventoryRecord)
+    Inventory, InventoryItem, InventoryInventoryItem, InventoryRecord, StockLevel)
 from elites_retail_portal.debit.models.sales import (
-    Sale, SaleItem)
+    Sale, SaleItem, DailySalesSummary)
 from elites_retail_portal.debit.models.purchases_returns import PurchasesReturn
+from elites_retail_portal.debit.models.reports import ReportJob
 
 __all__ = (
-    'Inventory', 'InventoryItem', 'InventoryInventoryItem', 'InventoryRecord',
-    'Sale', 'SaleItem', 'PurchasesReturn')
+    'Inventory', 'InventoryItem', 'InventoryInventoryItem', 'InventoryRecord', 'StockLevel',
+    'Sale', 'SaleItem', 'DailySalesSummary', 'PurchasesReturn', 'ReportJob')
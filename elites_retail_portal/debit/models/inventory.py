@@ -1,7 +1,9 @@
 """Inventory models file."""
 
 from decimal import Decimal
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, F, Sum, Value, When, Window
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 
@@ -78,20 +80,16 @@ class InventoryItem(AbstractBase):
     @property
     def quantity(self):
         """Get total quantity of item in inventory."""
-        records = InventoryRecord.objects.filter(inventory_item=self)
-        if records:
-            record = records.latest('record_date')
-            return record.closing_stock_quantity
-        return 0
+        stock_level = StockLevel.objects.filter(
+            inventory_item=self).order_by('-record_date').first()
+        return stock_level.quantity if stock_level else 0
 
     @property
     def total_amount(self):
         """Get the total amount of item in inventory."""
-        records = InventoryRecord.objects.filter(inventory_item=self)
-        if records:
-            record = records.latest('record_date')
-            return record.closing_stock_total_amount
-        return 0
+        stock_level = StockLevel.objects.filter(
+            inventory_item=self).order_by('-record_date').first()
+        return stock_level.total_amount if stock_level else 0
 
     @property
     def unit_price(self):
@@ -175,37 +173,33 @@ class Inventory(AbstractBase):
     is_active = models.BooleanField(default=True)
     pushed_to_edi = models.BooleanField(default=False)
 
+    def get_stock_levels(self):
+        """Get the stock levels of the active inventory items in the inventory."""
+        return StockLevel.objects.filter(
+            inventory=self, enterprise=self.enterprise,
+            inventory_item__in=self.inventory_items.filter(is_active=True))
+
     @property
     def summary(self):
         """Summary."""
-        inventory_items = self.inventory_items.filter(is_active=True)
-        inventory_records = InventoryRecord.objects.filter(
-            inventory=self, inventory_item__in=inventory_items, enterprise=self.enterprise)
-
-        summary = []
-        if inventory_records.exists():
-            for inventory_item in inventory_items:
-                try:
-                    latest_inventory_item_record = inventory_records.filter(
-                        inventory_item=inventory_item).latest('record_date')
-                    quantity = latest_inventory_item_record.closing_stock_quantity
-                    total_amount = latest_inventory_item_record.closing_stock_total_amount
-                    data = {
-                        'inventory_item': inventory_item,
-                        'quantity': quantity,
-                        'total_amount': total_amount,
-                        }
-                    summary.append(data)
-                except Exception:
-                    pass
-
-        return summary
+        stock_levels = self.get_stock_levels().select_related(
+            'inventory_item').order_by('inventory_item__item__item_name')
+
+        return [
+            {
+                'inventory_item': stock_level.inventory_item,
+                'quantity': stock_level.quantity,
+                'total_amount': stock_level.total_amount,
+            } for stock_level in stock_levels]
+
+    def get_inventory_item_quantity(self, inventory_item):
+        """Get the quantity of an inventory item in the inventory."""
+        quantity = self.get_stock_levels().filter(
+            inventory_item=inventory_item).values_list('quantity', flat=True).first()
+        return quantity or 0
 
     def get_inventory_item_summary(self, inventory_item):
         """Get inventory item summary."""
-        records = InventoryRecord.objects.filter(
-            inventory=self, inventory_item=inventory_item)
-
         summary = {
             'opening_stock_quantity': 0,
             'opening_stock_total_amount': 0,
@@ -215,16 +209,19 @@ class Inventory(AbstractBase):
             'closing_stock_total_amount': 0,
         }
 
-        if not records.exists():
+        stock_level = StockLevel.objects.filter(
+            inventory=self, inventory_item=inventory_item).select_related(
+                'latest_record').first()
+        if not stock_level or not stock_level.latest_record:
             return summary
 
-        latest_record = records.latest('record_date')
+        latest_record = stock_level.latest_record
         summary['opening_stock_quantity'] = latest_record.opening_stock_quantity
         summary['opening_stock_total_amount'] = latest_record.opening_stock_total_amount
         summary['quantity_recorded'] = latest_record.quantity_recorded
         summary['total_amount_recorded'] = latest_record.total_amount_recorded
-        summary['closing_stock_quantity'] = latest_record.closing_stock_quantity
-        summary['closing_stock_total_amount'] = latest_record.closing_stock_total_amount
+        summary['closing_stock_quantity'] = stock_level.quantity
+        summary['closing_stock_total_amount'] = stock_level.total_amount
 
         return summary
 
@@ -625,6 +622,72 @@ class InventoryRecord(AbstractBase):
             self.__class__.objects.filter(id=self.id).update(updated_catalog=True)
             return
 
+    def get_stock_level(self):
+        """Get the locked running balance head of the record's inventory item.
+
+        The head of the first record of the inventory item is created empty before it is
+        locked, so that concurrent first records wait for each other on it too.
+        """
+        stock_levels = StockLevel.objects.select_for_update().filter(
+            inventory=self.inventory, inventory_item=self.inventory_item)
+        stock_level = stock_levels.first()
+        if stock_level:
+            return stock_level
+
+        try:
+            with transaction.atomic():
+                StockLevel(
+                    inventory=self.inventory, inventory_item=self.inventory_item,
+                    created_by=self.created_by, updated_by=self.updated_by,
+                    enterprise=self.enterprise).save(fast=True)
+        except IntegrityError:
+            # A concurrent first record created the head
+            pass
+
+        return stock_levels.get()
+
+    def recompute_later_records(self):
+        """Recompute the running balances of the records dated after this record.
+
+        The cumulative quantities and amounts are computed by the database in a single
+        windowed query over the affected suffix and written back with one bulk update.
+        """
+        signed_quantity = Case(
+            When(record_type=REMOVE, then=-F('quantity_recorded')),
+            default=F('quantity_recorded'), output_field=models.FloatField())
+        amount_recorded = Coalesce(
+            F('closing_stock_total_amount'), Value(0.0)) - Coalesce(
+                F('opening_stock_total_amount'), Value(0.0))
+        ordering = [F('record_date').asc(), F('created_on').asc(), F('id').asc()]
+        later_records = self.__class__.objects.filter(
+            inventory=self.inventory, inventory_item=self.inventory_item,
+            record_date__gt=self.record_date).annotate(
+                running_quantity=Window(Sum(signed_quantity), order_by=ordering),
+                running_amount=Window(Sum(amount_recorded), order_by=ordering),
+            ).order_by(*ordering)
+
+        opening_quantity = float(self.closing_stock_quantity or 0)
+        opening_amount = float(self.closing_stock_total_amount or 0)
+        records = []
+        for record in later_records:
+            quantity_recorded = -record.quantity_recorded if record.record_type == REMOVE \
+                else record.quantity_recorded
+            amount_recorded = float(record.closing_stock_total_amount or 0) - float(
+                record.opening_stock_total_amount or 0)
+            record.closing_stock_quantity = opening_quantity + record.running_quantity
+            record.opening_stock_quantity = record.closing_stock_quantity - quantity_recorded
+            record.closing_stock_total_amount = round(opening_amount + record.running_amount, 2)
+            record.opening_stock_total_amount = round(
+                record.closing_stock_total_amount - amount_recorded, 2)
+            records.append(record)
+
+        if records:
+            self.__class__.objects.bulk_update(records, [
+                'opening_stock_quantity', 'opening_stock_total_amount',
+                'closing_stock_quantity', 'closing_stock_total_amount'], batch_size=500)
+
+        return records
+
     def save(self, *args, **kwargs):
         """Perform pre save and post save actions on Catalog Item."""
         if not self.record_code:
@@ -633,23 +696,81 @@ class InventoryRecord(AbstractBase):
         record = self.__class__.objects.filter(id=self.id).first()
         if record:
             self.record_date = record.record_date if record.record_date else timezone.now()
-        self.get_opening_stock()
-        self.calculate_total_amount_recorded()
-        self.calculate_closing_stock_quantity()
-        super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            stock_level = self.get_stock_level()
+            is_append = bool(
+                not record and stock_level and stock_level.record_date and
+                self.record_date >= stock_level.record_date)
+            if is_append:
+                # Appending to the ledger, the head row holds the opening balances
+                self.opening_stock_quantity = stock_level.quantity
+                self.opening_stock_total_amount = stock_level.total_amount
+            else:
+                self.get_opening_stock()
+            self.calculate_total_amount_recorded()
+            self.calculate_closing_stock_quantity()
+            # The record was read above, so the base checks that read it again are skipped
+            kwargs.setdefault('fast', True)
+            super().save(*args, **kwargs)
+            later_records = [] if is_append else self.recompute_later_records()
+            latest_record = later_records[-1] if later_records else self
+            StockLevel.update_from_record(latest_record, stock_level)
+
         self.update_catalog_item()
-        existing_record = self.__class__.objects.filter(id=self.id).first()
-        if existing_record:
-            for record in InventoryRecord.objects.filter(
-                    inventory=self.inventory, inventory_item=self.inventory_item,
-                    record_date__gt=self.record_date):
-                # NOTE If you remove the record date check it will loop infinitely
-                record.save()
+        later_additions = [record for record in later_records if record.record_type == ADD]
+        if later_additions:
+            # The catalog item takes its marked price from the latest addition
+            later_additions[-1].update_catalog_item()
 
     class Meta:
         """Meta class for Base Inventory class."""
 
         ordering = ['inventory_item__item__item_name']
+        indexes = [
+            models.Index(
+                fields=['enterprise', '-created_on', '-id'],
+                name='inventory_record_keyset_idx'),
+        ]
+
+
+class StockLevel(AbstractBase):
+    """Running stock balance of an inventory item in an inventory.
+
+    This is the head row of the inventory ledger. It mirrors the closing balances of the
+    latest inventory record so that new records can be appended without scanning history.
+    """
+
+    inventory = models.ForeignKey(Inventory, on_delete=models.PROTECT)
+    inventory_item = models.ForeignKey(InventoryItem, on_delete=models.PROTECT)
+    latest_record = models.ForeignKey(
+        InventoryRecord, null=True, blank=True, on_delete=models.SET_NULL)
+    record_date = models.DateTimeField(null=True, blank=True)
+    quantity = models.FloatField(default=0)
+    total_amount = models.FloatField(default=0)
+
+    @classmethod
+    def update_from_record(cls, record, stock_level):
+        """Move the head of the ledger to the given record."""
+        cls.objects.filter(id=stock_level.id).update(
+            latest_record=record, record_date=record.record_date,
+            quantity=float(record.closing_stock_quantity or 0),
+            total_amount=float(record.closing_stock_total_amount or 0),
+            updated_by=record.updated_by, updated_on=timezone.now())
+
+    def __str__(self):
+        """Str representation for the stock level model."""
+        return '{} -> {}'.format(
+            self.inventory.inventory_name, self.inventory_item.item.item_name)
+
+    class Meta:
+        """Meta class for stock level model."""
+
+        constraints = [
+            models.UniqueConstraint(
+                fields=['inventory', 'inventory_item'],
+                name='unique_stock_level_per_inventory_item')
+        ]
 
 
 def get_latest_inventory_record(inventory, inventory_item):
@@ -0,0 +1,100 @@
+"""Report jobs model file."""
+
+import json
+import hashlib
+
+from django.db import models
+from django.utils import timezone
+from django.core.files.storage import default_storage
+
+from elites_retail_portal.common.models import AbstractBase
+
+REPORTS_DIRECTORY = 'reports'
+
+REPORT_TYPE_CHOICES = (
+    ('SALES', 'SALES'),
+    ('STOCK', 'STOCK'),
+    ('PAYMENTS', 'PAYMENTS'),
+)
+
+REPORT_FILE_TYPE_CHOICES = (
+    ('PDF', 'PDF'),
+    ('XLSX', 'XLSX'),
+)
+
+REPORT_JOB_STATUS_CHOICES = (
+    ('PENDING', 'PENDING'),
+    ('ONGOING', 'ONGOING'),
+    ('SUCCESS', 'SUCCESS'),
+    ('FAILED', 'FAILED'),
+)
+
+
+class ReportJob(AbstractBase):
+    """Report rendered in the background.
+
+    The rendered files are stored by a key computed from the enterprise, the report,
+    its parameters and a watermark of the report's data. A job whose key has already
+    been rendered reuses the stored file instead of rendering the report again.
+    """
+
+    report_type = models.CharField(max_length=300, choices=REPORT_TYPE_CHOICES)
+    file_type = models.CharField(
+        max_length=300, choices=REPORT_FILE_TYPE_CHOICES, default='PDF')
+    parameters = models.JSONField(null=True, blank=True, default=dict)
+    file_name = models.CharField(max_length=300, null=True, blank=True)
+    watermark = models.CharField(max_length=300, null=True, blank=True)
+    cache_key = models.CharField(max_length=300, null=True, blank=True, db_index=True)
+    artifact = models.FileField(upload_to=REPORTS_DIRECTORY, null=True, blank=True)
+    status = models.CharField(
+        max_length=300, choices=REPORT_JOB_STATUS_CHOICES, default='PENDING')
+    failure_reason = models.TextField(null=True, blank=True)
+    completed_on = models.DateTimeField(null=True, blank=True)
+
+    @property
+    def artifact_name(self):
+        """Get the name of the file the report is stored in."""
+        return '{}/{}.{}'.format(REPORTS_DIRECTORY, self.cache_key, self.file_type.lower())
+
+    def get_file_name(self):
+        """Get the name of the file the report is downloaded as."""
+        if not self.file_name:
+            from elites_retail_portal.debit.helpers.reports import get_report_file_name
+            self.file_name = get_report_file_name(self)
+
+    def get_cache_key(self):
+        """Compute the key the rendered report is stored under."""
+        from elites_retail_portal.debit.helpers.reports import get_report_watermark
+        self.watermark = get_report_watermark(self.enterprise, self.report_type)
+        key_data = json.dumps({
+            'enterprise': self.enterprise,
+            'report_type': self.report_type,
+            'file_type': self.file_type,
+            'parameters': self.parameters or {},
+            'watermark': self.watermark,
+        }, sort_keys=True, default=str)
+        self.cache_key = hashlib.sha256(key_data.encode()).hexdigest()
+
+    def get_cached_artifact(self):
+        """Reuse the report file rendered for the same key if there is one."""
+        if default_storage.exists(self.artifact_name):
+            self.artifact.name = self.artifact_name
+            self.status = 'SUCCESS'
+            self.completed_on = timezone.now()
+
+    def save(self, *args, **kwargs):
+        """Perform pre save and post save actions."""
+        adding = self._state.adding
+        if adding:
+            self.get_file_name()
+            self.get_cache_key()
+            self.get_cached_artifact()
+
+        super().save(*args, **kwargs)
+
+        if adding and self.status == 'PENDING':
+            from elites_retail_portal.debit.tasks import schedule_report_job_rendering
+            schedule_report_job_rendering(self)
+
+    class Meta:
+        """Meta class for report job model."""
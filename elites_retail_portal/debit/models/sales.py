@@ -2,7 +2,9 @@
 
 from decimal import Decimal
 from django.db import models
-from django.db.models import Q
+from django.db.models import F, Q, Value
+from django.db.models.functions import Cast, Coalesce
+from django.db.models.signals import pre_delete
 from django.utils import timezone
 from django.core.validators import MinValueValidator
 
@@ -14,6 +16,7 @@ from elites_retail_portal.debit.models import InventoryRecord
 from elites_retail_portal.orders.models.orders import Order
 from elites_retail_portal.encounters.models import Encounter
 from elites_retail_portal.enterprise_mgt.helpers import get_valid_enterprise_setup_rules
+from elites_retail_portal.enterprises.models import Staff
 from elites_retail_portal.items.models import Product
 
 SALE_TYPE_CHOICES = (
@@ -140,6 +143,12 @@ class SaleItem(AbstractBase):
     amount_paid = models.DecimalField(
         max_digits=30, decimal_places=2, validators=[MinValueValidator(0.00)],
         null=True, blank=True, default=0)
+    marked_price = models.DecimalField(
+        max_digits=30, decimal_places=2, validators=[MinValueValidator(0.00)],
+        null=True, blank=True)
+    unit_cost = models.DecimalField(
+        max_digits=30, decimal_places=2, validators=[MinValueValidator(0.00)],
+        null=True, blank=True)
     quantity_sold = models.FloatField()
     processing_status = models.CharField(
         max_length=300, choices=SALE_RECORD_PROCESSING_STATUS_CHOICES,
@@ -155,10 +164,45 @@ class SaleItem(AbstractBase):
         """Clean sale model."""
         super().clean()
 
+    def get_recorded_prices(self):
+        """Record the marked price and the unit cost of the catalog item as of the sale.
+
+        The unit cost is the unit price of the last addition of the inventory item on or
+        before the sale, or of its first addition if it was only added after the sale.
+        """
+        if self.marked_price is None:
+            self.marked_price = self.catalog_item.marked_price
+
+        if self.unit_cost is None:
+            additions = InventoryRecord.objects.filter(
+                inventory_item=self.catalog_item.inventory_item_id, record_type='ADD')
+            self.unit_cost = additions.filter(
+                record_date__lte=self.sale.sale_date).order_by('-record_date').values_list(
+                    'unit_price', flat=True).first()
+            if self.unit_cost is None:
+                self.unit_cost = additions.order_by('record_date').values_list(
+                    'unit_price', flat=True).first()
+
+    def get_daily_sales_contributions(self):
+        """Get what the sale item adds to the daily sales summaries."""
+        from elites_retail_portal.debit.helpers.sales import get_daily_sales_contributions
+        return get_daily_sales_contributions(self.__class__.objects.filter(id=self.id))
+
+    def update_daily_sales_summaries(self, old_contributions):
+        """Apply the change of what the sale item adds to the daily sales summaries."""
+        from elites_retail_portal.debit.helpers.sales import update_daily_sales_summaries
+        update_daily_sales_summaries(old_contributions, self.get_daily_sales_contributions())
+
     def save(self, *args, **kwargs):
         """Perform pre save and post save actions."""
         self.total_amount = Decimal(float(self.selling_price) * self.quantity_sold)
+        old_contributions = {}
+        if self._state.adding:
+            self.get_recorded_prices()
+        else:
+            old_contributions = self.get_daily_sales_contributions()
         super().save(*args, **kwargs)
+        self.update_daily_sales_summaries(old_contributions)
         if self.is_cleared:
             enterprise_setup_rules = get_valid_enterprise_setup_rules(self.enterprise)
             available_inventory = enterprise_setup_rules.available_inventory
@@ -182,3 +226,65 @@ class SaleItem(AbstractBase):
                     quantity_recorded=self.quantity_sold, unit_price=self.selling_price,
                     quantity_sold=self.quantity_sold, record_type='REMOVE',
                     removal_type='SALES', removal_guid=self.id, **audit_fields)
+
+    class Meta:
+        """Meta class for sale item model."""
+
+        indexes = [
+            models.Index(
+                fields=['enterprise', '-created_on', '-id'], name='sale_item_keyset_idx'),
+        ]
+
+
+def remove_sale_item_from_daily_sales_summaries(sender, instance, **kwargs):
+    """Take a sale item being deleted out of its daily sales summaries.
+
+    Connected to pre_delete so sale items deleted in a queryset or by a cascade are covered.
+    """
+    from elites_retail_portal.debit.helpers.sales import update_daily_sales_summaries
+    update_daily_sales_summaries(instance.get_daily_sales_contributions(), {})
+
+
+pre_delete.connect(
+    remove_sale_item_from_daily_sales_summaries, sender=SaleItem,
+    dispatch_uid='daily_sales_summaries_sale_item_pre_delete')
+
+
+class DailySalesSummary(AbstractBase):
+    """Sales of a catalog item on a day, by the staff who served and the payment method.
+
+    The quantity and amounts are net of the sales returns. The change a sale item or sales
+    return makes is applied to its summary whenever it is written, so reports can read the
+    closed days from here instead of the sale items.
+    """
+
+    summary_date = models.DateField(db_index=True)
+    catalog_item = models.ForeignKey(CatalogItem, on_delete=models.PROTECT)
+    served_by = models.ForeignKey(Staff, null=True, blank=True, on_delete=models.PROTECT)
+    payment_method = models.CharField(max_length=300, null=True, blank=True)
+    quantity = models.FloatField(default=0)
+    gross_amount = models.DecimalField(max_digits=30, decimal_places=2, default=0)
+    discount_amount = models.DecimalField(max_digits=30, decimal_places=2, default=0)
+    cost_amount = models.DecimalField(max_digits=30, decimal_places=2, default=0)
+
+    def __str__(self):
+        """Str representation for the daily sales summary model."""
+        return '{} -> {}'.format(self.summary_date, self.catalog_item_id)
+
+    class Meta:
+        """Meta class for daily sales summary model."""
+
+        indexes = [
+            models.Index(
+                fields=['enterprise', 'summary_date', 'catalog_item'],
+                name='daily_sales_summary_idx'),
+        ]
+        constraints = [
+            # The server and payment method are nullable, and nulls never clash in a unique
+            # index, so they are compared through coalesce
+            models.UniqueConstraint(
+                F('enterprise'), F('summary_date'), F('catalog_item'),
+                Coalesce(Cast('served_by', models.CharField()), Value('')),
+                Coalesce('payment_method', Value('')),
+                name='unique_daily_sales_summary'),
+        ]
@@ -1,10 +1,13 @@
 """Debit side serializers."""
 
+from rest_framework import serializers
 from rest_framework.fields import (
     SerializerMethodField, ReadOnlyField, CharField)
 
 from elites_retail_portal.common.serializers import BaseSerializerMixin
 from elites_retail_portal.debit import models
+from elites_retail_portal.debit.stock.reports import (
+    ITEMS_HISTORY_MAX_PAGE_SIZE, ITEMS_HISTORY_PAGE_SIZE)
 
 
 class InventorySerializer(BaseSerializerMixin):
@@ -93,3 +96,30 @@ class PurchasesReturnSerializer(BaseSerializerMixin):
 
         model = models.PurchasesReturn
         fields = '__all__'
+
+
+class ReportJobSerializer(BaseSerializerMixin):
+    """Report Job serializer class."""
+
+    class Meta:
+        """Report Job Meta class."""
+
+        model = models.ReportJob
+        fields = '__all__'
+        read_only_fields = (
+            'file_name', 'watermark', 'cache_key', 'artifact', 'status',
+            'failure_reason', 'completed_on')
+
+
+class ItemsHistoryPageSerializer(serializers.Serializer):
+    """Validate the page of the items history to generate.
+
+    The page size is capped at ITEMS_HISTORY_MAX_PAGE_SIZE items.
+    """
+
+    page = serializers.IntegerField(min_value=1, required=False, allow_null=True)
+    page_size = serializers.IntegerField(min_value=1, default=ITEMS_HISTORY_PAGE_SIZE)
+
+    def validate_page_size(self, page_size):
+        """Cap the page size."""
+        return min(page_size, ITEMS_HISTORY_MAX_PAGE_SIZE)
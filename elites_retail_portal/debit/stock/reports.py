@@ -1,104 +1,112 @@
 """Stock report workflow."""
 
-from operator import itemgetter
+import datetime
+from collections import defaultdict
+from operator import attrgetter, itemgetter
+
+from django.db.models import FloatField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 
 from elites_retail_portal.catalog.models import CatalogItem
 from elites_retail_portal.debit.models import (
-    InventoryItem, InventoryRecord, PurchasesReturn, SaleItem)
+    InventoryItem, InventoryRecord, PurchasesReturn, SaleItem, StockLevel)
 from elites_retail_portal.items.models import Item
 from elites_retail_portal.items.serializers import ItemSerializer
 from elites_retail_portal.enterprise_mgt.helpers import (
     get_valid_enterprise_setup_rules)
-from elites_retail_portal.warehouses.models import WarehouseItem, WarehouseRecord
+from elites_retail_portal.warehouses.models import WarehouseRecord
 from elites_retail_portal.credit.models import PurchaseItem, SalesReturn
 
+ITEMS_HISTORY_PAGE_SIZE = 50
+ITEMS_HISTORY_MAX_PAGE_SIZE = 200
+
+
+def get_stock_balances(catalog_items, available_inventory, default_warehouse):
+    """Annotate catalog items with their latest inventory and warehouse balances."""
+    inventory_quantity = StockLevel.objects.filter(
+        inventory=available_inventory, inventory_item=OuterRef('inventory_item'),
+        latest_record__isnull=False).values('quantity')[:1]
+    warehouse_quantity = WarehouseRecord.objects.filter(
+        warehouse=default_warehouse,
+        warehouse_item__item=OuterRef('inventory_item__item')).order_by(
+            '-record_date').values('closing_quantity')[:1]
+
+    return catalog_items.select_related('inventory_item__item').annotate(
+        quantity_in_inventory=Coalesce(
+            Subquery(inventory_quantity), Value(0), output_field=FloatField()),
+        quantity_in_warehouse=Coalesce(
+            Subquery(warehouse_quantity), Value(0), output_field=FloatField()))
+
+
+def get_stock_report_rows(inventory_items, all=True):
+    """Yield the rows of the stock report.
+
+    The balances are read in one query for all catalog items, then the uncataloged
+    inventory items and the items without inventory items are added when all is set.
+    """
+    enterprise_code = inventory_items[0].enterprise
+    enterprise_setup_rules = get_valid_enterprise_setup_rules(enterprise_code)
+    catalog_items = get_stock_balances(
+        CatalogItem.objects.filter(inventory_item__in=inventory_items),
+        enterprise_setup_rules.available_inventory, enterprise_setup_rules.default_warehouse)
+
+    for catalog_item in catalog_items.iterator():
+        item = catalog_item.inventory_item.item
+        yield {
+            'item': item.item_name,
+            'quantity_in_catalog': catalog_item.quantity,
+            'quantity_in_warehouse': catalog_item.quantity_in_warehouse,
+            'quantity_in_inventory': catalog_item.quantity_in_inventory,
+            'status': 'ACTIVE' if item.is_active else "INACTIVE",
+            'marked_price': catalog_item.marked_price,
+            'selling_price': catalog_item.selling_price,
+            'threshold_price': catalog_item.threshold_price,
+        }
+
+    if not all:
+        return
+
+    uncataloged_items = Item.objects.filter(
+        id__in=inventory_items.exclude(
+            id__in=CatalogItem.objects.filter(
+                inventory_item__in=inventory_items).values('inventory_item')).values('item'))
+    excluded_items = Item.objects.filter(enterprise=enterprise_code).exclude(
+        id__in=inventory_items.values('item'))
+
+    for items in [uncataloged_items, excluded_items]:
+        for item in items.iterator():
+            yield {
+                'item': item.item_name,
+                'quantity_in_catalog': 0,
+                'quantity_in_warehouse': 0,
+                'quantity_in_inventory': 0,
+                'status': 'ACTIVE' if item.is_active else "INACTIVE",
+                'marked_price': 0,
+                'selling_price': 0,
+                'threshold_price': 0,
+            }
+
 
 def create_report_data(inventory_items, all=True):
     """Create report data."""
     stock_data = []
-    totals_data = {}
-    total_quantity_in_catalog = 0
-    total_quantity_in_warehouse = 0
-    total_quantity_in_inventory = 0
-    available_inventory = get_valid_enterprise_setup_rules(
-        inventory_items[0].enterprise).available_inventory
-    default_warehouse = get_valid_enterprise_setup_rules(
-        inventory_items[0].enterprise).default_warehouse
-
-    if all:
-        inventory_items_ids = list(map(str, inventory_items.values_list('id', flat=True)))
-        included_items_ids = list(map(str, inventory_items.values_list('item__id', flat=True)))
-        catalog_items = CatalogItem.objects.filter(inventory_item__id__in=inventory_items_ids)
-        cataloged_inventory_items_ids = list(
-            map(str, catalog_items.values_list('inventory_item__id', flat=True)))
-        uncataloged_inventory_items = InventoryItem.objects.exclude(
-            id__in=cataloged_inventory_items_ids)
-        excluded_items = Item.objects.exclude(id__in=included_items_ids)
-
-        if catalog_items:
-            for catalog_item in catalog_items:
-                warehouse_item = WarehouseItem.objects.get(
-                    item=catalog_item.inventory_item.item)
-                inventory_summary = available_inventory.get_inventory_item_summary(
-                    catalog_item.inventory_item)
-                warehouse_summary = default_warehouse.get_warehouse_item_summary(warehouse_item)
-                data = {
-                    'item': catalog_item.inventory_item.item.item_name,
-                    'quantity_in_catalog': catalog_item.quantity,
-                    'quantity_in_warehouse': warehouse_summary['closing_quantity'],
-                    'quantity_in_inventory': inventory_summary['closing_stock_quantity'],
-                    'status': 'ACTIVE' if catalog_item.inventory_item.item.is_active else "INACTIVE",   # noqa
-                    'marked_price': catalog_item.marked_price,
-                    'selling_price': catalog_item.selling_price,
-                    'threshold_price': catalog_item.threshold_price,
-                }
-                stock_data.append(data)
-                total_quantity_in_catalog += data['quantity_in_catalog']
-                total_quantity_in_warehouse += data['quantity_in_warehouse']
-                total_quantity_in_inventory += data['quantity_in_inventory']
-
-        if uncataloged_inventory_items:
-            for inventory_item in uncataloged_inventory_items:
-                data = {
-                    'item': inventory_item.item.item_name,
-                    'quantity_in_catalog': 0,
-                    'quantity_in_warehouse': 0,
-                    'quantity_in_inventory': 0,
-                    'status': 'ACTIVE' if inventory_item.item.is_active else "INACTIVE",
-                    'marked_price': 0,
-                    'selling_price': 0,
-                    'threshold_price': 0,
-                }
-                stock_data.append(data)
-                total_quantity_in_catalog += data['quantity_in_catalog']
-                total_quantity_in_warehouse += data['quantity_in_warehouse']
-                total_quantity_in_inventory += data['quantity_in_inventory']
-
-        if excluded_items:
-            for item in excluded_items:
-                data = {
-                    'item': item.item_name,
-                    'quantity_in_catalog': 0,
-                    'quantity_in_warehouse': 0,
-                    'quantity_in_inventory': 0,
-                    'status': 'ACTIVE' if item.is_active else "INACTIVE",
-                    'marked_price': 0,
-                    'selling_price': 0,
-                    'threshold_price': 0,
-                }
-                stock_data.append(data)
-                total_quantity_in_catalog += data['quantity_in_catalog']
-                total_quantity_in_warehouse += data['quantity_in_warehouse']
-                total_quantity_in_inventory += data['quantity_in_inventory']
-
-        totals_data['quantity_in_catalog'] = total_quantity_in_catalog
-        totals_data['quantity_in_warehouse'] = total_quantity_in_warehouse
-        totals_data['quantity_in_inventory'] = total_quantity_in_inventory
-
-        return {
-            "stock_data": stock_data,
-            "totals_data": totals_data,
-        }
+    totals_data = {
+        'quantity_in_catalog': 0,
+        'quantity_in_warehouse': 0,
+        'quantity_in_inventory': 0,
+    }
+
+    for data in get_stock_report_rows(inventory_items, all):
+        stock_data.append(data)
+        for total in totals_data:
+            totals_data[total] += data[total]
+
+    return {
+        "stock_data": stock_data,
+        "totals_data": totals_data,
+    }
 
 
 def generate_stock_report(enterprise_code, inventory_items=[]):
@@ -112,229 +120,243 @@ def generate_stock_report(enterprise_code, inventory_items=[]):
         return create_report_data(inventory_items, all=True)
 
 
-def get_item_history(enterprise_code, item):    # noqa
-    """Generate item history."""
-    item_history = []
-    warehouse_item_onboarding_record = None
-    inventory_item_onboarding_record = None
-    warehouse_item_onboarding_records = WarehouseRecord.objects.filter(
-        warehouse_item__item=item, opening_quantity=0,
-        opening_total_amount=0,  record_type="ADD",
-        enterprise=enterprise_code, addition_guid__isnull=True)
-    if warehouse_item_onboarding_records.exists():
-        warehouse_item_onboarding_record = warehouse_item_onboarding_records.earliest(
-            'record_date')
-
-    if warehouse_item_onboarding_record:
-        data = {
-            "date": warehouse_item_onboarding_record.record_date,
-            "item": warehouse_item_onboarding_record.warehouse_item.item.item_name,
-            "quantity": warehouse_item_onboarding_record.quantity_recorded,
-            "unit_price": warehouse_item_onboarding_record.unit_price,
-            "total": float(
-                warehouse_item_onboarding_record.unit_price) * float(
-                    warehouse_item_onboarding_record.quantity_recorded),
-            "source": "WAREHOUSE",
-            "type": "ONBOARDING",
-        }
+def compose_history_entry(date, item_name, quantity, unit_price, source, entry_type):
+    """Compose an entry of the item history."""
+    return {
+        "date": date,
+        "item": item_name,
+        "quantity": quantity,
+        "unit_price": unit_price,
+        "total": float(unit_price) * float(quantity),
+        "source": source,
+        "type": entry_type,
+    }
 
-        item_history.append(data)
-
-    inventory_item_onboarding_records = InventoryRecord.objects.filter(
-        inventory_item__item=item, opening_stock_quantity=0,
-        opening_stock_total_amount=0,  record_type="ADD",
-        enterprise=enterprise_code, addition_guid__isnull=True)
-
-    if inventory_item_onboarding_records.exists():
-        inventory_item_onboarding_record = inventory_item_onboarding_records.earliest(
-            'record_date')
-
-    if inventory_item_onboarding_record:
-        data = {
-            "date": inventory_item_onboarding_record.record_date,
-            "item": inventory_item_onboarding_record.inventory_item.item.item_name,
-            "quantity": inventory_item_onboarding_record.quantity_recorded,
-            "unit_price": inventory_item_onboarding_record.unit_price,
-            "total": float(
-                inventory_item_onboarding_record.unit_price) * float(
-                    inventory_item_onboarding_record.quantity_recorded),
-            "source": "INVENTORY",
-            "type": "ONBOARDING",
-        }
-        item_history.append(data)
 
-    warehouse_records = WarehouseRecord.objects.filter(
-        warehouse_item__item=item, enterprise=enterprise_code, addition_guid__isnull=True,
-        removal_guid__isnull=True)
-    if warehouse_records.exists() and warehouse_item_onboarding_record:
-        warehouse_records = warehouse_records.exclude(id=warehouse_item_onboarding_record.id)
-        if warehouse_records:
-            for warehouse_record in warehouse_records:
-                data = {
-                    "date": warehouse_record.record_date,
-                    "item": warehouse_record.warehouse_item.item.item_name,
-                    "quantity": warehouse_record.quantity_recorded,
-                    "unit_price": warehouse_record.unit_price,
-                    "total": float(
-                        warehouse_record.unit_price) * float(
-                            warehouse_record.quantity_recorded),
-                    "source": "WAREHOUSE",
-                    "type": "ADDITION",
-                }
-                item_history.append(data)
+def group_by(records, key):
+    """Group records by key preserving their order."""
+    groups = defaultdict(list)
+    for record in records:
+        groups[key(record)].append(record)
+
+    return groups
+
+
+def get_history_datetime(value, end_of_day=False):
+    """Convert a boundary of the history window to an aware datetime."""
+    if isinstance(value, str):
+        value = parse_datetime(value) or parse_date(value)
+
+    if not isinstance(value, datetime.datetime):
+        value = datetime.datetime.combine(
+            value, datetime.time.max if end_of_day else datetime.time.min)
+
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+
+    return value
+
+
+def get_onboarding_records(records, item_key):
+    """Get the earliest onboarding record of every item."""
+    onboarding_records = {}
+    for record in records.order_by('record_date'):
+        onboarding_records.setdefault(item_key(record), record)
+
+    return onboarding_records
 
-    warehouse_records = WarehouseRecord.objects.filter(
-        warehouse_item__item=item, enterprise=enterprise_code, addition_guid__isnull=True,
-        removal_guid__isnull=False)
-    if warehouse_records.exists():
-        for warehouse_record in warehouse_records:
-            data = {
-                "date": warehouse_record.record_date,
-                "item": warehouse_record.warehouse_item.item.item_name,
-                "quantity": warehouse_record.quantity_recorded,
-                "unit_price": warehouse_record.unit_price,
-                "total": float(
-                    warehouse_record.unit_price) * float(
-                        warehouse_record.quantity_recorded),
-                "source": "WAREHOUSE",
-                "type": "REMOVAL",
-            }
-            item_history.append(data)
-
-            inventory_records = InventoryRecord.objects.filter(addition_guid=warehouse_record.id)
-            if inventory_records.exists():
-                for inventory_record in inventory_records:
-                    data = {
-                        "date": inventory_record.record_date,
-                        "item": inventory_record.inventory_item.item.item_name,
-                        "quantity": inventory_record.quantity_recorded,
-                        "unit_price": inventory_record.unit_price,
-                        "total": float(
-                            inventory_record.unit_price) * float(
-                                inventory_record.quantity_recorded),
-                        "source": "INVENTORY",
-                        "type": "ADDITION",
-                    }
-                    item_history.append(data)
 
+def get_warehouse_movements(enterprise_code, item_ids, end_filter):
+    """Get the warehouse movements and the inventory additions they fed, grouped by item."""
+    onboarding, movements = defaultdict(list), defaultdict(list)
+    warehouse_records = WarehouseRecord.objects.filter(
+        warehouse_item__item__in=item_ids, enterprise=enterprise_code,
+        addition_guid__isnull=True).select_related('warehouse_item__item')
+    item_key = attrgetter('warehouse_item.item_id')
+
+    onboarding_records = get_onboarding_records(warehouse_records.filter(
+        opening_quantity=0, opening_total_amount=0, record_type="ADD"), item_key)
+    for item_id, record in onboarding_records.items():
+        onboarding[item_id].append(compose_history_entry(
+            record.record_date, record.warehouse_item.item.item_name,
+            record.quantity_recorded, record.unit_price, "WAREHOUSE", "ONBOARDING"))
+
+    additions = warehouse_records.filter(
+        warehouse_item__item__in=onboarding_records.keys(), removal_guid__isnull=True,
+        **end_filter).exclude(
+            id__in=[record.id for record in onboarding_records.values()])
+    removals = list(warehouse_records.filter(removal_guid__isnull=False, **end_filter))
+    inventory_additions = group_by(InventoryRecord.objects.filter(
+        addition_guid__in=[removal.id for removal in removals], **end_filter).select_related(
+            'inventory_item__item'), attrgetter('addition_guid'))
+
+    for record in additions:
+        movements[item_key(record)].append(compose_history_entry(
+            record.record_date, record.warehouse_item.item.item_name,
+            record.quantity_recorded, record.unit_price, "WAREHOUSE", "ADDITION"))
+
+    for record in removals:
+        movements[item_key(record)].append(compose_history_entry(
+            record.record_date, record.warehouse_item.item.item_name,
+            record.quantity_recorded, record.unit_price, "WAREHOUSE", "REMOVAL"))
+        for inventory_record in inventory_additions[record.id]:
+            movements[item_key(record)].append(compose_history_entry(
+                inventory_record.record_date, inventory_record.inventory_item.item.item_name,
+                inventory_record.quantity_recorded, inventory_record.unit_price,
+                "INVENTORY", "ADDITION"))
+
+    return onboarding, movements
+
+
+def get_inventory_movements(enterprise_code, item_ids, end_filter):
+    """Get the inventory onboarding and additions that did not come from the warehouse."""
+    onboarding, additions = defaultdict(list), defaultdict(list)
     inventory_records = InventoryRecord.objects.filter(
-        inventory_item__item=item, enterprise=enterprise_code, addition_guid__isnull=True,
-        removal_guid__isnull=True)
-    if inventory_records.exists() and inventory_item_onboarding_record:
-        inventory_records = inventory_records.exclude(id=inventory_item_onboarding_record.id)
-        if inventory_records:
-            for inventory_record in inventory_records:
-                data = {
-                    "date": inventory_record.record_date,
-                    "item": inventory_record.inventory_item.item.item_name,
-                    "quantity": inventory_record.quantity_recorded,
-                    "unit_price": inventory_record.unit_price,
-                    "total": float(
-                        inventory_record.unit_price) * float(
-                            inventory_record.quantity_recorded),
-                    "source": "INVENTORY",
-                    "type": "ADDITION",
-                }
-                item_history.append(data)
-
-    purchase_items = PurchaseItem.objects.filter(item=item)
-    if purchase_items:
-        for purchase_item in purchase_items:
-            data = {
-                "date": purchase_item.purchase.purchase_date,
-                "item": purchase_item.item.item_name,
-                "opening_quantity": 0,
-                "quantity": purchase_item.quantity_purchased,
-                "closing_quantity": purchase_item.quantity_purchased,
-                "unit_price": purchase_item.unit_cost,
-                "total": float(
-                    purchase_item.unit_cost) * float(purchase_item.quantity_purchased),
-                "source": "PURCHASES",
-                "type": "ADDITION",
-            }
+        inventory_item__item__in=item_ids, enterprise=enterprise_code,
+        addition_guid__isnull=True).select_related('inventory_item__item')
+    item_key = attrgetter('inventory_item.item_id')
+
+    onboarding_records = get_onboarding_records(inventory_records.filter(
+        opening_stock_quantity=0, opening_stock_total_amount=0, record_type="ADD"), item_key)
+    for item_id, record in onboarding_records.items():
+        onboarding[item_id].append(compose_history_entry(
+            record.record_date, record.inventory_item.item.item_name,
+            record.quantity_recorded, record.unit_price, "INVENTORY", "ONBOARDING"))
+
+    records = inventory_records.filter(
+        inventory_item__item__in=onboarding_records.keys(), removal_guid__isnull=True,
+        **end_filter).exclude(id__in=[record.id for record in onboarding_records.values()])
+    for record in records:
+        additions[item_key(record)].append(compose_history_entry(
+            record.record_date, record.inventory_item.item.item_name,
+            record.quantity_recorded, record.unit_price, "INVENTORY", "ADDITION"))
+
+    return onboarding, additions
+
+
+def get_purchase_movements(item_ids, end_filter):
+    """Get the purchases of the items and their returns, grouped by item."""
+    movements = defaultdict(list)
+    purchase_items = list(PurchaseItem.objects.filter(
+        item__in=item_ids, **{
+            f'purchase__purchase_{lookup}': value for lookup, value in end_filter.items()}
+    ).select_related('purchase', 'item'))
+    purchases_returns = group_by(PurchasesReturn.objects.filter(
+        purchase_item__in=purchase_items).select_related('purchase_item__item'),
+        attrgetter('purchase_item_id'))
+
+    for purchase_item in purchase_items:
+        movements[purchase_item.item_id].append(compose_history_entry(
+            purchase_item.purchase.purchase_date, purchase_item.item.item_name,
+            purchase_item.quantity_purchased, purchase_item.unit_cost, "PURCHASES", "ADDITION"))
+        purchase_return = next(iter(purchases_returns[purchase_item.id]), None)
+        if purchase_return:
+            movements[purchase_item.item_id].append(compose_history_entry(
+                purchase_return.return_date, purchase_return.purchase_item.item.item_name,
+                purchase_return.quantity_returned, purchase_return.unit_cost,
+                "PURCHASES", "REMOVAL"))
+
+    return movements
+
+
+def get_sale_movements(item_ids, end_filter):
+    """Get the sales of the items and their returns, grouped by item."""
+    movements = defaultdict(list)
+    sale_items = list(SaleItem.objects.filter(
+        catalog_item__inventory_item__item__in=item_ids, **{
+            f'sale__sale_{lookup}': value for lookup, value in end_filter.items()}
+    ).select_related('sale', 'catalog_item__inventory_item__item'))
+    sales_returns = group_by(SalesReturn.objects.filter(
+        sale_item__in=sale_items).select_related(
+            'sale_item__catalog_item__inventory_item__item'), attrgetter('sale_item_id'))
 
-            item_history.append(data)
-
-            purchase_return = PurchasesReturn.objects.filter(purchase_item=purchase_item).first()
-            if purchase_return:
-                data = {
-                    "date": purchase_return.return_date,
-                    "item": purchase_return.purchase_item.item.item_name,
-                    "opening_quantity": 0,
-                    "quantity": purchase_return.quantity_returned,
-                    "closing_quantity": purchase_return.quantity_returned,
-                    "unit_price": purchase_return.unit_cost,
-                    "total": float(
-                        purchase_return.unit_cost) * float(purchase_return.quantity_returned),
-                    "source": "PURCHASES",
-                    "type": "REMOVAL",
-                }
-                item_history.append(data)
-
-    sale_items = SaleItem.objects.filter(catalog_item__inventory_item__item=item)
     for sale_item in sale_items:
-        data = {
-            "date": sale_item.sale.sale_date,
-            "item": sale_item.catalog_item.inventory_item.item.item_name,
-            "quantity": sale_item.quantity_sold,
-            "unit_price": sale_item.selling_price,
-            "total": float(sale_item.selling_price) * float(sale_item.quantity_sold),
-            "source": "SALES",
-            "type": "REMOVAL",
-        }
-        item_history.append(data)
-        sales_returns = SalesReturn.objects.filter(sale_item=sale_item)
-        for sale_return in sales_returns:
-            data = {
-                "date": sale_return.return_date,
-                "item": sale_return.sale_item.catalog_item.inventory_item.item.item_name,
-                "quantity": sale_return.quantity_returned,
-                "unit_price": sale_return.unit_price,
-                "total": float(
-                    sale_return.unit_price) * float(sale_return.quantity_returned),
-                "source": "SALES",
-                "type": "ADDITION",
-            }
-            item_history.append(data)
+        item = sale_item.catalog_item.inventory_item.item
+        movements[item.id].append(compose_history_entry(
+            sale_item.sale.sale_date, item.item_name, sale_item.quantity_sold,
+            sale_item.selling_price, "SALES", "REMOVAL"))
+        for sale_return in sales_returns[sale_item.id]:
+            movements[item.id].append(compose_history_entry(
+                sale_return.return_date,
+                sale_return.sale_item.catalog_item.inventory_item.item.item_name,
+                sale_return.quantity_returned, sale_return.unit_price, "SALES", "ADDITION"))
+
+    return movements
+
 
+def compute_running_balances(item_history):
+    """Sort the history of an item and compute its opening and closing quantities."""
     item_history.sort(key=itemgetter('date'))
-    if len(item_history) >= 1:
-        for count, history in enumerate(item_history):
-            if count == 0:
-                history['opening_quantity'] = 0
-                history['closing_quantity'] = history['quantity']
-
-                item_history[count] = history
-
-            else:
-                history['opening_quantity'] = item_history[count-1]['closing_quantity']
-                history['closing_quantity'] = (
-                    item_history[count-1]['closing_quantity'] + history['quantity'])
-                if history['type'] == "REMOVAL":
-                    history['closing_quantity'] = (
-                        item_history[count-1]['closing_quantity'] - history['quantity'])
-                    history['quantity'] = -history['quantity']
-                    history['total'] = -history['total']
-
-                item_history[count] = history
+    closing_quantity = 0
+    for count, history in enumerate(item_history):
+        history['opening_quantity'] = closing_quantity
+        if count and history['type'] == "REMOVAL":
+            history['quantity'] = -history['quantity']
+            history['total'] = -history['total']
+
+        closing_quantity = closing_quantity + history['quantity'] if count else history[
+            'quantity']
+        history['closing_quantity'] = closing_quantity
 
     return item_history
 
 
-def generate_items_history(enterprise_code, item=None):
+def get_items_history(enterprise_code, item_ids, start_date=None, end_date=None):
+    """Generate the history of several items from a fixed number of queries.
+
+    Movements recorded after end_date are left out, while those recorded before start_date
+    are only used to compute the opening quantity of the window.
+    """
+    end_date = get_history_datetime(end_date, end_of_day=True) if end_date else None
+    start_date = get_history_datetime(start_date) if start_date else None
+    end_filter = {'date__lte': end_date} if end_date else {}
+    record_end_filter = {f'record_{lookup}': value for lookup, value in end_filter.items()}
+
+    warehouse_onboarding, warehouse_movements = get_warehouse_movements(
+        enterprise_code, item_ids, record_end_filter)
+    inventory_onboarding, inventory_additions = get_inventory_movements(
+        enterprise_code, item_ids, record_end_filter)
+    purchase_movements = get_purchase_movements(item_ids, end_filter)
+    sale_movements = get_sale_movements(item_ids, end_filter)
+
+    items_history = {}
+    for item_id in item_ids:
+        item_history = compute_running_balances(
+            warehouse_onboarding[item_id] + inventory_onboarding[item_id] +
+            warehouse_movements[item_id] + inventory_additions[item_id] +
+            purchase_movements[item_id] + sale_movements[item_id])
+        items_history[item_id] = [
+            history for history in item_history
+            if (not start_date or history['date'] >= start_date) and (
+                not end_date or history['date'] <= end_date)]
+
+    return items_history
+
+
+def get_item_history(enterprise_code, item, start_date=None, end_date=None):
     """Generate item history."""
-    history = {}
-    if item:
-        history[str(item.id)] = {
-            "item": ItemSerializer(item).data,
-            "history": get_item_history(enterprise_code, item),
-        }
-        return history
+    return get_items_history(enterprise_code, [item.id], start_date, end_date)[item.id]
 
-    items = Item.objects.filter(enterprise=enterprise_code, is_active=True)
+
+def generate_items_history(
+        enterprise_code, item=None, start_date=None, end_date=None, page=None,
+        page_size=ITEMS_HISTORY_PAGE_SIZE):
+    """Generate item history.
+
+    The history of all active items can be paged with page and page_size.
+    """
+    items = [item] if item else Item.objects.filter(enterprise=enterprise_code, is_active=True)
+    if not item and page:
+        items = items[(page - 1) * page_size:page * page_size]
+
+    items = list(items)
+    items_history = get_items_history(
+        enterprise_code, [item.id for item in items], start_date, end_date)
+
+    history = {}
     for item in items:
         history[str(item.id)] = {
             "item": ItemSerializer(item).data,
-            "history": get_item_history(enterprise_code, item),
+            "history": items_history[item.id],
         }
     return history
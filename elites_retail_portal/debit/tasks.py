@@ -1,7 +1,14 @@
 """Debit side tasks file."""
 
+from django.conf import settings
+from django.db import transaction
+
 from elites_retail_portal.orders.models import (
     Cart, Order,)
+from elites_retail_portal.debit.models import ReportJob
+from elites_retail_portal.debit.helpers.reports import render_report_job_artifact
+
+from celery import shared_task
 
 
 def process_sale(sale, order=None):
@@ -12,3 +19,22 @@ def process_sale(sale, order=None):
     if not order:
         order = Order.objects.get(customer=sale.customer, cart_code=cart.cart_code)
     order.process_order()
+
+
+@shared_task(name=__name__ + '.render_report_job', ignore_result=True)
+def render_report_job(report_job_id):
+    """Render the report of a pending report job."""
+    report_job = ReportJob.objects.filter(id=report_job_id, status='PENDING').first()
+    if report_job:
+        render_report_job_artifact(report_job)
+
+
+def schedule_report_job_rendering(report_job):
+    """Render the report job in the background or inline depending on the settings."""
+    report_job_id = str(report_job.id)
+    if settings.REPORT_JOBS_ASYNC_RENDERING:
+        transaction.on_commit(lambda: render_report_job.delay(report_job_id))
+        return
+
+    render_report_job(report_job_id)
+    report_job.refresh_from_db()
@@ -11,5 +11,6 @@ router.register(r'inventory_records', views.InventoryRecordViewSet)
 router.register(r'sales', views.SaleViewSet)
 router.register(r'sale_items', views.SaleItemViewSet)
 router.register(r'purchases_returns', views.PurchasesReturnViewSet)
+router.register(r'report_jobs', views.ReportJobViewSet)
 
 urlpatterns = router.urls
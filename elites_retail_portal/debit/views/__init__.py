@@ -6,9 +6,10 @@ from elites_retail_portal.debit.views.inventory import (
 from elites_retail_portal.debit.views.sales import (
     SaleItemViewSet, SaleViewSet)
 from elites_retail_portal.debit.views.purchases_returns import PurchasesReturnViewSet
+from elites_retail_portal.debit.views.reports import ReportJobViewSet
 
 __all__ = (
     'InventoryViewSet', 'InventoryRecordViewSet', 'InventoryItemViewSet',
     'InventoryInventoryItemViewSet', 'SaleItemViewSet', 'SaleViewSet',
-    'PurchasesReturnViewSet'
+    'PurchasesReturnViewSet', 'ReportJobViewSet'
     )
@@ -14,6 +14,7 @@ from django.http import HttpResponse
 from django.template.loader import get_template
 
 from elites_retail_portal.common.views import BaseViewMixin
+from elites_retail_portal.common.pagination import KeysetPagination
 from elites_retail_portal.debit.models import (
     Inventory, InventoryItem, InventoryRecord)
 from elites_retail_portal.debit import serializers
@@ -21,9 +22,12 @@ from elites_retail_portal.debit import filters
 from elites_retail_portal.debit.models.inventory import InventoryInventoryItem
 from elites_retail_portal.items.models import Item
 from elites_retail_portal.debit.stock.reports import (
-    generate_stock_report, generate_items_history)
+    generate_stock_report, generate_items_history, get_stock_report_rows)
+from elites_retail_portal.debit.helpers.reports import (
+    STOCK_REPORT_HEADERS, STOCK_REPORT_LABELS)
+from elites_retail_portal.debit.views.reports import export_pdf_report
 from elites_retail_portal.enterprises.models import Enterprise
-from elites_retail_portal.common.utils import _write_excel_file
+from elites_retail_portal.common.utils import _stream_excel_file, _write_excel_file
 
 
 class InventoryViewSet(BaseViewMixin):
@@ -62,28 +66,22 @@ class InventoryItemViewSet(BaseViewMixin):
         enterprise_code = self.request.user.enterprise
         item_id = self.request.data.get('item', None)
         item = Item.objects.filter(id=item_id).first() if item_id else None  # noqa
-        data = generate_items_history(enterprise_code, item)
+        start_date = self.request.data.get('start_date', None)
+        end_date = self.request.data.get('end_date', None)
+        page_serializer = serializers.ItemsHistoryPageSerializer(data={
+            key: self.request.data[key] for key in ('page', 'page_size')
+            if self.request.data.get(key) not in (None, '')})
+        page_serializer.is_valid(raise_exception=True)
+        data = generate_items_history(
+            enterprise_code, item, start_date, end_date,
+            page_serializer.validated_data.get('page'),
+            page_serializer.validated_data['page_size'])
 
         return Response(data=data, status=status.HTTP_201_CREATED)
 
     @action(detail=False, methods=['post'])
     def export_stock_report(self, request, *args, **kwargs):
         """Download members upload template."""
-        headers = (
-            'item', 'quantity_in_catalog', 'quantity_in_warehouse', 'quantity_in_inventory',
-            'order_number', 'status', 'marked_price', 'selling_price', 'threshold_price')
-
-        labels = {
-            'item': 'Item',
-            'quantity_in_catalog': 'Quantity in Catalog',
-            'quantity_in_warehouse': 'Quantity in Warehouse',
-            'quantity_in_inventory': 'Quantity in Inventory',
-            'status': 'Status',
-            'marked_price': 'Marked Price',
-            'selling_price': 'Selling Price',
-            'threshold_price': 'Threshold Price'
-        }
-
         now = timezone.now()
         enterprise_code = self.request.user.enterprise
         SITE_NAME = Enterprise.objects.get(enterprise_code=enterprise_code).name
@@ -93,33 +91,14 @@ class InventoryItemViewSet(BaseViewMixin):
         item = Item.objects.filter(id=item_id).first() if item_id else None  # noqa
 
         file_type = self.request.data.get('file_type', None)
-        data = generate_stock_report(enterprise_code)
 
         if file_type == "PDF":
-            template = get_template("stock_report.html")
-            path_to_static = str(settings.STATIC_ROOT).split("/static")[0]
-            today = datetime.datetime.now(tz=pytz.timezone('Africa/Nairobi')).date()
-            context = {
-                'report_preview': {'report_date': today.strftime("%Y%m%d%H%M%S")},
-                'data': data,
-                'path_to_static': path_to_static
-            }
-            html = template.render(context)
-            response = HttpResponse(content_type='application/pdf')
-            pdf_status = pisa.CreatePDF(html, dest=response)
+            return export_pdf_report(self, 'STOCK')
 
-            if pdf_status.err:
-                return HttpResponse('Some errors were encountered <pre>' + html + '</pre>')
-
-            return response
-
-        excel_file = _write_excel_file(headers, labels, {}, data['stock_data'])
-        content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        response = HttpResponse(content_type=content_type)
-        response['Content-Disposition'] = f'attachment; filename={file_name}.xlsx'
-        response.content = excel_file
-
-        return response
+        inventory_items = InventoryItem.objects.filter(enterprise=enterprise_code)
+        rows = get_stock_report_rows(inventory_items) if inventory_items.exists() else []
+        return _stream_excel_file(
+            file_name, STOCK_REPORT_HEADERS, STOCK_REPORT_LABELS, {}, rows)
 
     def export_item_history_report(self, request, *args, **kwargs):
         """Download members upload template."""
@@ -206,6 +185,7 @@ class InventoryRecordViewSet(BaseViewMixin):
     queryset = InventoryRecord.objects.all().order_by(
         '-updated_on', 'inventory_item__item__item_name')
     serializer_class = serializers.InventoryRecordSerializer
+    pagination_class = KeysetPagination
     filterset_class = filters.InventoryRecordFilter
     search_fields = (
         'inventory__inventory_name', 'inventory__inventory_code',
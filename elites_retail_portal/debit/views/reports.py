@@ -0,0 +1,61 @@
+"""Report jobs views file."""
+
+from django.http import FileResponse
+
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from elites_retail_portal.debit.models import ReportJob
+from elites_retail_portal.debit import serializers, filters
+from elites_retail_portal.common.views import BaseViewMixin
+from elites_retail_portal.debit.helpers.reports import REPORT_CONTENT_TYPES
+
+
+def get_report_artifact_response(report_job):
+    """Stream the rendered report of a report job as an attachment."""
+    return FileResponse(
+        report_job.artifact.open('rb'), as_attachment=True,
+        filename=report_job.file_name,
+        content_type=REPORT_CONTENT_TYPES[report_job.file_type])
+
+
+def export_pdf_report(view, report_type, parameters=None):
+    """Create a report job for a pdf export instead of rendering it in the request.
+
+    The report is downloaded at once when it has already been rendered for the same data.
+    Otherwise the job is returned for the report to be downloaded once it is rendered.
+    """
+    serializer = serializers.ReportJobSerializer(data={
+        'report_type': report_type, 'file_type': 'PDF', 'parameters': parameters or {},
+    }, context=view.get_serializer_context())
+    serializer.is_valid(raise_exception=True)
+    report_job = serializer.save()
+    if report_job.status == 'SUCCESS' and report_job.artifact:
+        return get_report_artifact_response(report_job)
+
+    return Response(data=serializer.data, status=status.HTTP_202_ACCEPTED)
+
+
+class ReportJobViewSet(BaseViewMixin):
+    """Report Job View class."""
+
+    queryset = ReportJob.objects.all().order_by('-created_on')
+    serializer_class = serializers.ReportJobSerializer
+    filterset_class = filters.ReportJobFilter
+    search_fields = (
+        'report_type', 'file_type', 'file_name', 'status',
+    )
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, *args, **kwargs):
+        """Download the rendered report of the report job."""
+        report_job = self.get_object()
+        if report_job.status != 'SUCCESS' or not report_job.artifact:
+            data = {
+                'status': report_job.status,
+                'failure_reason': report_job.failure_reason,
+            }
+            return Response(data=data, status=status.HTTP_409_CONFLICT)
+
+        return get_report_artifact_response(report_job)
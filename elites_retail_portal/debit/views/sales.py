@@ -1,13 +1,6 @@
 """Sales views  file."""
 
-import pytz
-import datetime
-from xhtml2pdf import pisa
-
-from django.conf import settings
 from django.utils import timezone
-from django.http import HttpResponse
-from django.template.loader import get_template
 
 from rest_framework import status
 from rest_framework.decorators import action
@@ -19,8 +12,13 @@ from elites_retail_portal.items.models import Item
 from elites_retail_portal.enterprises.models import Enterprise
 from elites_retail_portal.debit import serializers, filters
 from elites_retail_portal.common.views import BaseViewMixin
-from elites_retail_portal.common.utils import _write_excel_file
-from elites_retail_portal.debit.helpers.sales import generate_sales_report
+from elites_retail_portal.common.pagination import KeysetPagination
+from elites_retail_portal.common.utils import _stream_excel_file
+from elites_retail_portal.debit.helpers.sales import (
+    generate_sales_report, get_daily_sales_totals, get_sales_report_rows)
+from elites_retail_portal.debit.helpers.reports import (
+    SALES_REPORT_HEADERS, SALES_REPORT_LABELS)
+from elites_retail_portal.debit.views.reports import export_pdf_report
 
 
 class SaleViewSet(BaseViewMixin):
@@ -48,29 +46,20 @@ class SaleViewSet(BaseViewMixin):
 
         return Response(data=data, status=status.HTTP_201_CREATED)
 
+    @action(detail=False, methods=['post'])
+    def generate_sales_summary(self, request, *args, **kwargs):
+        """Generate the daily sales totals of the period."""
+        enterprise_code = self.request.user.enterprise
+        start_date = self.request.data.get('start_date', None)
+        end_date = self.request.data.get('end_date', None)
+
+        data = get_daily_sales_totals(enterprise_code, start_date, end_date)
+
+        return Response(data=data, status=status.HTTP_201_CREATED)
+
     @action(detail=False, methods=['post'])
     def export_report(self, request, *args, **kwargs):
         """Download members upload template."""
-        headers = (
-            'sale_date', 'receipt_number', 'item', 'customer', 'order_number',
-            'amount_paid', 'status', 'processing_status', 'quantity_sold',
-            'sale_type', 'selling_price', 'total_amount')
-
-        labels = {
-            'sale_date': 'Sale Date',
-            'receipt_number': 'Receipt Number',
-            'item': 'Item',
-            'customer': 'Customer',
-            'order_number': 'Order Number',
-            'amount_paid': 'Amount Paid',
-            'status': 'Status',
-            'processing_status': 'Processing Status',
-            'quantity_sold': 'Quantity Sold',
-            'sale_type': 'Sale Type',
-            'selling_price': 'Selling Price',
-            'total_amount': 'Total Amount',
-        }
-
         now = timezone.now()
         enterprise_code = self.request.user.enterprise
         SITE_NAME = Enterprise.objects.get(enterprise_code=enterprise_code).name
@@ -82,33 +71,15 @@ class SaleViewSet(BaseViewMixin):
         item = Item.objects.filter(id=item_id).first() if item_id else None  # noqa
 
         file_type = self.request.data.get('file_type', None)
-        data = generate_sales_report(enterprise_code, item, start_date, end_date)
 
         if file_type == "PDF":
-            template = get_template("sales_report.html")
-            path_to_static = str(settings.STATIC_ROOT).split("/static")[0]
-            today = datetime.datetime.now(tz=pytz.timezone('Africa/Nairobi')).date()
-            context = {
-                'report_preview': {'report_date': today.strftime("%Y%m%d%H%M%S")},
-                'data': data,
-                'path_to_static': path_to_static
-            }
-            html = template.render(context)
-            response = HttpResponse(content_type='application/pdf')
-            pdf_status = pisa.CreatePDF(html, dest=response)
-
-            if pdf_status.err:
-                return HttpResponse('Some errors were encountered <pre>' + html + '</pre>')
-
-            return response
-
-        excel_file = _write_excel_file(headers, labels, {}, data['sales_data'])
-        content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        response = HttpResponse(content_type=content_type)
-        response['Content-Disposition'] = f'attachment; filename={file_name}.xlsx'
-        response.content = excel_file
+            parameters = {'start_date': start_date, 'end_date': end_date, 'item': item_id}
+            return export_pdf_report(self, 'SALES', {
+                key: value for key, value in parameters.items() if value})
 
-        return response
+        rows = get_sales_report_rows(enterprise_code, item, start_date, end_date)
+        return _stream_excel_file(
+            file_name, SALES_REPORT_HEADERS, SALES_REPORT_LABELS, {}, rows)
 
 
 class SaleItemViewSet(BaseViewMixin):
@@ -116,6 +87,7 @@ class SaleItemViewSet(BaseViewMixin):
 
     queryset = SaleItem.objects.all()
     serializer_class = serializers.SaleItemSerializer
+    pagination_class = KeysetPagination
     filterset_class = filters.SaleItemFilter
     search_fields = (
         'catalog_item__inventory_item__item__item_name',
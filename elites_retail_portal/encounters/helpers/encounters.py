@@ -1,6 +1,8 @@
 """Encounters helper file."""
 
-from elites_retail_portal.encounters.models import Encounter
+from django.db.models import Sum
+
+from elites_retail_portal.encounters.models import Encounter, StockReservation
 
 UNPROCESSED_ENCOUNTERS_STATUSES = ['PENDING', 'ONGOING']
 
@@ -14,15 +16,18 @@ def get_all_unprocessed_encounters(enterprise_code, catalog_item=None):
     """."""
     encounters = Encounter.objects.filter(
         enterprise=enterprise_code, processing_status__in=UNPROCESSED_ENCOUNTERS_STATUSES)
-    if catalog_item and encounters.exists():
-        catalog_item_encounter_ids = []
-        for encounter in encounters:
-            encounter_id = [
-                str(encounter.id) for data in encounter.billing
-                if data['catalog_item'] == str(catalog_item.id)]
-            catalog_item_encounter_ids.extend(encounter_id)
-
-        if catalog_item_encounter_ids:
-            encounters = encounters.filter(id__in=catalog_item_encounter_ids)
+    if catalog_item:
+        encounters = encounters.filter(
+            stock_reservations__catalog_item=catalog_item).distinct()
 
     return encounters
+
+
+def get_catalog_item_reserved_quantity(catalog_item):
+    """Get the quantity of a catalog item billed in encounters that are yet to be processed."""
+    reserved_quantity = StockReservation.objects.filter(
+        enterprise=catalog_item.enterprise, catalog_item=catalog_item,
+        encounter__processing_status__in=UNPROCESSED_ENCOUNTERS_STATUSES).aggregate(
+            quantity=Sum('quantity'))['quantity']
+
+    return reserved_quantity or 0
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.1 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('encounters', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='encounter',
+            name='processing_stage',
+            field=models.CharField(blank=True, choices=[('BILLING', 'BILLING'), ('CHECKOUT', 'CHECKOUT'), ('PAYMENTS', 'PAYMENTS'), ('SETTLEMENT', 'SETTLEMENT')], max_length=300, null=True),
+        ),
+    ]
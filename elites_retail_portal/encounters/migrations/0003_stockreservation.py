@@ -0,0 +1,53 @@
+# Generated by Django 4.1.1 on 2026-10-18 11:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+
+
+def reserve_stock_for_unprocessed_encounters(apps, schema_editor):
+    """Create stock reservations for the encounters that are yet to be processed."""
+    Encounter = apps.get_model('encounters', 'Encounter')
+    StockReservation = apps.get_model('encounters', 'StockReservation')
+    reservations = []
+    encounters = Encounter.objects.filter(processing_status__in=['PENDING', 'ONGOING'])
+    for encounter in encounters.iterator():
+        for bill in encounter.billing:
+            reservations.append(StockReservation(
+                encounter=encounter, catalog_item_id=bill['catalog_item'],
+                quantity=bill['quantity'], created_by=encounter.created_by,
+                updated_by=encounter.updated_by, enterprise=encounter.enterprise))
+
+    StockReservation.objects.bulk_create(reservations, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0002_initial'),
+        ('encounters', '0002_encounter_processing_stage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockReservation',
+            fields=[
+                ('id', models.UUIDField(auto_created=True, default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('created_on', models.DateTimeField(db_index=True, default=django.utils.timezone.now, editable=False)),
+                ('created_by', models.UUIDField(editable=False)),
+                ('updated_on', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('updated_by', models.UUIDField()),
+                ('enterprise', models.CharField(max_length=250)),
+                ('quantity', models.FloatField(default=0)),
+                ('catalog_item', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='catalog.catalogitem')),
+                ('encounter', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_reservations', to='encounters.encounter')),
+            ],
+            options={
+                'abstract': False,
+                'indexes': [models.Index(fields=['enterprise', 'catalog_item'], name='stock_reservation_item_idx')],
+            },
+        ),
+        migrations.RunPython(
+            reserve_stock_for_unprocessed_encounters, migrations.RunPython.noop),
+    ]
@@ -8,6 +8,7 @@ from django.db.models import Q
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from elites_retail_portal.common.models import AbstractBase
+from elites_retail_portal.catalog.models import CatalogItem
 from elites_retail_portal.customers.models import Customer
 from elites_retail_portal.encounters.helpers.validators import validate_billing
 from elites_retail_portal.enterprise_mgt.helpers import get_valid_enterprise_setup_rules
@@ -26,8 +27,24 @@ ENCOUNTER_PROCESSING_STATUS_CHOICES = (
     ('CANCELED', 'CANCELED'),
 )
 
+BILLING = 'BILLING'
+CHECKOUT = 'CHECKOUT'
+PAYMENTS = 'PAYMENTS'
+SETTLEMENT = 'SETTLEMENT'
+
+ENCOUNTER_PROCESSING_STAGES = [BILLING, CHECKOUT, PAYMENTS, SETTLEMENT]
+
+ENCOUNTER_PROCESSING_STAGE_CHOICES = (
+    ('BILLING', 'BILLING'),
+    ('CHECKOUT', 'CHECKOUT'),
+    ('PAYMENTS', 'PAYMENTS'),
+    ('SETTLEMENT', 'SETTLEMENT'),
+)
+
 PENDING = 'PENDING'
 
+PROCESSED_ENCOUNTER_STATUSES = ['SUCCESS', 'CANCELED']
+
 
 class Encounter(AbstractBase):
     """Customer encounter model."""
@@ -55,6 +72,8 @@ class Encounter(AbstractBase):
     processing_status = models.CharField(
         max_length=300, choices=ENCOUNTER_PROCESSING_STATUS_CHOICES,
         default=PENDING)
+    processing_stage = models.CharField(
+        max_length=300, choices=ENCOUNTER_PROCESSING_STAGE_CHOICES, null=True, blank=True)
     stalling_reason = models.TextField(null=True, blank=True)
     note = models.TextField(null=True, blank=True)
     cart_guid = models.UUIDField(null=True, blank=True)
@@ -255,6 +274,23 @@ class Encounter(AbstractBase):
             encounter_number = random.randint(1000, 100000)
             self.encounter_number = f'EAS/{encounter_number}'
 
+    def reserve_stock(self):
+        """Reserve the billed quantities or release them once the encounter is processed."""
+        StockReservation.objects.filter(encounter=self).delete()
+        if self.processing_status in PROCESSED_ENCOUNTER_STATUSES:
+            return
+
+        audit_fields = {
+            'created_by': self.created_by,
+            'updated_by': self.updated_by,
+            'enterprise': self.enterprise,
+        }
+        StockReservation.objects.bulk_create([
+            StockReservation(
+                encounter=self, catalog_item_id=bill['catalog_item'],
+                quantity=bill['quantity'], **audit_fields)
+            for bill in self.billing])
+
     def clean(self) -> None:
         """Clean the encounter model."""
         if not self.processing_status == 'STALLED':
@@ -264,7 +300,7 @@ class Encounter(AbstractBase):
     def save(self, *args, **kwargs):
         """Perform pre save and post save actins."""
         from elites_retail_portal.encounters.tasks import (
-            process_customer_encounter)
+            schedule_customer_encounter_processing)
         self.get_submitted_amount()
         self.get_payable_amount()
         self.get_balance_amount()
@@ -272,9 +308,10 @@ class Encounter(AbstractBase):
         self.create_receipt_number()
         self.create_encounter_number()
         super().save(*args, **kwargs)
+        self.reserve_stock()
         encounter = self.__class__.objects.filter(id=self.id).first()
         if encounter and self.processing_status == 'PENDING':
-            process_customer_encounter(encounter.id)
+            schedule_customer_encounter_processing(encounter)
 
     # TODO Create a stall button to stall an encounter.
     # NOTE Add a fuctionality to send feedback to the customer advising them
@@ -284,3 +321,23 @@ class Encounter(AbstractBase):
         """Meta class for encounter model."""
 
         ordering = ['-encounter_date']
+
+
+class StockReservation(AbstractBase):
+    """Quantity of a catalog item billed in an encounter that is yet to be processed."""
+
+    encounter = models.ForeignKey(
+        Encounter, null=False, blank=False, related_name='stock_reservations',
+        on_delete=models.CASCADE)
+    catalog_item = models.ForeignKey(
+        CatalogItem, null=False, blank=False, on_delete=models.PROTECT)
+    quantity = models.FloatField(default=0)
+
+    class Meta:
+        """Meta class for stock reservation model."""
+
+        indexes = [
+            models.Index(
+                fields=['enterprise', 'catalog_item'],
+                name='stock_reservation_item_idx'),
+        ]
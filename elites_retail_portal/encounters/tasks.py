@@ -3,138 +3,234 @@
 import random
 from decimal import Decimal
 
+from django.conf import settings
+from django.db import OperationalError, transaction
+
 from elites_retail_portal.catalog.models import (
     CatalogItem)
-from elites_retail_portal.encounters.models import Encounter
+from elites_retail_portal.common.middleware import request_cache_scope
+from elites_retail_portal.encounters.models import (
+    Encounter, BILLING, CHECKOUT, PAYMENTS, SETTLEMENT, ENCOUNTER_PROCESSING_STAGES,
+    PROCESSED_ENCOUNTER_STATUSES)
 from elites_retail_portal.orders.models import (
     CartItem, Cart, Order, OrderTransaction)
 from elites_retail_portal.orders.helpers.orders import process_order_transaction
 from elites_retail_portal.items.models import Product
 from elites_retail_portal.transactions.models import Payment, Transaction
 
-from celery import shared_task
-
-
-@shared_task(name=__name__ + '.process_customer_encounter', ignore_result=True)
-def process_customer_encounter(encounter_id):
-    """Process customer encounter."""
-    encounters = Encounter.objects.filter(id=encounter_id)
-    encounters.update(processing_status='ONGOING')
-    encounter = encounters.first()
-    if encounter:
-        audit_fields = {
-            'created_by': encounter.created_by,
-            'updated_by': encounter.updated_by,
-            'enterprise': encounter.enterprise,
+from celery import shared_task, Task
+
+
+def process_encounter_billing(encounter):
+    """Add the billed items to the encounter's cart."""
+    audit_fields = {
+        'created_by': encounter.created_by,
+        'updated_by': encounter.updated_by,
+        'enterprise': encounter.enterprise,
+    }
+
+    cart = Cart.objects.filter(encounter=encounter).first()
+    if not cart:
+        cart = Cart.objects.create(
+            encounter=encounter, customer=encounter.customer, **audit_fields)
+
+    Encounter.objects.filter(id=encounter.id).update(cart_guid=cart.id)
+
+    for bill in encounter.billing:
+        product = None
+        product_id = bill.get('product', None)
+        if product_id:
+            product = Product.objects.get(id=product_id)
+        catalog_item = CatalogItem.objects.get(id=bill['catalog_item'])
+        sale_type = bill['sale_type']
+        cart_item_payload = {
+            'cart': cart,
+            'product': product,
+            'catalog_item': catalog_item,
+            'quantity_added': bill['quantity'],
+            'selling_price': bill['unit_price'],
+            'is_installment': True if sale_type == 'INSTALLMENT' else False
         }
 
-        cart = Cart.objects.filter(encounter=encounter).first()
-        if not cart:
-            cart = Cart.objects.create(
-                encounter=encounter, customer=encounter.customer, **audit_fields)
-
-        encounters.update(cart_guid=cart.id)
-
-        for bill in encounter.billing:
-            product = None
-            product_id = bill.get('product', None)
-            if product_id:
-                product = Product.objects.get(id=product_id)
-            catalog_item = CatalogItem.objects.get(id=bill['catalog_item'])
-            sale_type = bill['sale_type']
-            cart_item_payload = {
-                'cart': cart,
-                'product': product,
-                'catalog_item': catalog_item,
-                'quantity_added': bill['quantity'],
-                'selling_price': bill['unit_price'],
-                'is_installment': True if sale_type == 'INSTALLMENT' else False
+        CartItem.objects.create(**cart_item_payload, **audit_fields)
+
+
+def process_encounter_checkout(encounter):
+    """Checkout the encounter's cart and process the resulting order."""
+    cart = Cart.objects.get(id=encounter.cart_guid)
+    cart.checkout_cart()
+    encounter.refresh_from_db()
+    order = Order.objects.get(id=cart.order_guid, enterprise=encounter.enterprise)
+
+    encounter.order_guid = order.id
+    encounter.processing_status = 'BILLING DONE'
+    encounter.save()
+    order.process_order()
+
+
+def process_encounter_payments(encounter):
+    """Record the payments submitted for the encounter."""
+    audit_fields = {
+        'created_by': encounter.created_by,
+        'updated_by': encounter.updated_by,
+        'enterprise': encounter.enterprise,
+    }
+    payments = encounter.payments or []
+    transaction_code = f"{random.randint(10000, 999999)}"
+    encounter_payments = []
+
+    for count, payment in enumerate(payments):
+        means = payment['means']
+        amount = payment['amount']
+        if amount:
+            account_number = None
+
+            if encounter.customer:
+                account_number = encounter.customer.account_number or encounter.customer.customer_number or encounter.customer.phone_no # noqa
+
+            payment_payload = {
+                'paid_amount': amount,
+                'balance_amount': encounter.balance_amount,
+                'customer': encounter.customer,
+                'payment_method': means,
+                'is_confirmed': True,
+                'required_amount': amount,
+                'encounter': encounter,
+                'account_number': account_number,
+                'transaction_code': transaction_code
             }
+            payment = Payment.objects.create(**payment_payload, **audit_fields)
+            encounter_payments.append(payment)
+            payments[count]['payment_guid'] = str(payment.id)
 
-            CartItem.objects.create(**cart_item_payload, **audit_fields)
-
-        cart.checkout_cart()
-        encounter.refresh_from_db()
-        order = Order.objects.get(id=cart.order_guid, enterprise=encounter.enterprise)
-
-        encounter.order_guid = order.id
-        encounter.processing_status = 'BILLING DONE'
-        encounter.save()
-        order.process_order()
-        encounter.refresh_from_db()
-        payments = encounter.payments
-        transaction_code = f"{random.randint(10000, 999999)}"
-        encounter_payments = []
-
-        for count, payment in enumerate(payments):
-            means = payment['means']
-            amount = payment['amount']
-            if amount:
-                account_number = None
-
-                if encounter.customer:
-                    account_number = encounter.customer.account_number or encounter.customer.customer_number or encounter.customer.phone_no # noqa
-
-                payment_payload = {
-                    'paid_amount': amount,
-                    'balance_amount': encounter.balance_amount,
-                    'customer': encounter.customer,
-                    'payment_method': means,
-                    'is_confirmed': True,
-                    'required_amount': amount,
-                    'encounter': encounter,
-                    'account_number': account_number,
-                    'transaction_code': transaction_code
-                }
-                payment = Payment.objects.create(**payment_payload, **audit_fields)
-                encounter_payments.append(payment)
-                encounter.payments[count]['payment_guid'] = str(payment.id)
-
-        for payment in encounter_payments:
-            transaction_filter = {
-                'transaction_code': transaction_code,
-                'enterprise': encounter.enterprise,
+    for payment in encounter_payments:
+        transaction_filter = {
+            'transaction_code': transaction_code,
+            'enterprise': encounter.enterprise,
+        }
+        payment_transaction = Transaction.objects.filter(**transaction_filter).first()
+
+        if payment_transaction:
+            payment_transaction.amount += payment.paid_amount
+            payment_transaction.balance += payment.paid_amount
+            payment_transaction.save()
+            payment.transaction_guid = payment_transaction.id
+            payment.is_processed = True
+            payment.save()
+
+        else:
+            transaction_payload = {
+                'account_number': payment.account_number,
+                'amount': payment.paid_amount,
+                'transaction_means': payment.payment_method,
+                'customer': encounter.customer,
+                'transaction_code': payment.transaction_code,
             }
-            transaction = Transaction.objects.filter(**transaction_filter).first()
-
-            if transaction:
-                transaction.amount += payment.paid_amount
-                transaction.balance += payment.paid_amount
-                transaction.save()
-                payment.transaction_guid = transaction.id
-                payment.is_processed = True
-                payment.save()
-
-            else:
-                transaction_payload = {
-                    'account_number': payment.account_number,
-                    'amount': payment.paid_amount,
-                    'transaction_means': payment.payment_method,
-                    'customer': encounter.customer,
-                    'transaction_code': payment.transaction_code,
-                }
-                transaction = Transaction.objects.create(**transaction_payload, **audit_fields)
-                payment.is_processed = True
-                payment.transaction_guid = transaction.id
-                payment.save()
-
+            payment_transaction = Transaction.objects.create(
+                **transaction_payload, **audit_fields)
+            payment.is_processed = True
+            payment.transaction_guid = payment_transaction.id
+            payment.save()
+
+    Encounter.objects.filter(id=encounter.id).update(payments=payments)
+
+
+def process_encounter_settlement(encounter):
+    """Settle the encounter's order using the recorded payments."""
+    audit_fields = {
+        'created_by': encounter.created_by,
+        'updated_by': encounter.updated_by,
+        'enterprise': encounter.enterprise,
+    }
+    payment = Payment.objects.filter(
+        encounter=encounter, transaction_guid__isnull=False).first()
+    if payment:
         # Update transaction amounts using the encounter balance
-        transaction.refresh_from_db()
-        transaction.amount -= Decimal(encounter.balance_amount)
-        transaction.balance -= Decimal(encounter.balance_amount)
-        transaction.save()
+        payment_transaction = Transaction.objects.get(id=payment.transaction_guid)
+        payment_transaction.amount -= Decimal(encounter.balance_amount)
+        payment_transaction.balance -= Decimal(encounter.balance_amount)
+        payment_transaction.save()
 
         order = Order.objects.get(id=encounter.order_guid)
         order_transaction_payload = {
-            'amount': transaction.balance,
+            'amount': payment_transaction.balance,
             'order': order,
-            'transaction': transaction,
+            'transaction': payment_transaction,
         }
         order_transaction = OrderTransaction.objects.create(
             **order_transaction_payload, **audit_fields)
         order_transaction.refresh_from_db()
         process_order_transaction(order_transaction)
-        encounter.processing_status = 'SUCCESS'
-        encounter.save()
+
+    encounter.refresh_from_db()
+    encounter.processing_status = 'SUCCESS'
+    encounter.save()
+
+
+ENCOUNTER_PROCESSING_STAGE_HANDLERS = {
+    BILLING: process_encounter_billing,
+    CHECKOUT: process_encounter_checkout,
+    PAYMENTS: process_encounter_payments,
+    SETTLEMENT: process_encounter_settlement,
+}
+
+
+def run_encounter_processing_stage(encounter_id, stage):
+    """Run a processing stage of the encounter and checkpoint it.
+
+    The stage and its checkpoint are committed together, so a stage that has been
+    checkpointed is never run again and a failed stage is retried from scratch.
+    """
+    with transaction.atomic():
+        encounter = Encounter.objects.select_for_update().get(id=encounter_id)
+        completed_stages = ENCOUNTER_PROCESSING_STAGES[:ENCOUNTER_PROCESSING_STAGES.index(
+            encounter.processing_stage) + 1] if encounter.processing_stage else []
+        if stage in completed_stages:
+            return
+
+        ENCOUNTER_PROCESSING_STAGE_HANDLERS[stage](encounter)
+        Encounter.objects.filter(id=encounter_id).update(processing_stage=stage)
+
+
+class EncounterProcessingTask(Task):
+    """Celery task base for processing customer encounters."""
+
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        """Flag the encounter as failed so that it can be resumed."""
+        encounter_id = args[0] if args else kwargs.get('encounter_id')
+        Encounter.objects.filter(id=encounter_id).exclude(
+            processing_status__in=PROCESSED_ENCOUNTER_STATUSES).update(
+                processing_status='FAILED', stalling_reason=str(exc))
+
+
+@shared_task(
+    name=__name__ + '.process_customer_encounter', ignore_result=True,
+    base=EncounterProcessingTask, autoretry_for=(OperationalError,),
+    retry_backoff=True, max_retries=3)
+def process_customer_encounter(encounter_id):
+    """Process customer encounter.
+
+    The processing resumes from the last checkpointed stage of the encounter.
+    """
+    encounters = Encounter.objects.filter(id=encounter_id).exclude(
+        processing_status__in=PROCESSED_ENCOUNTER_STATUSES)
+    encounters.update(processing_status='ONGOING', stalling_reason=None)
+    encounter = encounters.first()
+    if encounter:
+        with request_cache_scope():
+            for stage in ENCOUNTER_PROCESSING_STAGES:
+                run_encounter_processing_stage(encounter.id, stage)
+
+        encounter.refresh_from_db()
 
     return encounter
+
+
+def schedule_customer_encounter_processing(encounter):
+    """Process the encounter in the background or inline depending on the settings."""
+    if settings.ENCOUNTERS_ASYNC_PROCESSING:
+        encounter_id = str(encounter.id)
+        transaction.on_commit(lambda: process_customer_encounter.delay(encounter_id))
+        return
+
+    process_customer_encounter(encounter.id)
@@ -7,7 +7,8 @@ from rest_framework import status
 from elites_retail_portal.common.views import BaseViewMixin
 from elites_retail_portal.encounters.models import Encounter
 from elites_retail_portal.encounters import serializers, filters
-from elites_retail_portal.encounters.tasks import (process_customer_encounter)
+from elites_retail_portal.encounters.tasks import (
+    schedule_customer_encounter_processing)
 
 
 class EncounterViewSet(BaseViewMixin):
@@ -35,10 +36,25 @@ class EncounterViewSet(BaseViewMixin):
     def process_encounter(self, request, *args, **kwargs):
         """Activate item end point."""
         encounter = self.get_object()
-        process_customer_encounter(encounter.id)
+        schedule_customer_encounter_processing(encounter)
 
         return Response(data={"status": "OK"}, status=status.HTTP_200_OK)
 
+    @action(methods=['get'], detail=True)
+    def processing_status(self, request, *args, **kwargs):
+        """Poll the processing progress of the encounter."""
+        encounter = self.get_object()
+        data = {
+            'id': encounter.id,
+            'processing_status': encounter.processing_status,
+            'processing_stage': encounter.processing_stage,
+            'stalling_reason': encounter.stalling_reason,
+            'cart_guid': encounter.cart_guid,
+            'order_guid': encounter.order_guid,
+        }
+
+        return Response(data=data, status=status.HTTP_200_OK)
+
     @action(methods=['post'], detail=True)
     def cancel_receipt(self, request, *args, **kwargs):
         """Activate item end point."""
@@ -1,10 +1,72 @@
 """."""
 
+import functools
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from elites_retail_portal.common.middleware import get_request_cache
 from elites_retail_portal.enterprise_mgt.models import EnterpriseSetupRule
 
+ENTERPRISE_SETUP_RULES_VERSION_KEY = 'enterprise_setup_rules_version:{}'
+ENTERPRISE_SETUP_RULES_CACHE_KEY = 'enterprise_setup_rules:{}:{}'
+ENTERPRISE_SETUP_RULES_MEMO_KEY = 'enterprise_setup_rules:{}'
+MISSING = object()
+
+
+def get_enterprise_setup_rules_version(enterpise_code):
+    """Get the version the enterprise's setup rules are cached under."""
+    version_key = ENTERPRISE_SETUP_RULES_VERSION_KEY.format(enterpise_code)
+    version = cache.get(version_key)
+    if version is None:
+        cache.add(version_key, uuid.uuid4().hex, None)
+        version = cache.get(version_key)
+
+    return version
+
+
+def invalidate_enterprise_setup_rules(enterpise_code):
+    """Drop the cached setup rules of the enterprise.
+
+    The version is changed again once the transaction commits, since a concurrent request
+    could have cached the rules as they were before the change was committed.
+    """
+    request_cache = get_request_cache()
+    if request_cache is not None:
+        request_cache.pop(ENTERPRISE_SETUP_RULES_MEMO_KEY.format(enterpise_code), None)
+
+    version_key = ENTERPRISE_SETUP_RULES_VERSION_KEY.format(enterpise_code)
+    cache.set(version_key, uuid.uuid4().hex, None)
+    transaction.on_commit(lambda: cache.set(version_key, uuid.uuid4().hex, None))
+
 
 def get_valid_enterprise_setup_rules(enterpise_code):
-    """Get the valid enterprise setup rule for the enterprise."""
-    enterprise_setup_rules = EnterpriseSetupRule.objects.filter(
-        enterprise=enterpise_code, is_active=True).first()
+    """Get the valid enterprise setup rule for the enterprise.
+
+    The rule is memoized for the request and shared across requests with its inventories,
+    catalogs and warehouse preloaded. Rules read inside a transaction are shared once the
+    transaction commits, since it could be rolled back.
+    """
+    request_cache = get_request_cache()
+    memo_key = ENTERPRISE_SETUP_RULES_MEMO_KEY.format(enterpise_code)
+    if request_cache is not None and memo_key in request_cache:
+        return request_cache[memo_key]
+
+    version = get_enterprise_setup_rules_version(enterpise_code)
+    cache_key = ENTERPRISE_SETUP_RULES_CACHE_KEY.format(enterpise_code, version)
+    enterprise_setup_rules = cache.get(cache_key, MISSING)
+    if enterprise_setup_rules is MISSING:
+        enterprise_setup_rules = EnterpriseSetupRule.objects.filter(
+            enterprise=enterpise_code, is_active=True).first()
+        if enterprise_setup_rules:
+            enterprise_setup_rules.preload()
+        transaction.on_commit(functools.partial(
+            cache.set, cache_key, enterprise_setup_rules,
+            settings.ENTERPRISE_SETUP_RULES_CACHE_TIMEOUT))
+
+    if request_cache is not None:
+        request_cache[memo_key] = enterprise_setup_rules
+
     return enterprise_setup_rules
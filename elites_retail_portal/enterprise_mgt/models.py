@@ -1,6 +1,9 @@
 """Enterprise Restrictions Management models file."""
 
+import functools
+
 from django.db import models
+from django.db.models.signals import post_delete, post_save
 from django.core.exceptions import ValidationError
 
 from elites_retail_portal.catalog.models import Catalog
@@ -9,8 +12,70 @@ from elites_retail_portal.debit.models import Inventory
 from elites_retail_portal.enterprises.models import Enterprise
 from elites_retail_portal.warehouses.models import Warehouse
 
+PRELOADED_SETUP_RULE_ATTRIBUTES = (
+    'available_inventory', 'allocated_inventory', 'standard_catalog', 'default_catalog',
+    'default_warehouse')
+
+
+def preloadable(func):
+    """Make a property of the rule that is resolved once and kept on the rule.
+
+    Validation errors are kept too, and are raised each time the property is read.
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(self):
+        preloaded = self.__dict__.setdefault('_preloaded', {})
+        if name not in preloaded:
+            try:
+                preloaded[name] = (func(self), None)
+            except ValidationError as e:
+                preloaded[name] = (None, e.message_dict)
+
+        value, errors = preloaded[name]
+        if errors:
+            raise ValidationError(errors)
+
+        return value
+
+    return property(wrapper)
+
+
+class AbstractSetupRuleBase(AbstractBase):
+    """Base model of the records that make up an enterprise setup rule.
+
+    Saving or deleting a record drops the enterprise's cached setup rules. So does saving or
+    deleting an inventory, catalog or warehouse, since the cached rules hold them.
+    """
+
+    @property
+    def rule_enterprise(self):
+        """Get the enterprise of the setup rule the record makes up."""
+        return self.rule.enterprise
+
+    def save(self, *args, **kwargs):
+        """Perform post save actions."""
+        from elites_retail_portal.enterprise_mgt.helpers import (
+            invalidate_enterprise_setup_rules)
+        super().save(*args, **kwargs)
+        invalidate_enterprise_setup_rules(self.rule_enterprise)
+
+    def delete(self, *args, **kwargs):
+        """Perform post delete actions."""
+        from elites_retail_portal.enterprise_mgt.helpers import (
+            invalidate_enterprise_setup_rules)
+        result = super().delete(*args, **kwargs)
+        invalidate_enterprise_setup_rules(self.rule_enterprise)
+        return result
 
-class EnterpriseSetupRule(AbstractBase):
+    class Meta:
+        """Initialize it as an abstract class."""
+
+        abstract = True
+
+
+class EnterpriseSetupRule(AbstractSetupRuleBase):
     """Enterprise Setup Rules model."""
 
     name = models.CharField(max_length=300)
@@ -24,6 +89,11 @@ class EnterpriseSetupRule(AbstractBase):
     is_default = models.BooleanField(default=True)
     supports_installment_sales = models.BooleanField(default=False)
 
+    @property
+    def rule_enterprise(self):
+        """Get the enterprise of the setup rule."""
+        return self.enterprise
+
     @property
     def master_inventory(self):
         """Get master inventory."""
@@ -42,7 +112,7 @@ class EnterpriseSetupRule(AbstractBase):
 
         return inventory.first()
 
-    @property
+    @preloadable
     def allocated_inventory(self):
         """Get the allocated inventory."""
         inventory = self.inventories.filter(
@@ -60,7 +130,7 @@ class EnterpriseSetupRule(AbstractBase):
 
         return inventory.first()
 
-    @property
+    @preloadable
     def available_inventory(self):
         """Get the available inventory."""
         inventory = self.inventories.filter(
@@ -97,7 +167,7 @@ class EnterpriseSetupRule(AbstractBase):
 
         return inventory.first()
 
-    @property
+    @preloadable
     def standard_catalog(self):
         """Get the standard catalog."""
         catalog = self.catalogs.filter(
@@ -116,7 +186,7 @@ class EnterpriseSetupRule(AbstractBase):
 
         return catalog.first()
 
-    @property
+    @preloadable
     def default_catalog(self):
         """Get the default catalog."""
         catalog = self.catalogs.filter(
@@ -135,7 +205,7 @@ class EnterpriseSetupRule(AbstractBase):
 
         return catalog.first()
 
-    @property
+    @preloadable
     def default_warehouse(self):
         """Get the default warehouse."""
         warehouse = self.warehouses.filter(
@@ -182,13 +252,21 @@ class EnterpriseSetupRule(AbstractBase):
                 "Please deactivate or update the exisiting rule to continue"
             raise ValidationError({'rule': msg})
 
+    def preload(self):
+        """Resolve the inventories, catalogs and warehouse the rule is mostly read for."""
+        for attribute in PRELOADED_SETUP_RULE_ATTRIBUTES:
+            try:
+                getattr(self, attribute)
+            except ValidationError:
+                pass
+
     def clean(self) -> None:
         """Clean rule warehouse."""
         self.validate_unique_rule()
         return super().clean()
 
 
-class EnterpriseSetupRuleInventory(AbstractBase):
+class EnterpriseSetupRuleInventory(AbstractSetupRuleBase):
     """Rule Inventory model."""
 
     rule = models.ForeignKey(EnterpriseSetupRule, on_delete=models.CASCADE)
@@ -210,7 +288,7 @@ class EnterpriseSetupRuleInventory(AbstractBase):
         return super().clean()
 
 
-class EnterpriseSetupRuleWarehouse(AbstractBase):
+class EnterpriseSetupRuleWarehouse(AbstractSetupRuleBase):
     """Rule warehouse model."""
 
     rule = models.ForeignKey(EnterpriseSetupRule, on_delete=models.CASCADE)
@@ -232,7 +310,7 @@ class EnterpriseSetupRuleWarehouse(AbstractBase):
         return super().clean()
 
 
-class EnterpriseSetupRuleCatalog(AbstractBase):
+class EnterpriseSetupRuleCatalog(AbstractSetupRuleBase):
     """Rule Catalog model."""
 
     rule = models.ForeignKey(EnterpriseSetupRule, on_delete=models.CASCADE)
@@ -292,3 +370,18 @@ class EnterpriseSetup(AbstractBase):
             active_catalogs_names = [
                 catalog.catalog_name for catalog in active_catalogs]
         return active_catalogs, active_catalogs_names
+
+
+def invalidate_enterprise_setup_rules_of_record(sender, instance, **kwargs):
+    """Drop the cached setup rules of the enterprise of the changed record."""
+    from elites_retail_portal.enterprise_mgt.helpers import invalidate_enterprise_setup_rules
+    invalidate_enterprise_setup_rules(instance.enterprise)
+
+
+for setup_rule_sender in (Inventory, Catalog, Warehouse):
+    post_save.connect(
+        invalidate_enterprise_setup_rules_of_record, sender=setup_rule_sender,
+        dispatch_uid='setup_rules_post_save_{}'.format(setup_rule_sender.__name__))
+    post_delete.connect(
+        invalidate_enterprise_setup_rules_of_record, sender=setup_rule_sender,
+        dispatch_uid='setup_rules_post_delete_{}'.format(setup_rule_sender.__name__))
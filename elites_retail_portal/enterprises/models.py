@@ -1,13 +1,18 @@
 """Models file for enterprise app."""
 
-from django.db import models
+from django.conf import settings
+from django.db import connection, models, transaction
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 
+from elites_retail_portal.common.middleware import get_request_cache
 from elites_retail_portal.common.models import BaseModel, BioData
 from elites_retail_portal.common.validators import (
     phoneNumberRegex, enterprise_enterprise_code_validator)
 from elites_retail_portal.common.code_generators import generate_enterprise_code
 
+ENTERPRISE_CACHE_KEY = 'enterprise:{}'
+
 ENTERPRISE_TYPES = (
     ('FRANCHISE', 'FRANCHISE'),
     ('SUPPLIER', 'SUPPLIER'),
@@ -111,7 +116,15 @@ class Enterprise(BaseModel):
         """Pre save and post save actions."""
         self.short_name = self.name if not self.short_name else self.short_name
         self.create_enterprise_code()
-        return super().save(*args, **kwargs)
+        super().save(*args, **kwargs)
+        invalidate_enterprise(self.enterprise_code)
+
+    def delete(self, *args, **kwargs):
+        """Perform post delete actions."""
+        enterprise_code = self.enterprise_code
+        result = super().delete(*args, **kwargs)
+        invalidate_enterprise(enterprise_code)
+        return result
 
     def __str__(self):
         """Enterprise string representation."""
@@ -123,6 +136,44 @@ class Enterprise(BaseModel):
         ordering = ['-name']
 
 
+def invalidate_enterprise(enterprise_code):
+    """Drop the cached enterprise.
+
+    The enterprise is dropped again once the transaction commits, since a concurrent
+    request could have cached it as it was before the change was committed.
+    """
+    cache_key = ENTERPRISE_CACHE_KEY.format(enterprise_code)
+    request_cache = get_request_cache()
+    if request_cache is not None:
+        request_cache.pop(cache_key, None)
+
+    cache.delete(cache_key)
+    transaction.on_commit(lambda: cache.delete(cache_key))
+
+
+def retrieve_enterprise(enterprise_code):
+    """Retrieve an enterprise given its enterprise code.
+
+    The enterprise is memoized for the request and shared across requests. Enterprises
+    read inside a transaction are not shared since the transaction could be rolled back.
+    """
+    cache_key = ENTERPRISE_CACHE_KEY.format(enterprise_code)
+    request_cache = get_request_cache()
+    if request_cache is not None and cache_key in request_cache:
+        return request_cache[cache_key]
+
+    enterprise = cache.get(cache_key)
+    if enterprise is None:
+        enterprise = Enterprise.objects.filter(enterprise_code=enterprise_code).first()
+        if enterprise and not connection.in_atomic_block:
+            cache.set(cache_key, enterprise, settings.ENTERPRISES_CACHE_TIMEOUT)
+
+    if request_cache is not None:
+        request_cache[cache_key] = enterprise
+
+    return enterprise
+
+
 class EnterpriseContact(BaseModel):
     """Enterprisees Contacts models."""
 
@@ -39,7 +39,9 @@ class StaffViewSet(BaseViewMixin):
         end_date = self.request.data.get('end_date', None)
         sales_person_id = self.request.data.get('sales_person', None)
         sales_persons = Staff.objects.filter(id=sales_person_id) if sales_person_id else []
+        by_category = self.request.data.get('by_category', False) in [True, 'true', 'True']
 
-        data = get_sales_person_sales_data(enterprise_code, sales_persons, start_date, end_date)
+        data = get_sales_person_sales_data(
+            enterprise_code, sales_persons, start_date, end_date, by_category)
 
         return Response(data=data, status=status.HTTP_201_CREATED)
@@ -46,6 +46,12 @@ PRODUCT_STATUS_CHOICES = (
 ON_SALE = "ON SALE"
 
 
+def refresh_catalog_item_search_documents(**filters):
+    """Refresh the search documents of the catalog items of the filtered items."""
+    from elites_retail_portal.catalog.models import CatalogItem
+    CatalogItem.objects.filter(**filters).refresh_search_documents()
+
+
 class Category(AbstractBase):
     """Item categories eg. ELECTRONICS, UTENSILS, COOKER."""
 
@@ -79,9 +85,13 @@ class Category(AbstractBase):
 
     def save(self, *args, **kwargs):
         """Pre save and post save action."""
+        adding = self._state.adding
         self.create_category_code()
         self.category_name = self.category_name.upper()
-        return super().save(*args, **kwargs)
+        super().save(*args, **kwargs)
+        if not adding:
+            refresh_catalog_item_search_documents(
+                inventory_item__item__item_model__item_type__category=self)
 
     class Meta:
         """Meta class for category."""
@@ -120,9 +130,13 @@ class ItemType(AbstractBase):
 
     def save(self, *args, **kwargs):
         """Perform presave and post save actions."""
+        adding = self._state.adding
         self.type_name = self.type_name.upper()
         self.create_type_code()
-        return super().save(*args, **kwargs)
+        super().save(*args, **kwargs)
+        if not adding:
+            refresh_catalog_item_search_documents(
+                inventory_item__item__item_model__item_type=self)
 
     def __str__(self):
         """Str representation for the item-models model."""
@@ -165,9 +179,12 @@ class Brand(AbstractBase):
 
     def save(self, *args, **kwargs):
         """Pre save and post save actions."""
+        adding = self._state.adding
         self.brand_name = self.brand_name.upper()
         self.create_brand_code()
-        return super().save(*args, **kwargs)
+        super().save(*args, **kwargs)
+        if not adding:
+            refresh_catalog_item_search_documents(inventory_item__item__item_model__brand=self)
 
     def __str__(self):
         """Str representation for the item-models model."""
@@ -282,9 +299,12 @@ class ItemModel(AbstractBase):
 
     def save(self, *args, **kwargs):
         """Perform pre save and post save actions."""
+        adding = self._state.adding
         self.create_model_code()
         self.check_item_type_is_hooked_up_to_the_brand()
-        return super().save(*args, **kwargs)
+        super().save(*args, **kwargs)
+        if not adding:
+            refresh_catalog_item_search_documents(inventory_item__item__item_model=self)
 
     def __str__(self):
         """Str representation for the item-models model."""
@@ -388,7 +408,10 @@ class Item(AbstractBase):
 
     def save(self, *args, **kwargs):
         """Perform pre save and post save actions on the Item model."""
+        adding = self._state.adding
         super().save(*args, **kwargs)
+        if not adding:
+            refresh_catalog_item_search_documents(inventory_item__item=self)
 
     class Meta:
         """Meta class for items."""
@@ -690,7 +713,10 @@ class Product(AbstractBase):
 
     def save(self, *args, **kwargs):
         """Save action."""
+        adding = self._state.adding
         if not self.product_name:
             self.product_name = self.item.item_name
 
-        return super().save(*args, **kwargs)
+        super().save(*args, **kwargs)
+        if self.serial_number or not adding:
+            refresh_catalog_item_search_documents(inventory_item__item=self.item)
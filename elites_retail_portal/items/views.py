@@ -99,6 +99,7 @@ class ItemAttributeViewSet(BaseViewMixin):
 
     queryset = ItemAttribute.objects.all().order_by('-updated_on')
     serializer_class = serializers.ItemAttributeSerializer
+    bulk_upsert_fields = ('item', 'attribute_type', 'attribute_value', 'is_active')
     filterset_class = filters.ItemAttributeFilter
     search_fields = ('')
 
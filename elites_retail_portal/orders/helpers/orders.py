@@ -3,9 +3,11 @@
 import logging
 from decimal import Decimal
 
+from django.db import transaction
 from django.db.models import Q
 from elites_retail_portal.debit.models import InventoryRecord, InventoryInventoryItem
-from elites_retail_portal.orders.models import InstallmentsOrderItem, InstantOrderItem
+from elites_retail_portal.orders.models import InstallmentsOrderItem, InstantOrderItem, Order
+from elites_retail_portal.orders.models.orders import compute_order_summaries
 from elites_retail_portal.enterprise_mgt.models import EnterpriseSetupRule
 from elites_retail_portal.encounters.models import Encounter
 
@@ -147,3 +149,56 @@ def refresh_order(order):
     # Get all the order items
     # Get all Order Transactions
     # Now Process This
+
+
+def get_order_summary_mismatches(order, summary):
+    """Compare the stored heading and totals of an order with the computed summary.
+
+    Return the (order, field, stored value, computed value) of every column that differs.
+    """
+    mismatches = []
+    for field, value in summary.items():
+        stored_value = getattr(order, field)
+        if isinstance(value, Decimal):
+            stored_value = Decimal(stored_value or 0)
+        if stored_value != value:
+            mismatches.append((order, field, stored_value, value))
+
+    return mismatches
+
+
+def rebuild_order_summaries(enterprise=None, check=False, batch_size=500):
+    """Rebuild the stored heading and totals of the orders from their order items.
+
+    The orders are read in batches and only the orders whose stored values differ from the
+    computed ones are written. Nothing is written when check is set.
+    Return the mismatches that were found.
+    """
+    orders = Order.objects.order_by('id')
+    if enterprise:
+        orders = orders.filter(enterprise=enterprise)
+
+    mismatches = []
+    last_id = None
+    while True:
+        batch = list((orders.filter(id__gt=last_id) if last_id else orders)[:batch_size])
+        if not batch:
+            break
+
+        last_id = batch[-1].id
+        summaries = compute_order_summaries(batch)
+        stale_summaries = {}
+        for order in batch:
+            order_mismatches = get_order_summary_mismatches(order, summaries[order.id])
+            if order_mismatches:
+                mismatches.extend(order_mismatches)
+                stale_summaries[order.id] = summaries[order.id]
+
+        if check or not stale_summaries:
+            continue
+
+        with transaction.atomic():
+            for order_id, summary in stale_summaries.items():
+                Order.objects.filter(id=order_id).update(**summary)
+
+    return mismatches
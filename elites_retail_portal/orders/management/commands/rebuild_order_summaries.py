@@ -0,0 +1,38 @@
+"""Rebuild order summaries command."""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from elites_retail_portal.orders.helpers.orders import rebuild_order_summaries
+
+
+class Command(BaseCommand):
+    """."""
+
+    help = 'Rebuilds the order headings and totals from the order items'
+
+    def add_arguments(self, parser):
+        """."""
+        parser.add_argument(
+            '--enterprise', type=str, default=None,
+            help='Only rebuild the order summaries of the given enterprise code')
+        parser.add_argument(
+            '--check', action='store_true', default=False,
+            help='Only report the order summaries that differ from their order items')
+
+    def handle(self, *args, **options):
+        """."""
+        mismatches = rebuild_order_summaries(
+            enterprise=options['enterprise'], check=options['check'])
+        for order, field, stored_value, value in mismatches:
+            self.stdout.write('Order {} {}: stored {!r}, computed {!r}'.format(
+                order.order_number, field, stored_value, value))
+
+        if options['check']:
+            if mismatches:
+                raise CommandError('{} order summary values differ from the order items'.format(
+                    len(mismatches)))
+            self.stdout.write(self.style.SUCCESS('The order summaries match the order items'))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            'Successfully rebuilt {} order summary values'.format(len(mismatches))))
@@ -0,0 +1,63 @@
+# Generated by Django 4.1.1 on 2026-10-18 18:00
+
+from decimal import Decimal
+
+import django.core.validators
+from django.db import migrations, models
+
+
+def compose_order_summaries(apps, schema_editor):
+    """Store the heading and totals of the existing orders."""
+    Order = apps.get_model('orders', 'Order')
+    order_item_models = (
+        (False, apps.get_model('orders', 'InstantOrderItem')),
+        (True, apps.get_model('orders', 'InstallmentsOrderItem')))
+    order_name_length = Order._meta.get_field('order_name').max_length
+    for order in Order.objects.iterator():
+        names = []
+        totals = {False: Decimal(0), True: Decimal(0)}
+        amount_paid = Decimal(0)
+        for is_installment, order_item_model in order_item_models:
+            rows = order_item_model.objects.filter(order=order).order_by(
+                '-cart_item__catalog_item__inventory_item__item__item_name',
+                '-total_amount').values_list(
+                    'cart_item__catalog_item__inventory_item__item__item_name',
+                    'total_amount', 'amount_paid')
+            for item_name, total_amount, item_amount_paid in rows:
+                names.append(item_name)
+                totals[is_installment] += total_amount or 0
+                amount_paid += item_amount_paid or 0
+
+        order_total = totals[False] + totals[True]
+        Order.objects.filter(id=order.id).update(
+            order_name="{} {}".format(order.order_number, ', '.join(names))[:order_name_length],
+            item_count=len(names), instant_order_items_total=totals[False],
+            installment_order_items_total=totals[True], order_total=order_total,
+            amount_paid=amount_paid, amount_due=max(order_total - amount_paid, Decimal(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_cart_status_cartitem_status_and_more'),
+        ('orders', '0003_installment_balance'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='amount_due',
+            field=models.DecimalField(blank=True, decimal_places=2, default=0, max_digits=30, null=True, validators=[django.core.validators.MinValueValidator(0.0)]),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='amount_paid',
+            field=models.DecimalField(blank=True, decimal_places=2, default=0, max_digits=30, null=True, validators=[django.core.validators.MinValueValidator(0.0)]),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='item_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(compose_order_summaries, migrations.RunPython.noop),
+    ]
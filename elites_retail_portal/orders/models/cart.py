@@ -4,11 +4,13 @@ import random
 import logging
 from decimal import Decimal
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Exists, OuterRef, Q, Sum
+from django.utils import timezone
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 
-from elites_retail_portal.common.models import AbstractBase
+from elites_retail_portal.common.models import AbstractBase, BaseQuerySet, total_related
 from elites_retail_portal.catalog.models import CatalogItem
 from elites_retail_portal.customers.models import Customer
 from elites_retail_portal.encounters.models import Encounter
@@ -28,6 +30,35 @@ STATUS_CHOICES = (
 PENDING = "PENDING"
 
 
+def get_latest_cart_items(cart_items):
+    """Leave out the cart items that a later cart item of the same catalog item replaces.
+
+    Adding an item to a cart again creates a cart item whose closing quantity includes the
+    earlier ones, so only the cart item with the highest closing quantity of each catalog
+    item in a cart is kept.
+    """
+    later_cart_items = CartItem.objects.filter(
+        Q(closing_quantity__gt=OuterRef('closing_quantity')) | Q(
+            closing_quantity=OuterRef('closing_quantity'), id__lt=OuterRef('id')),
+        cart=OuterRef('cart'), catalog_item=OuterRef('catalog_item'))
+
+    return cart_items.exclude(Exists(later_cart_items))
+
+
+class CartQuerySet(BaseQuerySet):
+    """Cart queryset."""
+
+    def with_totals(self):
+        """Annotate the carts with the grand total of their latest cart items.
+
+        The grand_total of the carts is then read from the annotation instead of a query
+        per cart.
+        """
+        return self.annotate(items_grand_total=total_related(
+            get_latest_cart_items(CartItem.objects.filter(cart=OuterRef('pk'))),
+            'cart', Sum('total_amount')))
+
+
 class Cart(AbstractBase):
     """Cart model."""
 
@@ -58,47 +89,36 @@ class Cart(AbstractBase):
 
         return "{} {}".format(self.cart_code, items_name)
 
+    objects = CartQuerySet.as_manager()
+
     @property
     def summary(self):
         """Summary of cart."""
-        summarized_cart_items = []
-        price_totals = []
-        cart_items = CartItem.objects.filter(cart=self)
-
-        if cart_items.exists():
-            highest_cart_item = None
-            ignore_cart_item_ids = []
-            for cart_item in cart_items:
-                if highest_cart_item:
-                    if highest_cart_item.catalog_item == cart_item.catalog_item:
-                        if cart_item.closing_quantity > highest_cart_item.closing_quantity:
-                            highest_cart_item = cart_item
-                        else:
-                            ignore_cart_item_ids.append(cart_item.id)
-                else:
-                    highest_cart_item = cart_item
-
-            cleaned_cart_items = CartItem.objects.filter(
-                cart=self).exclude(id__in=ignore_cart_item_ids)
-            for count, cleaned_cart_item in enumerate(cleaned_cart_items):
-                price_totals.append(float(cleaned_cart_item.total_amount))
-                summarized_cart_items.append(
-                    {
-                        'index': count,
-                        'name': cleaned_cart_item.catalog_item.inventory_item.item.item_name,
-                        'quantity': cleaned_cart_item.closing_quantity,
-                        'price': float(cleaned_cart_item.selling_price),
-                        'total': float(cleaned_cart_item.total_amount),
-                    }
-                )
-
+        cart_items = get_latest_cart_items(CartItem.objects.filter(cart=self)).select_related(
+            'catalog_item__inventory_item__item')
+        summarized_cart_items = [
+            {
+                'index': count,
+                'name': cart_item.catalog_item.inventory_item.item.item_name,
+                'quantity': cart_item.closing_quantity,
+                'price': float(cart_item.selling_price),
+                'total': float(cart_item.total_amount),
+            } for count, cart_item in enumerate(cart_items)]
         summary = {
             'items': summarized_cart_items,
-            'grand_total': sum(price_totals)
+            'grand_total': sum(item['total'] for item in summarized_cart_items)
         }
 
         return summary
 
+    @property
+    def grand_total(self):
+        """Get the grand total of the latest cart items."""
+        if hasattr(self, 'items_grand_total'):
+            return float(self.items_grand_total)
+
+        return self.summary['grand_total']
+
     @property
     def order(self):
         """Get order."""
@@ -110,10 +130,12 @@ class Cart(AbstractBase):
         return order
 
     def checkout_cart(self):
-        """Checkout all items in cart."""
+        """Checkout all items in cart.
+
+        The order items are validated up front and then written in bulk.
+        """
         from elites_retail_portal.orders.models import (
             Order, InstantOrderItem, InstallmentsOrderItem)
-        prices = []
         cart_items = CartItem.objects.filter(cart=self, enterprise=self.enterprise)
         if not cart_items.exists():
             raise ValidationError({
@@ -141,34 +163,54 @@ class Cart(AbstractBase):
             order.is_site = self.is_site
             order.save()
 
+        order_item_models = [InstantOrderItem, InstallmentsOrderItem]
+        existing_order_items = {
+            (order_item_model, order_item.cart_item_id): order_item
+            for order_item_model in order_item_models
+            for order_item in order_item_model.objects.filter(order=order)}
+        installment_items_total_amount = sum(
+            order_item.total_amount for (order_item_model, _), order_item
+            in existing_order_items.items() if order_item_model == InstallmentsOrderItem)
+        new_order_items = {order_item_model: [] for order_item_model in order_item_models}
+        changed_order_items = {order_item_model: [] for order_item_model in order_item_models}
+
+        # Validate every order item before writing any of them
+        cart_items = list(cart_items)
         for cart_item in cart_items:
-            quantity = cart_item.closing_quantity
-            prices.append(float(cart_item.selling_price)*quantity)
-            filters = {
-                'order': order,
-                'cart_item': cart_item,
-            }
+            order_item_model = InstallmentsOrderItem if cart_item.is_installment else InstantOrderItem  # noqa
             payload = {
                 'confirmation_status': 'PENDING',
-                'quantity': quantity,
+                'quantity': cart_item.closing_quantity,
                 'unit_price': cart_item.selling_price,
             }
+            order_item = existing_order_items.get((order_item_model, cart_item.id))
+            if order_item:
+                for field, value in payload.items():
+                    setattr(order_item, field, value)
+                changed_order_items[order_item_model].append(order_item)
+                continue
+
+            order_item = order_item_model(
+                order=order, cart_item=cart_item, **payload, **audit_fields)
             if cart_item.is_installment:
-                installment_order_item = InstallmentsOrderItem.objects.filter(**filters)
-                if installment_order_item.exists():
-                    installment_order_item.update(**payload)
-                else:
-                    InstallmentsOrderItem.objects.create(**filters, **payload, **audit_fields)
+                order_item.prepare_checkout(installment_items_total_amount)
+                installment_items_total_amount += order_item.total_amount
             else:
-                instant_order_item = InstantOrderItem.objects.filter(**filters)
-                if instant_order_item.exists():
-                    instant_order_item.update(**payload)
-                else:
-                    InstantOrderItem.objects.create(**filters, **payload, **audit_fields)
-            cart_item.status = "SUCCESS"
-            cart_item.save()
-
-        self.__class__.objects.filter(id=self.id).update(order_guid=order.id, is_checked_out=True)
+                order_item.prepare_checkout()
+            new_order_items[order_item_model].append(order_item)
+
+        with transaction.atomic():
+            for order_item_model in order_item_models:
+                order_item_model.objects.bulk_create(new_order_items[order_item_model])
+                order_item_model.objects.bulk_update(
+                    changed_order_items[order_item_model],
+                    ['confirmation_status', 'quantity', 'unit_price'])
+            order.refresh_summary()
+
+            CartItem.objects.filter(id__in=[cart_item.id for cart_item in cart_items]).update(
+                status='SUCCESS', updated_on=timezone.now())
+            self.__class__.objects.filter(id=self.id).update(
+                order_guid=order.id, is_checked_out=True)
 
     def checkout_specific_items_in_cart(self, cart_items=[]):
         """Checkout a specific item in cart."""
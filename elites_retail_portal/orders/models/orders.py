@@ -4,7 +4,7 @@ import logging
 from decimal import Decimal
 from datetime import timedelta, date
 
-from django.db import models
+from django.db import models, transaction
 from django.db.models import PROTECT, CASCADE
 from django.utils import timezone
 from django.core.exceptions import ValidationError
@@ -93,9 +93,61 @@ MONTHLY = 'MONTHLY'
 NORMAL = 'NORMAL'
 RATIO = 'RATIO'
 
+ORDER_SUMMARY_FIELDS = (
+    'order_name', 'item_count', 'instant_order_items_total',
+    'installment_order_items_total', 'order_total', 'amount_paid', 'amount_due')
+
 now = timezone.now()
 
 
+def summarize_order_items(order, order_items):
+    """Summarize the order items of an order into its heading and totals.
+
+    order_items are (is_installment, item_name, total_amount, amount_paid) tuples in the
+    order the item names appear in the heading.
+    """
+    item_names = ', '.join(item_name for _, item_name, _, _ in order_items)
+    order_name = "{} {}".format(order.order_number, item_names)
+    instant_order_items_total = sum(
+        (total_amount or 0 for is_installment, _, total_amount, _ in order_items
+            if not is_installment), Decimal(0))
+    installment_order_items_total = sum(
+        (total_amount or 0 for is_installment, _, total_amount, _ in order_items
+            if is_installment), Decimal(0))
+    order_total = instant_order_items_total + installment_order_items_total
+    amount_paid = sum((amount_paid or 0 for _, _, _, amount_paid in order_items), Decimal(0))
+
+    return {
+        'order_name': order_name[:Order._meta.get_field('order_name').max_length],
+        'item_count': len(order_items),
+        'instant_order_items_total': instant_order_items_total,
+        'installment_order_items_total': installment_order_items_total,
+        'order_total': order_total,
+        'amount_paid': amount_paid,
+        'amount_due': max(order_total - amount_paid, Decimal(0)),
+    }
+
+
+def compute_order_summaries(orders):
+    """Compute the heading and totals of the orders from their order items.
+
+    The order items of all the orders are read in one query per order item model.
+    """
+    orders = list(orders)
+    order_items = {order.id: [] for order in orders}
+    for is_installment, order_item_model in (
+            (False, InstantOrderItem), (True, InstallmentsOrderItem)):
+        rows = order_item_model.objects.filter(order__in=list(order_items)).values_list(
+            'order_id', 'cart_item__catalog_item__inventory_item__item__item_name',
+            'total_amount', 'amount_paid')
+        for order_id, item_name, total_amount, amount_paid in rows:
+            order_items[order_id].append(
+                (is_installment, item_name, total_amount, amount_paid))
+
+    return {
+        order.id: summarize_order_items(order, order_items[order.id]) for order in orders}
+
+
 class Order(AbstractBase):
     """Order Model."""
 
@@ -115,6 +167,13 @@ class Order(AbstractBase):
     order_total = models.DecimalField(
         max_digits=30, decimal_places=2, validators=[MinValueValidator(0.00)],
         null=True, blank=True, default=0)
+    item_count = models.IntegerField(default=0)
+    amount_paid = models.DecimalField(
+        max_digits=30, decimal_places=2, validators=[MinValueValidator(0.00)],
+        null=True, blank=True, default=0)
+    amount_due = models.DecimalField(
+        max_digits=30, decimal_places=2, validators=[MinValueValidator(0.00)],
+        null=True, blank=True, default=0)
     is_processed = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
     is_cleared = models.BooleanField(default=False)
@@ -123,72 +182,32 @@ class Order(AbstractBase):
 
     def compose_order_name(self):
         """Compose order name."""
-        order_name = f'{self.order_number}'
-        instant_order_items = InstantOrderItem.objects.filter(order__id=self.id)
-        installment_order_items = InstallmentsOrderItem.objects.filter(order__id=self.id)
-        names = []
-        if instant_order_items:
-            for instant_order_item in instant_order_items:
-                names.append(
-                    instant_order_item.cart_item.catalog_item.inventory_item.item.item_name)
-
-        if installment_order_items:
-            for installment_order_item in installment_order_items:
-                names.append(
-                    installment_order_item.cart_item.catalog_item.inventory_item.item.item_name)    # noqa
-
-        item_names = ', '.join(names)
-
-        return "{} {}".format(order_name, item_names)
+        return compute_order_summaries([self])[self.id]['order_name']
 
     @property
     def heading(self):
         """Order heading."""
-        return self.compose_order_name()
+        return self.order_name
 
     @property
     def summary(self):
         """Generate Order Summary."""
-        instant_order_items = InstantOrderItem.objects.filter(order=self)
-        installment_order_items = InstallmentsOrderItem.objects.filter(order=self)
-        order_total = 0
-        instant_item_spending = []
-        installment_item_spending = []
-        amount_paid_total = 0
-        order_total = 0
-        if instant_order_items.exists():
-            for instant_order_item in instant_order_items:
-                total_amount = instant_order_item.total_amount
-                amount_paid = instant_order_item.amount_paid
-                amount_paid_total += amount_paid
-                order_total += total_amount
-
-                data = {
-                    'item': instant_order_item,
-                    'total_amount': total_amount,
-                    'amount_paid': amount_paid,
-                }
-                instant_item_spending.append(data)
-
-        if installment_order_items.exists():
-            for installment_order_item in installment_order_items:
-                total_amount = installment_order_item.total_amount
-                amount_paid = installment_order_item.amount_paid
-                amount_paid_total += amount_paid
-                order_total += total_amount
-
-                data = {
-                    'item': installment_order_item,
-                    'total_amount': total_amount,
-                    'amount_paid': amount_paid,
-                }
-                installment_item_spending.append(data)
-
-        amount_due = order_total - amount_paid_total
+        instant_item_spending = [
+            {
+                'item': instant_order_item,
+                'total_amount': instant_order_item.total_amount,
+                'amount_paid': instant_order_item.amount_paid,
+            } for instant_order_item in InstantOrderItem.objects.filter(order=self)]
+        installment_item_spending = [
+            {
+                'item': installment_order_item,
+                'total_amount': installment_order_item.total_amount,
+                'amount_paid': installment_order_item.amount_paid,
+            } for installment_order_item in InstallmentsOrderItem.objects.filter(order=self)]
         summary = {
-            'paid_total': amount_paid_total,
-            'amount_due': amount_due,
-            'order_total': order_total,
+            'paid_total': self.amount_paid,
+            'amount_due': self.amount_due,
+            'order_total': self.order_total,
             'instant_items': instant_item_spending,
             'installment_items': installment_item_spending,
             }
@@ -223,34 +242,27 @@ class Order(AbstractBase):
         # send email and sms notification to user
 
     def get_order_total(self):
-        """Get order total."""
-        instant_order_items_total = 0
-        installment_order_items_total = 0
-        order_total = 0
-        instant_items = InstantOrderItem.objects.filter(order=self)
-        if instant_items.exists():
-            prices = []
-            for item in instant_items:
-                price = float(item.cart_item.selling_price)
-                total_price = price * item.cart_item.closing_quantity
-                prices.append(total_price)
-
-            instant_order_items_total = sum(prices)
-
-        installment_items = InstallmentsOrderItem.objects.filter(order=self)
-        if installment_items.exists():
-            prices = []
-            for item in installment_items:
-                price = float(item.cart_item.selling_price)
-                total_price = price * item.cart_item.closing_quantity
-                prices.append(total_price)
+        """Get the order heading and totals from its order items."""
+        summary = compute_order_summaries([self])[self.id]
+        for field, value in summary.items():
+            setattr(self, field, value)
+
+        return summary
+
+    def refresh_summary(self):
+        """Store the order heading and totals computed from its order items.
 
-            installment_order_items_total = sum(prices)
+        The order is locked until the transaction ends so that concurrent changes to its
+        order items are summarized one after the other.
+        """
+        with transaction.atomic():
+            list(self.__class__.objects.select_for_update().filter(
+                id=self.id).values_list('id', flat=True))
+            summary = compute_order_summaries([self])[self.id]
+            self.__class__.objects.filter(id=self.id).update(**summary)
 
-        order_total = instant_order_items_total + installment_order_items_total
-        self.instant_order_items_total = instant_order_items_total
-        self.installment_order_items_total = installment_order_items_total
-        self.order_total = order_total
+        for field, value in summary.items():
+            setattr(self, field, value)
 
     def clean(self) -> None:
         """Clean order."""
@@ -264,8 +276,14 @@ class Order(AbstractBase):
     def save(self, *args, **kwargs):
         """Perform pre save and post save."""
         from elites_retail_portal.debit.models import Sale
-        self.order_name = self.compose_order_name()
-        self.get_order_total()
+        if self._state.adding:
+            for field, value in summarize_order_items(self, []).items():
+                setattr(self, field, value)
+        elif not kwargs.get('update_fields'):
+            # The summary columns are only written by refresh_summary
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in ORDER_SUMMARY_FIELDS]
         super().save(*args, **kwargs)
         order = self.__class__.objects.filter(id=self.id).first()
         sales = Sale.objects.filter(order=order)
@@ -369,6 +387,18 @@ class AbstractOrderItem(AbstractBase):
         """Get the number of items awaiing clearance."""
         self.quantity_awaiting_clearance = self.quantity - self.quantity_cleared
 
+    def prepare_checkout(self):
+        """Compute and validate the fields of a new order item before it is bulk created.
+
+        This mirrors save for an uncleared order item without querying the database.
+        """
+        self.updated_on = timezone.now()
+        self.get_unit_price()
+        self.get_quantity()
+        self.get_total_amount()
+        self.get_quantity_awaiting_clearance()
+        self.full_clean(exclude=['order', 'cart_item'], validate_unique=False)
+
     def clean(self) -> None:
         """Clean Order Item."""
         self.validate_item_exists_in_inventory_or_cleared_from_store()
@@ -383,6 +413,9 @@ class AbstractOrderItem(AbstractBase):
         self.get_quantity_awaiting_clearance()
         super().save(*args, **kwargs)
         from elites_retail_portal.debit.models import Sale, SaleItem
+        from elites_retail_portal.debit.helpers.sales import (
+            get_daily_sales_contributions, update_daily_sales_summaries)
+        self.order.refresh_summary()
         self.order.refresh_from_db()
         sale = Sale.objects.filter(order=self.order).first()
         if self.is_cleared:
@@ -411,11 +444,21 @@ class AbstractOrderItem(AbstractBase):
                 self.cart_item.product.save()
 
             if sale_item.exists():
-                sale_item.update(updated_by=self.updated_by, **sale_item_payload)
+                old_contributions = get_daily_sales_contributions(sale_item)
+                sale_item.update(
+                    updated_by=self.updated_by, updated_on=timezone.now(), **sale_item_payload)
+                update_daily_sales_summaries(
+                    old_contributions, get_daily_sales_contributions(sale_item))
             else:
                 SaleItem.objects.create(**filters, **sale_item_payload, **audit_fields)
             self.__class__.objects.filter(id=self.id).update(status="SUCCESS")
 
+    def delete(self, *args, **kwargs):
+        """Perform post delete actions."""
+        deleted = super().delete(*args, **kwargs)
+        self.order.refresh_summary()
+        return deleted
+
     class Meta:
         """Meta class for order items."""
 
@@ -580,6 +623,23 @@ class InstallmentsOrderItem(AbstractOrderItem):
                 ratio = self.quantity / no_of_installment_items
                 self.share_value = ratio
 
+    def prepare_checkout(self, installment_items_total_amount=0):
+        """Compute and validate the fields of a new installment order item at checkout.
+
+        installment_items_total_amount is the total of the installment order items that
+        precede this one in the order and is used to compute the share value.
+        """
+        self.get_quantity()
+        self.calculate_speculated_end_date()
+        self.get_quantity_without_deposit()
+        self.get_total_amount()
+        self.get_amount_paid()
+        self.get_amount_due()
+        if installment_items_total_amount and self.preference_level == NORMAL and self.preference_type == RATIO:    # noqa
+            self.share_value = self.total_amount / installment_items_total_amount if self.total_amount else 1  # noqa
+        super().prepare_checkout()
+        self.is_cleared = self.amount_paid >= self.total_amount and self.quantity > 0
+
     def clean(self) -> None:
         """Clean Installment order item."""
         self.validate_deposit_more_than_minimum_deposit()
@@ -670,6 +730,13 @@ class OrderTransaction(AbstractBase):
         """Perform pre save and post save actions."""
         super().save(*args, **kwargs)
         # self.process_order_clearance()
+        self.order.refresh_summary()
+
+    def delete(self, *args, **kwargs):
+        """Perform post delete actions."""
+        deleted = super().delete(*args, **kwargs)
+        self.order.refresh_summary()
+        return deleted
 
     class Meta:
         """Meta class for order transactions."""
@@ -30,6 +30,7 @@ class CartSerializer(BaseSerializerMixin):
     """Cart Serializer class."""
 
     heading = ReadOnlyField()
+    grand_total = ReadOnlyField()
     order_number = ReadOnlyField(source='order.order_number')
     order_name = ReadOnlyField(source='order.heading')
     customer_name = CharField(source='customer.full_name', read_only=True)
@@ -152,7 +153,7 @@ class OrderTransactionSerializer(BaseSerializerMixin):
 
     def get_order_coverage_percentage(self, order_transaction):
         """Get order transaction coverage for the order."""
-        order_total = order_transaction.order.summary['order_total']
+        order_total = order_transaction.order.order_total
         coverage = int((order_transaction.amount / order_total) * 100)
 
         return coverage
@@ -9,7 +9,7 @@ from elites_retail_portal.orders import serializers, filters
 class CartViewSet(BaseViewMixin):
     """Cart Viewset class."""
 
-    queryset = Cart.objects.all().order_by('customer__first_name')
+    queryset = Cart.objects.with_totals().order_by('customer__first_name')
     serializer_class = serializers.CartSerializer
     filterset_class = filters.CartFilter
     search_fields = (
@@ -3,78 +3,135 @@
 import pytz
 import datetime
 
+from django.db.models import Count, OuterRef, Q, Subquery, Sum, UUIDField
+
 from elites_retail_portal.enterprises.models import Staff
 from elites_retail_portal.enterprises.serializers import StaffSerializer
-from elites_retail_portal.debit.models import Sale, SaleItem
-from elites_retail_portal.debit.helpers.sales import create_report_data
+from elites_retail_portal.debit.models import SaleItem
+from elites_retail_portal.debit.helpers.sales import get_sale_item_rows
 from elites_retail_portal.encounters.models import Encounter
 
+SALES_PERSON_PERIODS = ('day', 'week', 'month')
+
+SALES_TOTALS = {
+    'amount_paid': 'amount_paid',
+    'total_price': 'total_amount',
+    'total_quantity': 'quantity_sold',
+}
+
+CATEGORY_NAME_FIELD = 'catalog_item__inventory_item__item__item_model__item_type__category__category_name'    # noqa
+
+
+def get_period_starts():
+    """Get the start of today, this week and this month in Nairobi."""
+    nairobi = pytz.timezone('Africa/Nairobi')
+    today = datetime.datetime.now(tz=nairobi).date()
+    period_dates = {
+        'day': today,
+        'week': today - datetime.timedelta(days=today.weekday()),
+        'month': today.replace(day=1),
+    }
+
+    return {
+        period: nairobi.localize(datetime.datetime.combine(period_date, datetime.time.min))
+        for period, period_date in period_dates.items()}
+
+
+def get_sales_person_sale_items(enterprise_code, staff_members, start_date=None, end_date=None):
+    """Get the sale items of the orders made in the staff members' encounters.
+
+    Each sale item is annotated with the sales person of the encounter of its order.
+    """
+    sales_persons = Encounter.objects.filter(
+        order_guid=OuterRef('sale__order'), sales_person__isnull=False).order_by(
+            '-created_on').values('sales_person')[:1]
+    sale_items = SaleItem.objects.filter(sale__enterprise=enterprise_code).annotate(
+        sales_person=Subquery(sales_persons, output_field=UUIDField())).filter(
+            sales_person__in=[staff_member.id for staff_member in staff_members])
+    if start_date:
+        sale_items = sale_items.filter(sale__sale_date__gte=start_date)
+    if end_date:
+        sale_items = sale_items.filter(sale__sale_date__lte=end_date)
+
+    return sale_items.order_by('-sale__sale_date')
+
+
+def get_sales_totals(sale_items, group_fields, period_starts):
+    """Total the sale items of each group in one grouped query.
+
+    Besides the totals of all the sale items, the sale items of each period are totalled
+    with conditional sums and counts.
+    """
+    periods = [('all', Q())] + [
+        (period, Q(sale__sale_date__gte=period_starts[period]))
+        for period in SALES_PERSON_PERIODS]
+    aggregates = {}
+    for period, period_filter in periods:
+        for total, field in SALES_TOTALS.items():
+            aggregates['{}_{}'.format(period, total)] = Sum(field, filter=period_filter)
+        aggregates['{}_sales_count'.format(period)] = Count(
+            'sale', filter=period_filter, distinct=True)
+
+    return sale_items.order_by().values(*group_fields).annotate(**aggregates)
+
+
+def compose_totals(totals, period='all'):
+    """Compose the totals of a group, of all its sale items or of one of its periods."""
+    composed_totals = {}
+    for total in SALES_TOTALS:
+        value = totals['{}_{}'.format(period, total)] if totals else None
+        composed_totals[total] = float(value) if value is not None else 0
+    composed_totals['sales_count'] = totals['{}_sales_count'.format(period)] if totals else 0
+
+    return composed_totals
+
 
 def get_sales_person_sales_data(
-        enterprise_code, staff_members=[], start_date=None, end_date=None):
-    """Get sales person sales data."""
-    sales_data = []
+        enterprise_code, staff_members=[], start_date=None, end_date=None,
+        by_category=False):
+    """Get sales person sales data.
 
+    The sale items of all the staff members are read in one query and totalled in one
+    query grouped by sales person, whatever the number of staff members.
+    """
     if not staff_members:
         staff_members = Staff.objects.filter(enterprise=enterprise_code)
-        if staff_members.exists():
-            encounters = Encounter.objects.filter(
-                enterprise=enterprise_code, sales_person__in=staff_members)
-    else:
-        encounters = Encounter.objects.filter(
-            enterprise=enterprise_code, sales_person__in=staff_members)
-
-    for staff_member in staff_members:
-        encounters = Encounter.objects.filter(sales_person=staff_member, order_guid__isnull=False)
-        order_ids = list(map(str, encounters.values_list('order_guid', flat=True)))
-
-        if not start_date and not end_date:
-            today = datetime.datetime.now(tz=pytz.timezone('Africa/Nairobi')).date()
-            sales = Sale.objects.filter(
-                enterprise=enterprise_code, order_id__in=order_ids, sale_date__gte=today)
-            sales = Sale.objects.filter(enterprise=enterprise_code, order__id__in=order_ids)
-            sale_items = SaleItem.objects.filter(sale__in=sales).order_by('-sale__sale_date')
-            sales_person_data = StaffSerializer(staff_member).data
-            report_data = create_report_data(sale_items)
-
-            sales_data.append({
-                "sales_person": sales_person_data,
-                "report_data": report_data,
-            })
-            continue
-
-        if start_date and end_date:
-            sales = Sale.objects.filter(
-                enterprise=enterprise_code, order__id__in=order_ids, sale_date__gte=start_date,
-                sale_date__lte=end_date).order_by('-sale_date')
-            sale_items = SaleItem.objects.filter(sale__in=sales).order_by('-sale__sale_date')
-            sales_person_data = StaffSerializer(staff_member).data
-            report_data = create_report_data(sale_items)
-            sales_data.append({
-                "sales_person": sales_person_data,
-                "report_data": report_data,
-            })
-            continue
-
-        if start_date and not end_date:
-            sales = Sale.objects.filter(
-                enterprise=enterprise_code, order__id__in=order_ids,
-                sale_date__gte=start_date).order_by('-sale_date')
-            sale_items = SaleItem.objects.filter(sale__in=sales).order_by('-sale__sale_date')
-            sales_person_data = StaffSerializer(staff_member).data
-            report_data = create_report_data(sale_items)
-            sales_data.append({
-                "sales_person": sales_person_data,
-                "report_data": report_data,
+    staff_members = list(staff_members)
+
+    sale_items = get_sales_person_sale_items(
+        enterprise_code, staff_members, start_date, end_date)
+    period_starts = get_period_starts()
+    sales_rows = {staff_member.id: [] for staff_member in staff_members}
+    for row in get_sale_item_rows(sale_items, extra_columns=['sales_person']):
+        sales_rows[row.pop('sales_person')].append(row)
+
+    totals = {
+        sales_person_totals['sales_person']: sales_person_totals
+        for sales_person_totals in get_sales_totals(
+            sale_items, ['sales_person'], period_starts)}
+    category_totals = {staff_member.id: [] for staff_member in staff_members}
+    if by_category:
+        for sales_person_totals in get_sales_totals(
+                sale_items, ['sales_person', CATEGORY_NAME_FIELD], period_starts):
+            category_totals[sales_person_totals['sales_person']].append({
+                'category': sales_person_totals[CATEGORY_NAME_FIELD],
+                'totals_data': compose_totals(sales_person_totals),
             })
-            continue
-
-        sales = Sale.objects.filter(
-            enterprise=enterprise_code, order__id__in=order_ids,
-            sale_date__lte=end_date).order_by('-sale_date')
-        sale_items = SaleItem.objects.filter(sale__in=sales).order_by('-sale__sale_date')
-        sales_person_data = StaffSerializer(staff_member).data
-        report_data = create_report_data(sale_items)
+
+    sales_data = []
+    sales_persons_data = StaffSerializer(staff_members, many=True).data
+    for staff_member, sales_person_data in zip(staff_members, sales_persons_data):
+        staff_member_totals = totals.get(staff_member.id)
+        report_data = {
+            'sales_data': sales_rows[staff_member.id],
+            'totals_data': compose_totals(staff_member_totals),
+            'period_totals_data': {
+                period: compose_totals(staff_member_totals, period)
+                for period in SALES_PERSON_PERIODS},
+        }
+        if by_category:
+            report_data['category_totals_data'] = category_totals[staff_member.id]
+
         sales_data.append({
             "sales_person": sales_person_data,
             "report_data": report_data,
@@ -3,15 +3,19 @@
 import time
 import math
 import base64
+import hashlib
 import logging
+import threading
 from datetime import datetime
 import requests
 
 from django.http import HttpResponse, JsonResponse
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 from rest_framework.response import Response
 from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 
 from phonenumber_field.phonenumber import to_python
@@ -23,82 +27,146 @@ from .utils import PaymentErrorCode
 
 logging = logging.getLogger("default")
 
+MPESA_ACCESS_TOKEN_PATH = '/oauth/v1/generate?grant_type=client_credentials'
+MPESA_STK_PUSH_PATH = '/mpesa/stkpush/v1/processrequest'
+MPESA_REGISTER_URL_PATH = '/mpesa/c2b/v1/registerurl'
+
+MPESA_ACCESS_TOKEN_CACHE_KEY = 'mpesa_access_token:{}'
+MPESA_ACCESS_TOKEN_LOCK_KEY = 'mpesa_access_token_lock:{}'
+MPESA_ACCESS_TOKEN_LIFETIME = 3600
+
+_session = None
+_session_lock = threading.Lock()
+_access_token_lock = threading.Lock()
+
+
+def get_mpesa_session():
+    """Get the HTTP session shared by the gateways of the process.
+
+    The session keeps a pool of connections open to the M-Pesa API so that requests do not
+    set up a new connection each.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=settings.MPESA_CONNECTION_POOL_SIZE,
+                pool_maxsize=settings.MPESA_CONNECTION_POOL_SIZE)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _session = session
+
+    return _session
+
 
 # TODO Register callback and verification url
 
 class MpesaGateWay:
-    """Mpesa Gateway class."""
+    """Mpesa Gateway class.
+
+    Creating a gateway does not call the M-Pesa API. The access token is fetched on the
+    first request and shared through the cache by all the gateways with the same
+    credentials until shortly before it expires.
+    """
 
     shortcode = None
     consumer_key = None
     consumer_secret = None
     access_token_url = None
-    access_token = None
-    access_token_expiration = None
     checkout_url = None
     timestamp = None
 
-    def __init__(self):
+    def __init__(self, api_url=None):
         """Initialize variables."""
-        self.now = datetime.now()
         self.shortcode = '174379'
-        self.consumer_key = '0uLw9wagDGvENbgRObMdu7dEX4Ex636m'
-        self.consumer_secret = 'gLiDGxDwiyhhcuBL'
+        self.consumer_key = settings.MPESA_CONSUMER_KEY
+        self.consumer_secret = settings.MPESA_CONSUMER_SECRET
         self.pass_key = 'bfb279f9aa9bdbcf158e97dd71a467cd2e0c893059b10f78e6b72ada1ed2c919'
-        self.access_token_url = settings.MPESA_ACCESS_TOKEN_URL
+        self.api_url = (api_url or settings.MPESA_BASE_URL).rstrip('/')
+        self.access_token_url = self.api_url + MPESA_ACCESS_TOKEN_PATH
         self.LIPA_NA_MPESA_BUSINESS_SHORT_CODE = '600982'
 
-        self.password = self.generate_password()
         self.c2b_callback = settings.MPESA_C2B_URL
-        self.checkout_url = settings.MPESA_CHECKOUT_URL
+        self.checkout_url = self.api_url + MPESA_STK_PUSH_PATH
         self.base_url = settings.NGROK_BASE_URL
+        self.session = get_mpesa_session()
+        self.timeout = settings.MPESA_REQUEST_TIMEOUT
 
-        try:
-            self.access_token = self.get_access_token()
-            if self.access_token is None:
-                raise Exception("Request for access token failed.")
-        except Exception as e:
-            logging.error("Error {}".format(e))
-        else:
-            self.access_token_expiration = time.time() + 3400
+        credentials = '{}:{}'.format(self.access_token_url, self.consumer_key)
+        credentials_key = hashlib.sha256(credentials.encode()).hexdigest()
+        self.access_token_cache_key = MPESA_ACCESS_TOKEN_CACHE_KEY.format(credentials_key)
+        self.access_token_lock_key = MPESA_ACCESS_TOKEN_LOCK_KEY.format(credentials_key)
 
         # simulation = self.simulate_c2b_transaction()
         # registration1 = self.register_urls1()
         # registration2 = self.register_urls2()
 
-    def get_access_token(self):
-        """Get access token."""
+    def fetch_access_token(self):
+        """Fetch a new access token and the seconds it expires in from the M-Pesa API."""
         try:
-            res = requests.get(
+            res = self.session.get(
                 self.access_token_url,
                 auth=HTTPBasicAuth(self.consumer_key, self.consumer_secret),
+                timeout=self.timeout,
             )
-            token = res.json()["access_token"]
-            self.headers = {"Authorization": "Bearer %s" % token}
+            res_data = res.json()
+            token = res_data["access_token"]
         except Exception as err:
             logging.error("Error {}".format(err))
             raise err
-        else:
-            token = res.json()["access_token"]
-            self.headers = {"Authorization": "Bearer %s" % token}
-            return token
 
-    class Decorators:
-        """Mpesa Gateway decorator class."""
+        return token, int(res_data.get("expires_in", MPESA_ACCESS_TOKEN_LIFETIME))
 
-        @staticmethod
-        def refreshToken(decorated):
-            """Refresh the access token."""
-            def wrapper(gateway, *args, **kwargs):
-                if (
-                    gateway.access_token_expiration
-                    and time.time() > gateway.access_token_expiration
-                ):
-                    token = gateway.get_access_token()
-                    gateway.access_token = token
-                return decorated(gateway, *args, **kwargs)
+    def get_access_token(self):
+        """Get the shared access token, fetching a new one if it is about to expire.
+
+        Only one gateway fetches the token at a time, across threads through a lock and
+        across processes through a lock in the cache. The others wait for the token it
+        caches, or fetch one themselves if the lock is not released in time.
+        """
+        token = cache.get(self.access_token_cache_key)
+        if token:
+            return token
 
-            return wrapper
+        with _access_token_lock:
+            deadline = time.monotonic() + self.timeout
+            locked = cache.add(self.access_token_lock_key, True, self.timeout)
+            while not locked and time.monotonic() < deadline:
+                time.sleep(0.05)
+                token = cache.get(self.access_token_cache_key)
+                if token:
+                    return token
+                locked = cache.add(self.access_token_lock_key, True, self.timeout)
+
+            token = cache.get(self.access_token_cache_key)
+            if token:
+                return token
+
+            try:
+                token, expires_in = self.fetch_access_token()
+                cache.set(
+                    self.access_token_cache_key, token,
+                    max(expires_in - settings.MPESA_ACCESS_TOKEN_EXPIRY_MARGIN, 1))
+            finally:
+                if locked:
+                    cache.delete(self.access_token_lock_key)
+
+        return token
+
+    def invalidate_access_token(self):
+        """Drop the shared access token so the next request fetches a new one."""
+        cache.delete(self.access_token_cache_key)
+
+    @property
+    def access_token(self):
+        """Access token of the requests."""
+        return self.get_access_token()
+
+    @property
+    def headers(self):
+        """Headers authorizing the requests."""
+        return {"Authorization": "Bearer %s" % self.get_access_token()}
 
     def generate_password(self, shortcode=None, pass_key=None):
         """Generate mpesa api password using the provided shortcode and passkey."""
@@ -106,7 +174,7 @@ class MpesaGateWay:
             shortcode = self.shortcode
         if not pass_key:
             pass_key = self.pass_key
-        self.timestamp = self.now.strftime("%Y%m%d%H%M%S")
+        self.timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
         password_str = shortcode + pass_key + self.timestamp
         password_bytes = password_str.encode("ascii")
         return base64.b64encode(password_bytes).decode("utf-8")
@@ -138,11 +206,9 @@ class MpesaGateWay:
 
         return phone_number
 
-    @Decorators.refreshToken
     def stk_push_request(self, payload):
         """Push the notification on the client's phone."""
         request = None
-        STK_PUSH_URL = 'https://sandbox.safaricom.co.ke/mpesa/stkpush/v1/processrequest'
         try:
             shortcode = payload['BusinessShortCode']
             pass_key = payload['PassKey']
@@ -173,9 +239,15 @@ class MpesaGateWay:
             "TransactionDesc": "Test",
         }
 
-        res = requests.post(
-            STK_PUSH_URL, json=req_data, headers=self.headers, timeout=30
+        res = self.session.post(
+            self.checkout_url, json=req_data, headers=self.headers, timeout=self.timeout
         )
+        if res.status_code == 401:
+            # The access token was revoked before it expired
+            self.invalidate_access_token()
+            res = self.session.post(
+                self.checkout_url, json=req_data, headers=self.headers, timeout=self.timeout
+            )
         status_code = res.status_code
         res_data = res.json()
         logging.info("Mpesa request data {}".format(req_data))
@@ -263,26 +335,22 @@ class MpesaGateWay:
     @csrf_exempt
     def register_urls1(self):
         """."""
-        api_url = "https://sandbox.safaricom.co.ke/mpesa/c2b/v1/registerurl"
-        headers = {"Authorization": f"Bearer {self.get_access_token()}"}
+        api_url = self.api_url + MPESA_REGISTER_URL_PATH
         options = {
             "ShortCode": '600426',
             "ResponseType": "Completed",
             "ValidationURL": f"{self.base_url}/v1/adapters/mobile_money/safaricom/c2b/validation/",
             "ConfirmationURL": f"{self.base_url}/v1/adapters/mobile_money/safaricom/c2b/confirmation/",    # noqa
         }
-        response = requests.post(api_url, json=options, headers=headers)
+        response = self.session.post(
+            api_url, json=options, headers=self.headers, timeout=self.timeout)
         # response = requests.post(api_url, json=options, headers=headers, verify=False)
 
         return HttpResponse(response.text)
 
     def register_urls2(self):
         """."""
-        my_access_token = self.get_access_token()
-
-        api_url = "https://sandbox.safaricom.co.ke/safaricom/c2b/v1/registerurl"
-
-        headers = {"Authorization": "Bearer %s" % my_access_token}
+        api_url = self.api_url + "/safaricom/c2b/v1/registerurl"
 
         payload = {
             "ShortCode": self.LIPA_NA_MPESA_BUSINESS_SHORT_CODE,
@@ -291,17 +359,14 @@ class MpesaGateWay:
             "ValidationURL":   f"{self.base_url}/api/payments/c2b-validation/",
         }
 
-        response = requests.post(api_url, json=payload, headers=headers)
+        response = self.session.post(
+            api_url, json=payload, headers=self.headers, timeout=self.timeout)
         # response = requests.post(api_url, json=request, headers=headers, verify=False)
         return response
 
     def simulate_c2b_transaction(self):
         """Simulate a customer to business transaction."""
-        my_access_token = self.get_access_token()
-
-        api_url = "https://sandbox.safaricom.co.ke/safaricom/c2b/v1/simulate"
-
-        headers = {"Authorization": f"Bearer {my_access_token}"}
+        api_url = self.api_url + "/safaricom/c2b/v1/simulate"
 
         payload = {
             "ShortCode": self.LIPA_NA_MPESA_BUSINESS_SHORT_CODE,
@@ -311,7 +376,8 @@ class MpesaGateWay:
             "BillRefNumber": "+254718488252",
         }
 
-        response = requests.post(api_url, json=payload, headers=headers)
+        response = self.session.post(
+            api_url, json=payload, headers=self.headers, timeout=self.timeout)
 
         # response = requests.post(api_url, json=request, headers=headers, verify=False)
 
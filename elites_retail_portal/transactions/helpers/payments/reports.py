@@ -3,61 +3,123 @@
 import pytz
 import datetime
 
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+
+from elites_retail_portal.common.models import compose_full_name
 from elites_retail_portal.transactions.models import Payment
 
+PAYMENTS_REPORT_CHUNK_SIZE = 2000
 
-def create_report_data(payments):
-    """Create reports data."""
-    payments_data = []
-    totals_data = {}
-    total_paid_amount = 0
-    for payment in payments:
-        data = {
-            'account_number': payment.account_number,
-            'balance_amount': payment.balance_amount,
-            'customer': payment.customer.full_name if payment.customer else '',
-            'encounter': payment.encounter.receipt_number if payment.encounter else "",
-            'final_amount': payment.final_amount,
-            'is_confirmed': 'CONFIRMED' if payment.is_confirmed else "NOT CONFIRMED",
-            'is_installment': "INSTALLMENT" if payment.is_processed else "INSANT",
-            'is_processed': "PROCESSED" if payment.is_processed else "NOT PROCESSED",
-            'paid_amount': payment.paid_amount,
-            'payment_code': payment.payment_code,
-            'payment_method': payment.payment_method,
-            'payment_time': payment.payment_time,
-            'required_amount': payment.required_amount,
-            'transaction_code': payment.transaction_code,
+PAYMENTS_REPORT_COLUMNS = {
+    'customer_title': F('customer__title'),
+    'customer_first_name': F('customer__first_name'),
+    'customer_other_names': F('customer__other_names'),
+    'customer_last_name': F('customer__last_name'),
+    'receipt_number': F('encounter__receipt_number'),
+}
+
+
+def get_payment_rows(payments, chunk_size=PAYMENTS_REPORT_CHUNK_SIZE):
+    """Yield the report rows of the payments.
+
+    The columns of the customers and encounters are read along with the payments in one
+    query, which is iterated in chunks.
+    """
+    payments = payments.values(
+        'account_number', 'balance_amount', 'customer', 'encounter', 'final_amount',
+        'is_confirmed', 'is_installment', 'is_processed', 'paid_amount', 'payment_code',
+        'payment_method', 'payment_time', 'required_amount', 'transaction_code',
+        **PAYMENTS_REPORT_COLUMNS)
+    for payment in payments.iterator(chunk_size=chunk_size):
+        customer = compose_full_name(
+            payment['customer_title'], payment['customer_first_name'],
+            payment['customer_other_names'], payment['customer_last_name'],
+        ) if payment['customer'] else ''
+        yield {
+            'account_number': payment['account_number'],
+            'balance_amount': payment['balance_amount'],
+            'customer': customer,
+            'encounter': payment['receipt_number'] if payment['encounter'] else '',
+            'final_amount': payment['final_amount'],
+            'is_confirmed': 'CONFIRMED' if payment['is_confirmed'] else 'NOT CONFIRMED',
+            'is_installment': 'INSTALLMENT' if payment['is_installment'] else 'INSTANT',
+            'is_processed': 'PROCESSED' if payment['is_processed'] else 'NOT PROCESSED',
+            'paid_amount': payment['paid_amount'],
+            'payment_code': payment['payment_code'],
+            'payment_method': payment['payment_method'],
+            'payment_time': payment['payment_time'],
+            'required_amount': payment['required_amount'],
+            'transaction_code': payment['transaction_code'],
         }
-        payments_data.append(data)
-        total_paid_amount += data['paid_amount']
 
-    totals_data['paid_amount'] = total_paid_amount
+
+def get_payments_totals(payments, group_fields):
+    """Total the paid amounts of the payments in groups of the fields."""
+    return payments.order_by(*group_fields).values(*group_fields).annotate(
+        total_paid_amount=Sum('paid_amount'), payments_count=Count('id'))
+
+
+def create_report_data(payments):
+    """Create reports data.
+
+    The paid amounts are totalled by the database, overall, per payment method and per
+    day of payment.
+    """
+    payments_data = list(get_payment_rows(payments))
+    totals = payments.order_by().aggregate(
+        total_paid_amount=Sum('paid_amount'), payments_count=Count('id'))
+    payment_method_totals = get_payments_totals(payments, ['payment_method'])
+    daily_totals = get_payments_totals(
+        payments.annotate(payment_date=TruncDate(
+            'payment_time', tzinfo=pytz.timezone('Africa/Nairobi'))),
+        ['payment_date'])
 
     return {
         "payments_data": payments_data,
-        "totals_data": totals_data,
+        "totals_data": {
+            'paid_amount': totals['total_paid_amount'] or 0,
+            'payments_count': totals['payments_count'],
+        },
+        "payment_method_totals_data": [
+            {
+                'payment_method': method_totals['payment_method'],
+                'paid_amount': method_totals['total_paid_amount'],
+                'payments_count': method_totals['payments_count'],
+            } for method_totals in payment_method_totals],
+        "daily_totals_data": [
+            {
+                'payment_date': day_totals['payment_date'],
+                'paid_amount': day_totals['total_paid_amount'],
+                'payments_count': day_totals['payments_count'],
+            } for day_totals in daily_totals],
         }
 
 
-def generate_payments_report(enterprise_code, start_date=None, end_date=None):
-    """Generate sales report."""
+def get_payments_report_payments(enterprise_code, start_date=None, end_date=None):
+    """Get the payments of the payments report.
+
+    Without a start and an end date, the report covers today's payments.
+    """
     if not start_date and not end_date:
-        today = datetime.datetime.now(tz=pytz.timezone('Africa/Nairobi')).date()
-        payments = Payment.objects.filter(enterprise=enterprise_code, payment_time__gte=today)
-        return create_report_data(payments)
-
-    if start_date and end_date:
-        payments = Payment.objects.filter(
-            enterprise=enterprise_code, payment_time__gte=start_date,
-            payment_time__lte=end_date).order_by('-payment_time')
-        return create_report_data(payments)
-
-    if start_date and not end_date:
-        payments = Payment.objects.filter(
-            enterprise=enterprise_code, payment_time__gte=start_date).order_by('-payment_time')
-        return create_report_data(payments)
-
-    # Has end date and no start date
-    payments = Payment.objects.filter(
-        enterprise=enterprise_code, payment_time__lte=end_date).order_by('-payment_time')
-    return create_report_data(payments)
+        start_date = datetime.datetime.now(tz=pytz.timezone('Africa/Nairobi')).date()
+
+    payments = Payment.objects.filter(enterprise=enterprise_code)
+    if start_date:
+        payments = payments.filter(payment_time__gte=start_date)
+    if end_date:
+        payments = payments.filter(payment_time__lte=end_date)
+
+    return payments.order_by('-payment_time')
+
+
+def get_payments_report_rows(enterprise_code, start_date=None, end_date=None):
+    """Yield the rows of the payments report without loading all the payments."""
+    return get_payment_rows(
+        get_payments_report_payments(enterprise_code, start_date, end_date))
+
+
+def generate_payments_report(enterprise_code, start_date=None, end_date=None):
+    """Generate payments report."""
+    return create_report_data(
+        get_payments_report_payments(enterprise_code, start_date, end_date))
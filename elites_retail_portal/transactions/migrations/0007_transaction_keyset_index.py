@@ -0,0 +1,17 @@
+# Generated by Django 4.1.1 on 2026-10-18 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0006_payment_status_transaction_status'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['enterprise', '-created_on', '-id'], name='transaction_keyset_idx'),
+        ),
+    ]
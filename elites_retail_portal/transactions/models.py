@@ -132,6 +132,14 @@ class Transaction(AbstractBase):
         self.get_customer()
         super().save(*args, **kwargs)
 
+    class Meta:
+        """Meta class for transaction model."""
+
+        indexes = [
+            models.Index(
+                fields=['enterprise', '-created_on', '-id'], name='transaction_keyset_idx'),
+        ]
+
 
 class Payment(AbstractBase):
     """Payment Requests model."""
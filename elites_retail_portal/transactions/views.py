@@ -5,6 +5,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 
 from elites_retail_portal.common.views import BaseViewMixin
+from elites_retail_portal.common.pagination import KeysetPagination
 from elites_retail_portal.transactions.models import (Transaction, Payment, PaymentRequest)
 from elites_retail_portal.transactions import serializers, filters
 from elites_retail_portal.transactions.helpers.payments.reports import generate_payments_report
@@ -15,6 +16,7 @@ class TransactionViewSet(BaseViewMixin):
 
     queryset = Transaction.objects.all().order_by('transaction_time')
     serializer_class = serializers.TransactionSerializer
+    pagination_class = KeysetPagination
     filterset_class = filters.TransactionFilter
     search_fields = (
         'transaction_code', 'payment_code', 'wallet_code',
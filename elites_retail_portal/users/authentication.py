@@ -0,0 +1,32 @@
+"""Users authentication file."""
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from elites_retail_portal.users.models import retrieve_user_identity
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """Authenticate users by their JSON web tokens using their cached identities."""
+
+    def get_user(self, validated_token):
+        """Get the user and their permissions from the cached identity of the token."""
+        token_id = validated_token.get(api_settings.JTI_CLAIM)
+        if not token_id:
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = retrieve_user_identity(user_id, token_id)
+        if not user:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
@@ -2,12 +2,23 @@
 
 import uuid
 
-from django.db import models
+from django.conf import settings
+from django.db import connection, models, transaction
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete
+from django.core.cache import cache
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 from django.contrib.auth.models import (
     BaseUserManager, AbstractBaseUser, PermissionManager, GroupManager)
 
+USER_EMAIL_CACHE_KEY = 'user_email:{}'
+USER_IDENTITY_VERSION_KEY = 'user_identity_version:{}'
+USER_IDENTITY_CACHE_KEY = 'user_identity:{}:{}'
+USER_IDENTITY_FIELDS = (
+    'id', 'guid', 'email', 'first_name', 'last_name', 'enterprise', 'is_active',
+    'is_staff', 'is_admin', 'is_superuser', 'group_id')
+
 
 class Role(models.Model):
     """Custom roles model."""
@@ -28,6 +39,12 @@ class Permission(models.Model):
 
     objects: PermissionManager
 
+    def save(self, *args, **kwargs):
+        """Perform post save actions."""
+        super().save(*args, **kwargs)
+        invalidate_user_identities(User.objects.filter(
+            group__grouppermission__permission=self).values_list('id', flat=True))
+
 
 class Group(models.Model):
     """Custom groups model."""
@@ -49,6 +66,16 @@ class Group(models.Model):
 
     objects: GroupManager
 
+    def save(self, *args, **kwargs):
+        """Perform post save actions."""
+        super().save(*args, **kwargs)
+        invalidate_user_identities(self.user_set.values_list('id', flat=True))
+
+    def delete(self, *args, **kwargs):
+        """Perform pre delete actions."""
+        invalidate_user_identities(self.user_set.values_list('id', flat=True))
+        return super().delete(*args, **kwargs)
+
 
 class GroupPermission(models.Model):
     """Group Permission Model."""
@@ -64,6 +91,11 @@ class GroupPermission(models.Model):
     group = models.ForeignKey(Group, on_delete=models.PROTECT)
     permission = models.ForeignKey(Permission, on_delete=models.PROTECT)
 
+    def save(self, *args, **kwargs):
+        """Perform post save actions."""
+        super().save(*args, **kwargs)
+        invalidate_user_identities(self.group.user_set.values_list('id', flat=True))
+
 
 class UserManager(BaseUserManager):
     """The user manager."""
@@ -119,6 +151,9 @@ class User(AbstractBaseUser):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['first_name', 'last_name']
 
+    # Permissions of a user loaded from a cached identity
+    preloaded_permissions = None
+
     @property
     def user_roles(self):
         """User roles string."""
@@ -128,11 +163,35 @@ class User(AbstractBaseUser):
     @property
     def permissions(self):
         """."""
+        if self.preloaded_permissions is not None:
+            return self.preloaded_permissions
+
         perms = []
         if self.group:
             perms = set(self.group.permissions.values_list('value', flat=True).order_by('-value'))
         return perms
 
+    def save(self, *args, **kwargs):
+        """Perform post save actions."""
+        super().save(*args, **kwargs)
+        cache.delete_many(self.email_cache_keys)
+        invalidate_user_identities([self.id])
+
+    def delete(self, *args, **kwargs):
+        """Perform post delete actions."""
+        email_cache_keys = self.email_cache_keys
+        user_id = self.id
+        result = super().delete(*args, **kwargs)
+        cache.delete_many(email_cache_keys)
+        invalidate_user_identities([user_id])
+        return result
+
+    @property
+    def email_cache_keys(self):
+        """Get the keys the user's email is cached under."""
+        return [
+            USER_EMAIL_CACHE_KEY.format(user_id) for user_id in [self.id, self.guid] if user_id]
+
     def get_full_name(self):
         """Format the user's full name."""
         return '{} {}'.format(self.first_name, self.last_name)
@@ -160,19 +219,145 @@ class UserRole(models.Model):
     role = models.ForeignKey(Role, on_delete=models.PROTECT)
 
 
+def retrieve_user_emails(user_ids):
+    """Retrieve the emails of many users given their userIDs.
+
+    An ID is matched against the user GUIDs and then the user IDs, in one query for all
+    the IDs that are not in the cache. Emails are keyed by the IDs as strings, and are
+    None for the IDs that do not match a user.
+    """
+    user_ids = {str(user_id) for user_id in user_ids if user_id}
+    emails = dict.fromkeys(user_ids)
+    cached_emails = cache.get_many([USER_EMAIL_CACHE_KEY.format(user_id) for user_id in user_ids])
+    emails.update({key.split(':', 1)[1]: email for key, email in cached_emails.items()})
+
+    missing_user_ids = [
+        user_id for user_id in user_ids
+        if USER_EMAIL_CACHE_KEY.format(user_id) not in cached_emails]
+    if missing_user_ids:
+        users = User.objects.filter(
+            Q(id__in=missing_user_ids) | Q(guid__in=missing_user_ids)).values_list(
+                'id', 'guid', 'email')
+        emails_by_id = {}
+        emails_by_guid = {}
+        for id, guid, email in users:
+            emails_by_id[str(id)] = email
+            if guid:
+                emails_by_guid[str(guid)] = email
+
+        found_emails = {}
+        for user_id in missing_user_ids:
+            email = emails_by_guid.get(user_id, emails_by_id.get(user_id))
+            emails[user_id] = email
+            if email:
+                found_emails[USER_EMAIL_CACHE_KEY.format(user_id)] = email
+
+        cache.set_many(found_emails, settings.USER_EMAILS_CACHE_TIMEOUT)
+
+    return emails
+
+
+def get_user_identity_version(user_id):
+    """Get the version the user's identity is cached under."""
+    version_key = USER_IDENTITY_VERSION_KEY.format(user_id)
+    version = cache.get(version_key)
+    if version is None:
+        cache.add(version_key, uuid.uuid4().hex, None)
+        version = cache.get(version_key)
+
+    return version
+
+
+def invalidate_user_identities(user_ids):
+    """Drop the cached identities of the users.
+
+    The versions are changed again once the transaction commits, since a concurrent
+    request could have cached the identities as they were before the change was committed.
+    """
+    version_keys = [USER_IDENTITY_VERSION_KEY.format(user_id) for user_id in user_ids]
+    if not version_keys:
+        return
+
+    cache.set_many({version_key: uuid.uuid4().hex for version_key in version_keys}, None)
+    transaction.on_commit(lambda: cache.set_many(
+        {version_key: uuid.uuid4().hex for version_key in version_keys}, None))
+
+
+def retrieve_user_identity(user_id, token_id):
+    """Retrieve a user and their permissions as of the authentication token.
+
+    The user's identity fields and permissions are cached under the token's ID and the
+    user's identity version, so the user is loaded without queries on the token's next
+    requests. The other fields of the user are deferred and loaded if they are read.
+    Identities read inside a transaction are not cached since the transaction could be
+    rolled back.
+    """
+    version = get_user_identity_version(user_id)
+    cache_key = USER_IDENTITY_CACHE_KEY.format(token_id, version)
+    identity = cache.get(cache_key)
+    if identity is None:
+        identity = User.objects.filter(id=user_id).values(*USER_IDENTITY_FIELDS).first()
+        if identity is None:
+            return None
+
+        user = User(**identity)
+        identity['permissions'] = user.permissions
+        if not connection.in_atomic_block:
+            cache.set(cache_key, identity, settings.USER_IDENTITY_CACHE_TIMEOUT)
+
+    field_names = [
+        field.attname for field in User._meta.concrete_fields if field.attname in identity]
+    user = User.from_db(
+        User.objects.db, field_names, [identity[field_name] for field_name in field_names])
+    user.preloaded_permissions = identity['permissions']
+
+    return user
+
+
 def retrieve_user_email(id_field):
     """Retrieve a user's email given the userID."""
     @property
     def user_email(self):
         """Return a user email."""
-        email = None
         id = getattr(self, id_field)
-        if User.objects.filter(id=id).exists():
-            email = User.objects.get(
-                id=getattr(self, id_field)).email
-        if User.objects.filter(guid=id).exists():
-            email = User.objects.get(
-                guid=getattr(self, id_field)).email
-
-        return email
+        if not id:
+            return None
+
+        return retrieve_user_emails([id])[str(id)]
     return user_email
+
+
+def invalidate_group_permission_user_identities(sender, instance, **kwargs):
+    """Drop the cached identities of the users of a group whose permission was removed.
+
+    Connected to post_delete so deleting group permissions in a queryset is covered.
+    """
+    invalidate_user_identities(
+        User.objects.filter(group_id=instance.group_id).values_list('id', flat=True))
+
+
+def invalidate_group_permissions_user_identities(
+        sender, instance, action, reverse, pk_set, **kwargs):
+    """Drop the cached identities of the users of groups whose permissions were changed.
+
+    Covers the add, remove, set and clear methods of group.permissions and of
+    permission.group_permissions, which do not run the group permission hooks.
+    """
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if not reverse:
+        users = User.objects.filter(group=instance)
+    elif pk_set is not None:
+        users = User.objects.filter(group__in=pk_set)
+    else:
+        users = User.objects.filter(group__grouppermission__permission=instance)
+    invalidate_user_identities(users.values_list('id', flat=True))
+
+
+post_delete.connect(
+    invalidate_group_permission_user_identities, sender=GroupPermission,
+    dispatch_uid='user_identity_group_permission_post_delete')
+m2m_changed.connect(
+    invalidate_group_permissions_user_identities, sender=Group.permissions.through,
+    dispatch_uid='user_identity_group_permissions_m2m_changed')
@@ -332,7 +332,8 @@ class WarehouseRecord(AbstractBase):
                 inventory_record.quantity_of_stock_on_display = self.removal_quantity_leaving_warehouse     # noqa
                 inventory_record.quantity_of_stock_in_warehouse = self.removal_quantity_remaining_in_warehouse    # noqa
                 inventory_record.save()
-                self.__class__.objects.filter(id=self.id).update(removal_guid=inventory_record.id)
+                self.__class__.objects.filter(id=self.id).update(
+                    removal_guid=inventory_record.id, updated_on=timezone.now())
             else:
                 payload = {
                     "inventory": default_inventory,
@@ -345,7 +346,8 @@ class WarehouseRecord(AbstractBase):
                     "quantity_of_stock_in_warehouse": self.removal_quantity_remaining_in_warehouse
                 }
                 inventory_record = InventoryRecord.objects.create(**payload, **audit_fields)
-                self.__class__.objects.filter(id=self.id).update(removal_guid=inventory_record.id)
+                self.__class__.objects.filter(id=self.id).update(
+                    removal_guid=inventory_record.id, updated_on=timezone.now())
 
     def save(self, *args, **kwargs):
         """Perform pre save and post save actions."""
@@ -0,0 +1,88 @@
+import uuid
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from elites_retail_portal.catalog.models import Catalog, Section
+from elites_retail_portal.enterprises.models import Enterprise
+from elites_retail_portal.users.models import User
+
+from model_bakery import baker
+
+
+class TestCatalogCache(TransactionTestCase):
+    """."""
+
+    def setUp(self):
+        """."""
+        self.enterprise_code = 'EAL-E/EO-MB/2301-01'
+        baker.make(
+            Enterprise, name='Enterprise One', enterprise_code=self.enterprise_code,
+            enterprise_type='FRANCHISE', business_type='SHOP')
+        self.user = User.objects.create_user(
+            email='testuser@email.com', first_name='Test', last_name='User',
+            guid=uuid.uuid4(), password='Testpass254$', enterprise=self.enterprise_code)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.section = baker.make(
+            Section, section_name='Section A', enterprise=self.enterprise_code)
+
+    def tearDown(self) -> None:
+        """."""
+        cache.clear()
+        return super().tearDown()
+
+    def get(self, url):
+        """."""
+        with CaptureQueriesContext(connection) as context:
+            resp = self.client.get(url)
+        assert resp.status_code == 200, resp.content
+        section_queries = [
+            query for query in context.captured_queries
+            if 'catalog_section' in query['sql']]
+
+        return resp, section_queries
+
+    def test_cache_responses(self):
+        """."""
+        url = reverse('v1:catalog:section-list')
+        resp, section_queries = self.get(url)
+        assert section_queries
+        assert resp.data['count'] == 1
+
+        resp, section_queries = self.get(url)
+        assert section_queries == []
+        assert resp.data['count'] == 1
+
+        resp, section_queries = self.get(url + '?section_name=Section B')
+        assert section_queries
+        assert resp.data['count'] == 0
+
+        detail_url = reverse('v1:catalog:section-detail', kwargs={'pk': self.section.id})
+        self.get(detail_url)
+        resp, section_queries = self.get(detail_url)
+        assert section_queries == []
+        assert resp.data['section_name'] == 'Section A'
+
+    def test_invalidate_responses(self):
+        """."""
+        url = reverse('v1:catalog:section-list')
+        self.get(url)
+
+        baker.make(Catalog, catalog_name='Other Enterprise Catalog', enterprise='2301-02')
+        resp, section_queries = self.get(url)
+        assert section_queries == []
+
+        self.section.section_name = 'Section B'
+        self.section.save()
+        resp, section_queries = self.get(url)
+        assert section_queries
+        assert resp.data['results'][0]['section_name'] == 'Section B'
+
+        self.section.delete()
+        resp, section_queries = self.get(url)
+        assert resp.data['count'] == 0
@@ -12,7 +12,7 @@ from elites_retail_portal.catalog.models import (
 from elites_retail_portal.customers.models import Customer
 from elites_retail_portal.debit.models import (
     InventoryItem, Inventory, InventoryRecord, InventoryInventoryItem)
-from elites_retail_portal.encounters.models import Encounter
+from elites_retail_portal.encounters.models import Encounter, StockReservation
 from elites_retail_portal.enterprises.models import Enterprise
 from elites_retail_portal.enterprise_mgt.models import (
     EnterpriseSetupRule, EnterpriseSetupRuleCatalog,
@@ -145,3 +145,16 @@ def test_get_catalog_item_available_quantity(mock_process_customer_encounter):
 
     quantity = get_catalog_item_available_quantity(catalog_item, True)
     assert quantity == 15 - 4 == 11
+    assert StockReservation.objects.filter(
+        encounter=encounter, catalog_item=catalog_item, quantity=4).count() == 1
+
+    Encounter.objects.filter(id=encounter.id).update(processing_status='ONGOING')
+    assert get_catalog_item_available_quantity(catalog_item, True) == 11
+    Encounter.objects.filter(id=encounter.id).update(processing_status='FAILED')
+    assert get_catalog_item_available_quantity(catalog_item, True) == 15
+
+    encounter.refresh_from_db()
+    encounter.processing_status = 'CANCELED'
+    encounter.save()
+    assert not StockReservation.objects.filter(encounter=encounter).exists()
+    assert get_catalog_item_available_quantity(catalog_item, True) == 15
@@ -4,7 +4,9 @@ import json
 
 from tests.utils.api import APITests
 from rest_framework.test import APITestCase
+from django.db import connection
 from django.urls import reverse
+from django.test.utils import CaptureQueriesContext
 
 from elites_retail_portal.items.models import (
     Brand, BrandItemType, Category, Item, ItemModel, ItemType,
@@ -121,6 +123,7 @@ class TestCatalogItemView(APITests, APITestCase):
             record_type='ADD', quantity_recorded=15, unit_price=300, enterprise=enterprise_code)
         section = baker.make(
             Section, section_name='Section A', enterprise=enterprise_code)
+        self.inventory_item = inventory_item
         self.recipe = Recipe(
             CatalogItem, inventory_item=inventory_item, section=section, enterprise=enterprise_code)
 
@@ -187,6 +190,145 @@ class TestCatalogItemView(APITests, APITestCase):
 
         assert resp.status_code == status_code
 
+    def make_listed_catalog_item(self, index):
+        """."""
+        inventory_item = self.inventory_item
+        enterprise_code = inventory_item.enterprise
+        item_units = ItemUnits.objects.get(item=inventory_item.item)
+        item_model = baker.make(
+            ItemModel, brand=inventory_item.item.item_model.brand,
+            item_type=inventory_item.item.item_model.item_type,
+            model_name='GE8{}K-B SUT'.format(index), enterprise=enterprise_code)
+        item = baker.make(
+            Item, item_model=item_model, barcode='8383838{}'.format(index), make_year=2020,
+            enterprise=enterprise_code)
+        baker.make(
+            ItemUnits, item=item, sales_units=item_units.sales_units,
+            purchases_units=item_units.purchases_units,
+            quantity_of_sale_units_per_purchase_unit=12, enterprise=enterprise_code)
+        inventory = Inventory.objects.get(is_master=True, enterprise=enterprise_code)
+        new_inventory_item = baker.make(InventoryItem, item=item, enterprise=enterprise_code)
+        baker.make(
+            InventoryInventoryItem, inventory=inventory, inventory_item=new_inventory_item)
+        baker.make(
+            InventoryRecord, inventory=inventory, inventory_item=new_inventory_item,
+            record_type='ADD', quantity_recorded=15, unit_price=300 + index,
+            enterprise=enterprise_code)
+        catalog_item = self.recipe.make(inventory_item=new_inventory_item)
+        baker.make(
+            CatalogCatalogItem, catalog=self.catalog, catalog_item=catalog_item,
+            enterprise=enterprise_code)
+
+        return catalog_item
+
+    def test_list_query_count(self):
+        """."""
+        self.client = authenticate_test_user()
+        url = reverse(self.url + '-list')
+        for index in range(2):
+            self.make_listed_catalog_item(index)
+
+        with CaptureQueriesContext(connection) as few_items_queries:
+            resp = self.client.get(url)
+        assert resp.status_code == 200
+        assert resp.data['count'] == 2
+
+        for index in range(2, 6):
+            self.make_listed_catalog_item(index)
+
+        with CaptureQueriesContext(connection) as many_items_queries:
+            resp = self.client.get(url)
+        assert resp.status_code == 200
+        assert resp.data['count'] == 6
+        assert len(many_items_queries) == len(few_items_queries)
+
+        catalog_item = CatalogItem.objects.get(
+            inventory_item__item__barcode='83838383')
+        result = [
+            result for result in resp.data['results']
+            if result['id'] == str(catalog_item.id)][0]
+        assert result['unit_price'] == str(catalog_item.inventory_item.unit_price)
+        assert result['sale_units_name'] == 'packet'
+        assert result['catalogs_names'] == self.catalog.catalog_name
+        assert result['item_heading'] == catalog_item.item_heading
+
+
+    def test_bulk_upsert_prices(self):
+        """."""
+        self.client = authenticate_test_user()
+        url = reverse(self.url + '-list')
+        catalog_items = [self.make_listed_catalog_item(index) for index in range(2)]
+        resp = self.client.get(url)
+        assert resp.status_code == 200
+
+        with CaptureQueriesContext(connection) as few_items_queries:
+            resp = self.client.put(url + 'bulk_upsert/', [{
+                'id': str(catalog_items[0].id), 'marked_price': '500.00',
+                'discount_amount': '50.00'}], format='json')
+        assert resp.status_code == 200, resp.content
+        catalog_items[0].refresh_from_db()
+        assert catalog_items[0].selling_price == 450
+        assert catalog_items[0].threshold_price == 300
+
+        catalog_items += [self.make_listed_catalog_item(index) for index in range(2, 6)]
+        with CaptureQueriesContext(connection) as many_items_queries:
+            resp = self.client.put(url + 'bulk_upsert/', [
+                {'id': str(catalog_item.id), 'marked_price': str(250 + index)}
+                for index, catalog_item in enumerate(catalog_items)], format='json')
+        assert resp.status_code == 200, resp.content
+        assert len(many_items_queries) == len(few_items_queries)
+        assert len(resp.data['results']) == 6
+        assert resp.data['results'][0]['item_heading']
+
+        catalog_items[0].refresh_from_db()
+        assert catalog_items[0].marked_price == 250
+        assert catalog_items[0].selling_price == 200
+        assert catalog_items[0].threshold_price == 200
+        resp = self.client.get(url)
+        assert {result['selling_price'] for result in resp.data['results']} == {
+            '200.00', '251.00', '252.00', '253.00', '254.00', '255.00'}
+
+        resp = self.client.put(url + 'bulk_upsert/', [{
+            'inventory_item': str(self.inventory_item.id),
+            'section': str(catalog_items[0].section.id), 'marked_price': '100.00'}],
+            format='json')
+        assert resp.status_code == 207
+        assert resp.data['errors'][0]['errors'] == {
+            'id': ['Catalog items can only be updated in bulk']}
+
+    def test_search(self):
+        """."""
+        self.client = authenticate_test_user()
+        url = reverse(self.url + '-list')
+        catalog_items = [self.make_listed_catalog_item(index) for index in range(3)]
+        baker.make(
+            Product, item=catalog_items[2].inventory_item.item, serial_number='SN-0099',
+            enterprise=catalog_items[2].enterprise)
+
+        resp = self.client.get(url + '?search=sn-0099')
+        assert resp.status_code == 200
+        assert [result['id'] for result in resp.data['results']] == [str(catalog_items[2].id)]
+
+        with CaptureQueriesContext(connection) as search_queries:
+            resp = self.client.get(url + '?search=GE81K cooker')
+        assert resp.status_code == 200
+        assert resp.data['count'] == 3
+        assert resp.data['results'][0]['id'] == str(catalog_items[1].id)
+        assert not [
+            query for query in search_queries.captured_queries
+            if 'items_product' in query['sql']]
+
+        brand = catalog_items[0].inventory_item.item.item_model.brand
+        brand.brand_name = 'Hotpoint'
+        brand.save()
+        resp = self.client.get(url + '?search=hotpoint')
+        assert resp.status_code == 200
+        assert resp.data['count'] == 3
+
+        resp = self.client.get(url + '?search=lg')
+        assert resp.status_code == 200
+        assert resp.data['count'] == 0
+
 
 class TestCatalogCatalogItemView(APITests, APITestCase):
     """."""
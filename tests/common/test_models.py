@@ -0,0 +1,125 @@
+"""."""
+
+import uuid
+import pytest
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.core.exceptions import ValidationError
+
+from elites_retail_portal.enterprises.models import Enterprise
+from elites_retail_portal.items.models import Category
+
+from model_bakery import baker
+
+
+class TestBaseModel(TestCase):
+    """."""
+
+    def setUp(self):
+        """."""
+        self.enterprise_code = 'EAL-E/EO-MB/2301-01'
+        self.audit_fields = {
+            'created_by': uuid.uuid4(),
+            'updated_by': uuid.uuid4(),
+            'enterprise': self.enterprise_code,
+        }
+        return super().setUp()
+
+    def test_fast_save(self):
+        """Count the queries of a save and of a fast save."""
+        baker.make(Category, category_name='Cat Zero', enterprise=self.enterprise_code)
+        # category code (three queries), category name check, primary key check,
+        # retain read and insert
+        with CaptureQueriesContext(connection) as context:
+            Category(category_name='Cat One', **self.audit_fields).save()
+        assert len(context.captured_queries) == 7
+
+        # category code (three queries), category name check and insert
+        with CaptureQueriesContext(connection) as context:
+            Category(category_name='Cat Two', **self.audit_fields).save(fast=True)
+        assert len(context.captured_queries) == 5
+
+        category = Category.objects.get(category_name='CAT TWO')
+        created_on = category.created_on
+        created_by = category.created_by
+        category.category_name = 'Cat Three'
+        # category name check, retain read, update and catalog item search documents read
+        with CaptureQueriesContext(connection) as context:
+            category.save()
+        assert len(context.captured_queries) == 4
+
+        category.category_name = 'Cat Four'
+        category.created_by = uuid.uuid4()
+        # category name check, update and catalog item search documents read
+        with CaptureQueriesContext(connection) as context:
+            category.save(fast=True)
+        assert len(context.captured_queries) == 3
+
+        category.refresh_from_db()
+        assert category.category_name == 'CAT FOUR'
+        assert category.created_on == created_on
+        assert category.created_by == created_by
+
+    def test_clean_in_bulk(self):
+        """."""
+        audit_fields = {'created_by': uuid.uuid4(), 'updated_by': uuid.uuid4()}
+        baker.make(Enterprise, name='Enterprise One', enterprise_code='EAL-E/EO-MB/2301-01')
+        enterprises = [
+            Enterprise(
+                name=f'Enterprise {count}', enterprise_code=f'EAL-E/EO-MB/2301-1{count}',
+                **audit_fields)
+            for count in range(10)]
+        with CaptureQueriesContext(connection) as context:
+            assert Enterprise.objects.clean_in_bulk(enterprises) == {}
+        assert len(context.captured_queries) == 1
+        Enterprise.objects.bulk_create(enterprises)
+
+        enterprises = [
+            Enterprise(
+                name='Enterprise Two', enterprise_code='EAL-E/EO-MB/2301-02', **audit_fields),
+            Enterprise(
+                name='Enterprise Two', enterprise_code='EAL-E/EO-MB/2301-02', **audit_fields),
+            Enterprise(
+                name='Enterprise One', enterprise_code='EAL-E/EO-MB/2301-01', **audit_fields),
+            Enterprise(
+                name='Enterprise Three', enterprise_code='EAL-E/EO-MB/2301-03',
+                enterprise_type='UNKNOWN', **audit_fields),
+        ]
+        errors = Enterprise.objects.clean_in_bulk(enterprises)
+        assert sorted(errors) == [1, 2, 3]
+        assert errors[1] == ['Enterprise with this Enterprise code already exists.']
+        assert errors[2] == ['Enterprise with this Enterprise code already exists.']
+        assert errors[3] == ["enterprise_type: Value 'UNKNOWN' is not a valid choice."]
+        assert Enterprise.objects.count() == 11
+
+    def test_bulk_ingest(self):
+        """."""
+        audit_fields = {'created_by': uuid.uuid4(), 'updated_by': uuid.uuid4()}
+
+        def ingest(count, start):
+            enterprises = [
+                Enterprise(
+                    name=f'Enterprise {index}',
+                    enterprise_code=f'EAL-E/EO-MB/2301-{index:03d}', **audit_fields)
+                for index in range(start, start + count)]
+            with CaptureQueriesContext(connection) as context:
+                Enterprise.objects.bulk_ingest(enterprises)
+            return len(context.captured_queries)
+
+        assert ingest(5, 0) == ingest(20, 5) == 2
+        assert Enterprise.objects.count() == 25
+
+        enterprises = [
+            Enterprise(
+                name='Enterprise 100', enterprise_code='EAL-E/EO-MB/2301-100',
+                **audit_fields),
+            Enterprise(
+                name='Enterprise 0', enterprise_code='EAL-E/EO-MB/2301-000', **audit_fields),
+        ]
+        with pytest.raises(ValidationError) as ve:
+            Enterprise.objects.bulk_ingest(enterprises)
+        assert ve.value.message_dict == {
+            1: ['Enterprise with this Enterprise code already exists.']}
+        assert Enterprise.objects.count() == 25
@@ -0,0 +1,82 @@
+from urllib.parse import parse_qs, urlparse
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from elites_retail_portal.common.pagination import KeysetPagination
+from elites_retail_portal.items.models import Category
+
+from model_bakery import baker
+
+
+class TestKeysetPagination(TestCase):
+    """."""
+
+    def setUp(self):
+        """."""
+        self.factory = APIRequestFactory()
+        now = timezone.now()
+        categories = [
+            baker.make(
+                Category, category_name=f'Category {index}',
+                enterprise='EAL-E/EO-MB/2301-01')
+            for index in range(5)]
+        # Two categories share a creation date so that their ids break the tie
+        created_on = [now, now, now - timezone.timedelta(days=1),
+                      now - timezone.timedelta(days=2), now - timezone.timedelta(days=3)]
+        for category, date in zip(categories, created_on):
+            Category.objects.filter(id=category.id).update(created_on=date)
+
+        self.expected_ids = [
+            category.id for category in sorted(
+                Category.objects.all(), key=lambda category: (
+                    category.created_on, category.id), reverse=True)]
+
+    def paginate(self, params):
+        """."""
+        request = Request(self.factory.get('/categories/', params))
+        paginator = KeysetPagination()
+        records = paginator.paginate_queryset(Category.objects.all(), request)
+        return paginator, records
+
+    def get_params(self, link):
+        """."""
+        return {key: values[0] for key, values in parse_qs(urlparse(link).query).items()}
+
+    def test_paginate_by_position(self):
+        """."""
+        with CaptureQueriesContext(connection) as context:
+            paginator, records = self.paginate({'cursor': '', 'page_size': 2})
+        assert len(context.captured_queries) == 1
+        assert 'COUNT' not in context.captured_queries[0]['sql']
+        assert [record.id for record in records] == self.expected_ids[:2]
+        assert paginator.get_previous_link() is None
+
+        ids = [record.id for record in records]
+        while paginator.get_next_link():
+            paginator, records = self.paginate(self.get_params(paginator.get_next_link()))
+            ids.extend(record.id for record in records)
+        assert ids == self.expected_ids
+
+        paginator, records = self.paginate(self.get_params(paginator.get_previous_link()))
+        assert [record.id for record in records] == self.expected_ids[2:4]
+        response = paginator.get_paginated_response([])
+        assert 'count' not in response.data
+        assert 'approximate_count' not in response.data
+
+    def test_paginate_by_page_number(self):
+        """."""
+        paginator, records = self.paginate({'page_size': 2, 'page': 2})
+        assert [record.id for record in records] == [
+            category.id for category in Category.objects.all()[2:4]]
+        assert paginator.get_paginated_response([]).data['count'] == 5
+
+    def test_invalid_cursor(self):
+        """."""
+        with self.assertRaises(NotFound):
+            self.paginate({'cursor': 'not-a-cursor'})
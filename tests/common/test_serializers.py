@@ -0,0 +1,100 @@
+"""."""
+
+import uuid
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+
+from elites_retail_portal.common.serializers import AuditListSerializer
+from elites_retail_portal.items.models import Brand, BrandItemType, Category, ItemType
+from elites_retail_portal.items.serializers import (
+    BrandSerializer, CategorySerializer, ItemTypeSerializer)
+from elites_retail_portal.users.models import retrieve_user_emails
+
+from model_bakery import baker
+
+
+class TestAuditUserEmails(TestCase):
+    """."""
+
+    def setUp(self):
+        """."""
+        self.users = [
+            get_user_model().objects.create_user(
+                email=f'user{count}@email.com', first_name='Test', last_name='User',
+                guid=uuid.uuid4(), password='Testpass254$', enterprise='EAL-E/EO-MB/2301-01')
+            for count in range(5)]
+        for count, user in enumerate(self.users):
+            baker.make(
+                Category, category_name=f'Category {count}', created_by=user.guid,
+                updated_by=self.users[0].id, enterprise='EAL-E/EO-MB/2301-01')
+
+        return super().setUp()
+
+    def tearDown(self):
+        """."""
+        cache.clear()
+        return super().tearDown()
+
+    def test_resolve_audit_emails_of_listed_records(self):
+        """."""
+        categories = Category.objects.order_by('category_name')
+        with CaptureQueriesContext(connection) as context:
+            data = CategorySerializer(categories, many=True).data
+        assert len(context.captured_queries) == 2
+        assert [category['creator'] for category in data] == [
+            user.email for user in self.users]
+        assert {category['updater'] for category in data} == {'user0@email.com'}
+
+        with CaptureQueriesContext(connection) as context:
+            CategorySerializer(categories.all(), many=True).data
+        assert len(context.captured_queries) == 1
+
+        data = CategorySerializer(categories.first()).data
+        assert data['creator'] == 'user0@email.com'
+        assert data['updater'] == 'user0@email.com'
+
+    def test_list_serializer_leaves_meta_unchanged(self):
+        """."""
+        serializer = CategorySerializer(Category.objects.all(), many=True)
+        assert isinstance(serializer, AuditListSerializer)
+        assert isinstance(serializer.child, CategorySerializer)
+        assert not hasattr(CategorySerializer.Meta, 'list_serializer_class')
+
+    def test_serialize_nested_list_serializer(self):
+        """."""
+        enterprise_code = 'EAL-E/EO-MB/2301-01'
+        category = Category.objects.get(category_name='CATEGORY 0')
+        item_type = baker.make(
+            ItemType, category=category, type_name='Cooker', created_by=self.users[0].guid,
+            enterprise=enterprise_code)
+        brand = baker.make(Brand, brand_name='Samsung', enterprise=enterprise_code)
+        baker.make(BrandItemType, brand=brand, item_type=item_type, enterprise=enterprise_code)
+
+        item_types = BrandSerializer().fields['item_types']
+        assert isinstance(item_types, AuditListSerializer)
+        assert isinstance(item_types.child, ItemTypeSerializer)
+
+        data = BrandSerializer(Brand.objects.all(), many=True).data
+        assert [brand_data['item_types'][0]['type_name'] for brand_data in data] == ['COOKER']
+        assert data[0]['item_types'][0]['creator'] == 'user0@email.com'
+
+    def test_retrieve_user_emails(self):
+        """."""
+        user = self.users[1]
+        missing_user_id = uuid.uuid4()
+        emails = retrieve_user_emails([user.id, user.guid, missing_user_id, None])
+        assert emails == {
+            str(user.id): 'user1@email.com',
+            str(user.guid): 'user1@email.com',
+            str(missing_user_id): None,
+        }
+
+        user.email = 'userone@email.com'
+        user.save()
+        assert retrieve_user_emails([user.guid]) == {str(user.guid): 'userone@email.com'}
+        category = Category.objects.get(category_name='CATEGORY 1')
+        assert category.creator == 'userone@email.com'
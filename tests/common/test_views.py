@@ -0,0 +1,142 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from elites_retail_portal.items.models import (
+    Brand, BrandItemType, Category, Item, ItemAttribute, ItemModel, ItemType)
+
+from tests.utils.login_mixins import LoggedInMixin, authenticate_test_user
+
+from model_bakery import baker
+
+
+class TestBulkUpsert(LoggedInMixin, APITestCase):
+    """."""
+
+    def setUp(self):
+        """."""
+        super().setUp()
+        self.client = authenticate_test_user()
+        self.enterprise_code = 'EAL-E/EO-MB/2301-01'
+        self.url = reverse('v1:items:itemattribute-list')
+        cat = baker.make(
+            Category, category_name='Cat One', enterprise=self.enterprise_code)
+        item_type = baker.make(
+            ItemType, category=cat, type_name='Cooker', enterprise=self.enterprise_code)
+        brand = baker.make(Brand, brand_name='Samsung', enterprise=self.enterprise_code)
+        baker.make(
+            BrandItemType, brand=brand, item_type=item_type, enterprise=self.enterprise_code)
+        item_model = baker.make(
+            ItemModel, brand=brand, item_type=item_type, model_name='GE731K-B SUT',
+            enterprise=self.enterprise_code)
+        self.item = baker.make(
+            Item, item_model=item_model, barcode='83838388383', make_year=2020,
+            enterprise=self.enterprise_code)
+
+    def make_attributes(self, count, enterprise=None):
+        """."""
+        return [
+            baker.make(
+                ItemAttribute, item=self.item, attribute_type='SPECIAL FEATURE',
+                attribute_value=f'Feature {index}',
+                enterprise=enterprise or self.enterprise_code)
+            for index in range(count)]
+
+    def test_bulk_upsert(self):
+        """."""
+        attributes = self.make_attributes(2)
+        other_attribute = self.make_attributes(1, enterprise='2301-02')[0]
+        payload = [
+            {'id': str(attributes[0].id), 'attribute_value': 'Renamed'},
+            {
+                'item': str(self.item.id), 'attribute_type': 'DESCRIPTION',
+                'attribute_value': 'New Description'},
+            {'item': str(self.item.id), 'attribute_type': 'NOT A TYPE'},
+            {'id': str(other_attribute.id), 'attribute_value': 'Other'},
+            {'id': 'not-an-id', 'attribute_value': 'Missing'},
+        ]
+        resp = self.client.put(self.url + 'bulk_upsert/', payload, format='json')
+
+        assert resp.status_code == 207, resp.content
+        assert len(resp.data['results']) == 2
+        assert [error['row'] for error in resp.data['errors']] == [2, 3, 4]
+        assert 'attribute_type' in resp.data['errors'][0]['errors']
+
+        attributes[0].refresh_from_db()
+        assert attributes[0].attribute_value == 'Renamed'
+        assert attributes[0].attribute_type == 'SPECIAL FEATURE'
+        new_attribute = ItemAttribute.objects.get(attribute_value='New Description')
+        assert new_attribute.enterprise == self.enterprise_code
+        assert new_attribute.created_by == new_attribute.updated_by
+        other_attribute.refresh_from_db()
+        assert other_attribute.attribute_value == 'Feature 0'
+
+    def test_bulk_upsert_query_count(self):
+        """."""
+        attributes = self.make_attributes(20)
+        with CaptureQueriesContext(connection) as few_rows_queries:
+            resp = self.client.put(self.url + 'bulk_upsert/', [
+                {'id': str(attribute.id), 'attribute_value': f'Few {index}'}
+                for index, attribute in enumerate(attributes[:5])], format='json')
+        assert resp.status_code == 200, resp.content
+
+        with CaptureQueriesContext(connection) as many_rows_queries:
+            resp = self.client.put(self.url + 'bulk_upsert/', [
+                {'id': str(attribute.id), 'attribute_value': f'Many {index}'}
+                for index, attribute in enumerate(attributes)], format='json')
+        assert resp.status_code == 200, resp.content
+        assert len(many_rows_queries) == len(few_rows_queries)
+        assert ItemAttribute.objects.filter(attribute_value__startswith='Many').count() == 20
+
+    def test_bulk_upsert_not_supported(self):
+        """."""
+        category = baker.make(
+            Category, category_name='Category', enterprise=self.enterprise_code)
+        url = reverse('v1:items:category-list')
+        resp = self.client.put(
+            url + 'bulk_upsert/', [{'id': str(category.id), 'category_name': 'Renamed'}],
+            format='json')
+
+        assert resp.status_code == 405
+        category.refresh_from_db()
+        assert category.category_name == 'CATEGORY'
+
+
+class TestBulkUpdate(LoggedInMixin, APITestCase):
+    """."""
+
+    def setUp(self):
+        """."""
+        super().setUp()
+        self.client = authenticate_test_user()
+        self.enterprise_code = 'EAL-E/EO-MB/2301-01'
+        self.url = reverse('v1:items:category-list')
+
+    def test_bulk_update(self):
+        """."""
+        categories = [
+            baker.make(
+                Category, category_name=f'Category {index}', category_code=f'C{index}',
+                enterprise=self.enterprise_code)
+            for index in range(2)]
+        payload = [
+            {'id': str(categories[0].id), 'category_name': 'Renamed'},
+            {'category_name': 'New Category'},
+        ]
+        resp = self.client.put(self.url + 'bulk_update/', payload, format='json')
+        assert resp.status_code == 400
+        assert resp.data['errors'] == [{'row': 1, 'errors': {'id': ['This field is required.']}}]
+
+        payload[1]['id'] = 'not-an-id'
+        resp = self.client.put(self.url + 'bulk_update/', payload, format='json')
+        assert resp.status_code == 400
+        assert [error['row'] for error in resp.data['errors']] == [1]
+        categories[0].refresh_from_db()
+        assert categories[0].category_name == 'CATEGORY 0'
+
+        payload[1]['id'] = str(categories[1].id)
+        resp = self.client.put(self.url + 'bulk_update/', payload, format='json')
+        assert resp.status_code == 200, resp.content
+        assert sorted(row['category_name'] for row in resp.data) == [
+            'NEW CATEGORY', 'RENAMED']
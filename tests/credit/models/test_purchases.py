@@ -163,6 +163,12 @@ class TestPurchase(TestCase):
         assert purchase.total_payments_amount == 11000
         assert purchase.balance_amount == -1000
 
+        purchase = Purchase.objects.with_totals().get(id=purchase.id)
+        with self.assertNumQueries(0):
+            assert purchase.total_cost == 10000
+            assert purchase.total_payments_amount == 11000
+            assert purchase.balance_amount == -1000
+
 
 class TestPurchasePayment(TestCase):
     """."""
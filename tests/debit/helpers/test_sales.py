@@ -3,11 +3,18 @@
 import pytest
 import uuid
 import datetime
+from decimal import Decimal
+from django.db import IntegrityError, connection, transaction
+from django.core.management import call_command
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from django.contrib.auth import get_user_model
 
-from elites_retail_portal.debit.helpers.sales import generate_sales_report
+from elites_retail_portal.credit.models import SalesReturn
+from elites_retail_portal.debit.helpers.sales import (
+    generate_sales_report, get_daily_sales_contributions, get_daily_sales_totals,
+    update_daily_sales_summaries)
 from elites_retail_portal.customers.models import Customer
 from elites_retail_portal.debit.models.inventory import InventoryInventoryItem
 from elites_retail_portal.enterprise_mgt.models import (
@@ -19,16 +26,20 @@ from elites_retail_portal.items.models import (
     Brand, BrandItemType, Category, Item, ItemModel, ItemType,
     ItemUnits, UnitsItemType, Units)
 from elites_retail_portal.debit.models import (
-    Inventory, InventoryItem, InventoryRecord, Sale, SaleItem)
+    DailySalesSummary, Inventory, InventoryItem, InventoryRecord, Sale, SaleItem)
 from elites_retail_portal.catalog.models import CatalogItem
-from elites_retail_portal.enterprises.models import Enterprise
+from elites_retail_portal.encounters.models import Encounter
+from elites_retail_portal.enterprises.models import Enterprise, Staff
+from elites_retail_portal.orders.models import Order
 from elites_retail_portal.customers.models import Customer
 
 from model_bakery import baker
 
 pytestmark = pytest.mark.django_db
 
-def test_generate_sales_report():
+
+@pytest.fixture
+def sales_setup():
     """."""
     enterprise = baker.make(Enterprise, name='Elites Age Supermarket')
     enterprise_code = enterprise.enterprise_code
@@ -104,7 +115,226 @@ def test_generate_sales_report():
     catalog_item = baker.make(
         CatalogItem, inventory_item=inventory_item, marked_price=300,
         threshold_price=200, enterprise=enterprise_code)
+    return {
+        'enterprise_code': enterprise_code,
+        'customer': customer,
+        'sale': sale,
+        'sale_date': sale_date,
+        'catalog_item': catalog_item,
+    }
+
+
+def test_generate_sales_report(sales_setup):
+    """."""
+    enterprise_code = sales_setup['enterprise_code']
+    sale_date = sales_setup['sale_date']
     baker.make(
-        SaleItem, sale=sale, quantity_sold=1, selling_price=560,
-        catalog_item=catalog_item, enterprise=enterprise_code)
+        SaleItem, sale=sales_setup['sale'], quantity_sold=1, selling_price=560,
+        catalog_item=sales_setup['catalog_item'], enterprise=enterprise_code)
     generate_sales_report(enterprise_code, start_date=sale_date, end_date=sale_date)
+
+
+def test_sales_report_query_count(sales_setup):
+    """."""
+    enterprise_code = sales_setup['enterprise_code']
+    customer = sales_setup['customer']
+
+    def get_report():
+        with CaptureQueriesContext(connection) as context:
+            report = generate_sales_report(enterprise_code)
+        return report, len(context.captured_queries)
+
+    for _ in range(2):
+        sale = baker.make(Sale, customer=customer, enterprise=enterprise_code)
+        baker.make(
+            SaleItem, sale=sale, quantity_sold=2, selling_price=560,
+            catalog_item=sales_setup['catalog_item'], enterprise=enterprise_code)
+    report, query_count = get_report()
+    assert len(report['sales_data']) == 2
+
+    for _ in range(5):
+        sale = baker.make(Sale, enterprise=enterprise_code)
+        baker.make(
+            SaleItem, sale=sale, quantity_sold=1, selling_price=300,
+            catalog_item=sales_setup['catalog_item'], enterprise=enterprise_code)
+    report, more_rows_query_count = get_report()
+    assert len(report['sales_data']) == 7
+    assert more_rows_query_count == query_count == 1
+
+    customer_row = [row for row in report['sales_data'] if row['customer']][0]
+    assert customer_row['customer'] == customer.full_name
+    assert customer_row['item'] == sales_setup['catalog_item'].inventory_item.item.item_name
+    assert customer_row['quantity_sold'] == 2
+    assert customer_row['total_price'] == 1120
+    assert report['totals_data']['total_price'] == 1120 * 2 + 300 * 5
+    assert report['totals_data']['total_quantity'] == 9
+
+
+def test_daily_sales_summaries(sales_setup):
+    """."""
+    enterprise_code = sales_setup['enterprise_code']
+    catalog_item = sales_setup['catalog_item']
+    staff_member = baker.make(
+        Staff, first_name='Staff', last_name='One', staff_number='1',
+        enterprise=enterprise_code)
+    order = baker.make(Order, order_number='#1001', enterprise=enterprise_code)
+    sale = Sale.objects.get(order=order)
+    Encounter.objects.bulk_create([baker.prepare(
+        Encounter, billing=[], served_by=staff_member, order_guid=order.id,
+        payments=[{'means': 'CASH', 'amount': 400}, {'means': 'M-PESA', 'amount': 100}],
+        enterprise=enterprise_code)])
+    sale_item = baker.make(
+        SaleItem, sale=sale, quantity_sold=2, selling_price=250,
+        catalog_item=catalog_item, enterprise=enterprise_code)
+    baker.make(
+        SaleItem, sale=sales_setup['sale'], quantity_sold=1, selling_price=300,
+        catalog_item=catalog_item, enterprise=enterprise_code)
+
+    summaries = DailySalesSummary.objects.filter(enterprise=enterprise_code)
+    assert summaries.count() == 2
+    served_summary = summaries.get(served_by=staff_member)
+    assert served_summary.summary_date == timezone.localdate()
+    assert served_summary.payment_method == 'MIXED'
+    assert served_summary.quantity == 2
+    assert served_summary.gross_amount == Decimal('500')
+    assert served_summary.discount_amount == Decimal('100')
+    assert served_summary.cost_amount == Decimal('600')
+    counter_summary = summaries.get(served_by=None)
+    assert counter_summary.payment_method is None
+    assert counter_summary.quantity == 1
+    assert counter_summary.gross_amount == Decimal('300')
+    assert counter_summary.discount_amount == 0
+
+    baker.make(
+        SalesReturn, sale=sale, sale_item=sale_item, quantity_returned=1,
+        enterprise=enterprise_code)
+    served_summary = summaries.get(served_by=staff_member)
+    assert served_summary.quantity == 1
+    assert served_summary.gross_amount == Decimal('250')
+    assert served_summary.cost_amount == Decimal('300')
+
+    sale_item.quantity_sold = 0
+    sale_item.processing_status = 'CANCELED'
+    sale_item.save()
+    assert not summaries.filter(served_by=staff_member).exists()
+    assert summaries.count() == 1
+
+
+def test_daily_sales_summaries_keep_prices_as_of_sale(sales_setup):
+    """."""
+    enterprise_code = sales_setup['enterprise_code']
+    catalog_item = sales_setup['catalog_item']
+    sale_item = baker.make(
+        SaleItem, sale=sales_setup['sale'], quantity_sold=2, selling_price=250,
+        catalog_item=catalog_item, enterprise=enterprise_code)
+    assert sale_item.marked_price == 300
+    assert sale_item.unit_cost == 300
+
+    CatalogItem.objects.filter(id=catalog_item.id).update(marked_price=500)
+    baker.make(
+        InventoryRecord, inventory=Inventory.objects.get(enterprise=enterprise_code),
+        inventory_item=catalog_item.inventory_item, record_type='ADD',
+        quantity_recorded=5, unit_price=450, enterprise=enterprise_code)
+    call_command('rebuild_daily_sales_summaries', enterprise=enterprise_code)
+    summary = DailySalesSummary.objects.get(enterprise=enterprise_code)
+    assert summary.discount_amount == Decimal('100')
+    assert summary.cost_amount == Decimal('600')
+
+
+def test_daily_sales_summaries_apply_changes(sales_setup):
+    """."""
+    enterprise_code = sales_setup['enterprise_code']
+    catalog_item = sales_setup['catalog_item']
+    sale_items = [
+        baker.make(
+            SaleItem, sale=sales_setup['sale'], quantity_sold=1, selling_price=300,
+            catalog_item=catalog_item, enterprise=enterprise_code)
+        for _ in range(3)]
+    summary = DailySalesSummary.objects.get(enterprise=enterprise_code)
+    assert summary.quantity == 3
+    assert summary.gross_amount == Decimal('900')
+
+    with CaptureQueriesContext(connection) as few_items_queries:
+        sale_items[0].quantity_sold = 2
+        sale_items[0].save()
+    for _ in range(5):
+        baker.make(
+            SaleItem, sale=sales_setup['sale'], quantity_sold=1, selling_price=300,
+            catalog_item=catalog_item, enterprise=enterprise_code)
+    with CaptureQueriesContext(connection) as many_items_queries:
+        sale_items[1].quantity_sold = 2
+        sale_items[1].save()
+    assert len(many_items_queries) == len(few_items_queries)
+
+    summary.refresh_from_db()
+    assert summary.quantity == 10
+    assert summary.gross_amount == Decimal('3000')
+
+    SaleItem.objects.filter(id__in=[sale_item.id for sale_item in sale_items]).delete()
+    summary.refresh_from_db()
+    assert summary.quantity == 5
+    assert summary.gross_amount == Decimal('1500')
+
+
+def test_daily_sales_summaries_are_unique(sales_setup):
+    """."""
+    enterprise_code = sales_setup['enterprise_code']
+    sale_item = baker.make(
+        SaleItem, sale=sales_setup['sale'], quantity_sold=1, selling_price=300,
+        catalog_item=sales_setup['catalog_item'], enterprise=enterprise_code)
+    summary = DailySalesSummary.objects.get(enterprise=enterprise_code)
+    assert summary.served_by is None
+    assert summary.payment_method is None
+
+    with pytest.raises(IntegrityError), transaction.atomic():
+        DailySalesSummary.objects.bulk_create([baker.prepare(
+            DailySalesSummary, summary_date=summary.summary_date,
+            catalog_item=summary.catalog_item, served_by=None, payment_method=None,
+            enterprise=enterprise_code)])
+
+    # A summary written by a concurrent sale is added to rather than duplicated
+    update_daily_sales_summaries(
+        {}, get_daily_sales_contributions(SaleItem.objects.filter(id=sale_item.id)))
+    summary = DailySalesSummary.objects.get(enterprise=enterprise_code)
+    assert summary.quantity == 2
+    assert summary.gross_amount == Decimal('600')
+
+
+def test_get_daily_sales_totals(sales_setup):
+    """."""
+    enterprise_code = sales_setup['enterprise_code']
+    catalog_item = sales_setup['catalog_item']
+    today = timezone.localdate()
+    yesterday = today - datetime.timedelta(days=1)
+    yesterday_sale = baker.make(
+        Sale, sale_date=timezone.now() - datetime.timedelta(days=1),
+        enterprise=enterprise_code)
+    baker.make(
+        SaleItem, sale=yesterday_sale, quantity_sold=3, selling_price=300,
+        catalog_item=catalog_item, enterprise=enterprise_code)
+    baker.make(
+        SaleItem, sale=sales_setup['sale'], quantity_sold=1, selling_price=280,
+        catalog_item=catalog_item, enterprise=enterprise_code)
+
+    DailySalesSummary.objects.all().delete()
+    call_command('rebuild_daily_sales_summaries', enterprise=enterprise_code)
+    assert DailySalesSummary.objects.filter(summary_date=yesterday).get().quantity == 3
+    assert DailySalesSummary.objects.filter(summary_date=today).get().quantity == 1
+
+    # Closed days are read from the summaries while today is totalled from the sale items
+    DailySalesSummary.objects.filter(summary_date=yesterday).update(gross_amount=1000)
+    DailySalesSummary.objects.filter(summary_date=today).update(gross_amount=1000)
+    totals = get_daily_sales_totals(enterprise_code, start_date=yesterday)
+    assert totals['daily_totals_data'] == [
+        {
+            'summary_date': yesterday.strftime("%Y-%m-%d"), 'quantity': 3.0,
+            'gross_amount': 1000.0, 'discount_amount': 0.0, 'cost_amount': 900.0,
+        },
+        {
+            'summary_date': today.strftime("%Y-%m-%d"), 'quantity': 1.0,
+            'gross_amount': 280.0, 'discount_amount': 20.0, 'cost_amount': 300.0,
+        },
+    ]
+    assert totals['totals_data']['gross_amount'] == 1280
+    assert get_daily_sales_totals(enterprise_code, start_date=today, end_date=today)[
+        'totals_data']['quantity'] == 1
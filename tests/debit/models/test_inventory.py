@@ -1,6 +1,10 @@
 """."""
 
 import pytest
+from io import StringIO
+from unittest import mock
+from datetime import timedelta
+from django.core.management import call_command
 from django.test import TestCase
 from django.utils import timezone
 from django.core.exceptions import ValidationError
@@ -10,7 +14,7 @@ from elites_retail_portal.items.models import (
     Brand, BrandItemType, Category, Item, ItemModel, ItemType,
     ItemUnits, UnitsItemType, Units)
 from elites_retail_portal.debit.models import (
-    Inventory, InventoryItem, InventoryRecord, Sale)
+    Inventory, InventoryItem, InventoryRecord, Sale, StockLevel)
 from elites_retail_portal.warehouses.models import Warehouse
 from elites_retail_portal.catalog.models import (
     CatalogItem, Section, Catalog, CatalogCatalogItem, CatalogItemAuditLog)
@@ -1163,4 +1167,220 @@ class TestInventoryRecord(TestCase):
         assert audit_log1.threshold_price_after == 300
         assert audit_log1.discount_amount_before == 0
         assert audit_log1.discount_amount_recorded == 0
-        assert audit_log1.discount_amount_after == 0
\ No newline at end of file
+        assert audit_log1.discount_amount_after == 0
+
+class TestStockLevel(TestCase):
+    """."""
+
+    def setUp(self):
+        """."""
+        franchise = baker.make(Enterprise, name='Elites Age Supermarket')
+        enterprise_code = franchise.enterprise_code
+        self.enterprise_code = enterprise_code
+        cat = baker.make(
+            Category, category_name='Cat One',
+            enterprise=enterprise_code)
+        item_type = baker.make(
+            ItemType, category=cat, type_name='Cooker',
+            enterprise=enterprise_code)
+        brand = baker.make(
+            Brand, brand_name='Samsung', enterprise=enterprise_code)
+        baker.make(
+            BrandItemType, brand=brand, item_type=item_type,
+            enterprise=enterprise_code)
+        item_model = baker.make(
+            ItemModel, brand=brand, item_type=item_type, model_name='GE731K-B SUT',
+            enterprise=enterprise_code)
+        item = baker.make(
+            Item, item_model=item_model, barcode='83838388383', make_year=2020,
+            enterprise=enterprise_code)
+        s_units = baker.make(Units, units_name='packet', enterprise=enterprise_code)
+        baker.make(UnitsItemType, item_type=item_type, units=s_units, enterprise=enterprise_code)
+        s_units.item_types.set([item_type])
+        s_units.save()
+        p_units = baker.make(Units, units_name='Dozen', enterprise=enterprise_code)
+        baker.make(UnitsItemType, item_type=item_type, units=p_units, enterprise=enterprise_code)
+        p_units.item_types.set([item_type])
+        p_units.save()
+        baker.make(
+            ItemUnits, item=item, sales_units=s_units, purchases_units=p_units,
+            quantity_of_sale_units_per_purchase_unit=12, enterprise=enterprise_code)
+        self.inventory = baker.make(
+            Inventory, inventory_name='Elites Age Supermarket Available Inventory',
+            is_default=True, is_master=True,
+            is_active=True, inventory_type='AVAILABLE', enterprise=enterprise_code)
+        catalog = baker.make(
+            Catalog, catalog_name='Elites Age Supermarket Standard Catalog',
+            is_default=True,
+            description='Standard Catalog', is_standard=True, enterprise=enterprise_code)
+        warehouse = baker.make(
+            Warehouse, warehouse_name='Elites Private Warehouse', is_default=True,
+            is_receiving=True, enterprise=enterprise_code)
+        rule = baker.make(
+            EnterpriseSetupRule, name='Elites Age', is_active=True, enterprise=enterprise_code)
+        baker.make(
+            EnterpriseSetupRuleInventory, rule=rule, inventory=self.inventory,
+            enterprise=enterprise_code)
+        baker.make(
+            EnterpriseSetupRuleWarehouse, rule=rule, warehouse=warehouse,
+            enterprise=enterprise_code)
+        baker.make(
+            EnterpriseSetupRuleCatalog, rule=rule, catalog=catalog,
+            enterprise=enterprise_code)
+        self.inventory_item = baker.make(
+            InventoryItem, item=item, enterprise=enterprise_code)
+        baker.make(
+            InventoryInventoryItem, inventory=self.inventory,
+            inventory_item=self.inventory_item)
+        section = baker.make(Section, section_name='Section A')
+        self.inventory_item.check_inventory_item_in_catalog_items(section)
+        self.catalog_item = CatalogItem.objects.get(
+            inventory_item=self.inventory_item, enterprise=enterprise_code)
+        baker.make(
+            CatalogCatalogItem, catalog=catalog, catalog_item=self.catalog_item,
+            enterprise=enterprise_code)
+
+    def make_record(self, **kwargs):
+        """."""
+        return baker.make(
+            InventoryRecord, inventory=self.inventory, inventory_item=self.inventory_item,
+            enterprise=self.enterprise_code, **kwargs)
+
+    def test_append_records(self):
+        """."""
+        now = timezone.now()
+        record1 = self.make_record(
+            record_date=now - timedelta(days=2), record_type='ADD',
+            quantity_recorded=15, unit_price=300)
+        sale = baker.make(Sale, sale_code="S-001", enterprise=self.enterprise_code)
+        record2 = self.make_record(
+            record_date=now - timedelta(days=1), record_type='REMOVE',
+            removal_type='SALES', removal_guid=sale.id, quantity_recorded=10, unit_price=300)
+
+        record2.refresh_from_db()
+        assert record2.opening_stock_quantity == 15
+        assert record2.opening_stock_total_amount == 4500
+        assert record2.closing_stock_quantity == 5
+        assert record2.closing_stock_total_amount == 1500
+
+        stock_level = StockLevel.objects.get(
+            inventory=self.inventory, inventory_item=self.inventory_item)
+        assert StockLevel.objects.count() == 1
+        assert stock_level.latest_record == record2
+        assert stock_level.quantity == 5
+        assert stock_level.total_amount == 1500
+        assert record1
+
+    def test_create_stock_level_for_first_record(self):
+        """."""
+        record = self.make_record(record_type='ADD', quantity_recorded=15, unit_price=300)
+        stock_level = StockLevel.objects.get(
+            inventory=self.inventory, inventory_item=self.inventory_item)
+        assert stock_level.latest_record == record
+        assert stock_level.quantity == 15
+
+        # A concurrent first record created the head after this one looked for it
+        with mock.patch('django.db.models.query.QuerySet.first', return_value=None):
+            assert record.get_stock_level() == stock_level
+        assert StockLevel.objects.count() == 1
+
+    def test_back_dated_record_recomputes_later_records(self):
+        """."""
+        now = timezone.now()
+        record1 = self.make_record(
+            record_date=now - timedelta(days=3), record_type='ADD',
+            quantity_recorded=15, unit_price=300)
+        record2 = self.make_record(
+            record_date=now - timedelta(days=1), record_type='ADD',
+            quantity_recorded=5, unit_price=300)
+
+        # Receipt recorded late, dated between the two existing records
+        record3 = self.make_record(
+            record_date=now - timedelta(days=2), record_type='ADD',
+            quantity_recorded=10, unit_price=300)
+
+        record1.refresh_from_db()
+        record2.refresh_from_db()
+        record3.refresh_from_db()
+        assert record1.closing_stock_quantity == 15
+        assert record3.opening_stock_quantity == 15
+        assert record3.closing_stock_quantity == 25
+        assert record3.closing_stock_total_amount == 7500
+        assert record2.opening_stock_quantity == 25
+        assert record2.opening_stock_total_amount == 7500
+        assert record2.closing_stock_quantity == 30
+        assert record2.closing_stock_total_amount == 9000
+
+        stock_level = StockLevel.objects.get(
+            inventory=self.inventory, inventory_item=self.inventory_item)
+        assert stock_level.latest_record == record2
+        assert stock_level.quantity == 30
+        assert stock_level.total_amount == 9000
+
+        self.catalog_item.refresh_from_db()
+        assert self.catalog_item.quantity == 30
+
+        # Correct the earliest record
+        record1.quantity_recorded = 12
+        record1.save()
+        record2.refresh_from_db()
+        record3.refresh_from_db()
+        assert record3.opening_stock_quantity == 12
+        assert record2.closing_stock_quantity == 27
+
+        stock_level.refresh_from_db()
+        assert stock_level.quantity == 27
+
+    def test_read_inventory_balances_from_stock_levels(self):
+        """."""
+        now = timezone.now()
+        self.make_record(
+            record_date=now - timedelta(days=2), record_type='ADD',
+            quantity_recorded=15, unit_price=300)
+        record2 = self.make_record(
+            record_date=now - timedelta(days=1), record_type='ADD',
+            quantity_recorded=5, unit_price=320)
+
+        assert self.inventory.summary == [
+            {
+                'inventory_item': self.inventory_item,
+                'quantity': 20.0,
+                'total_amount': 6100.0
+            }
+        ]
+        assert self.inventory_item.quantity == 20
+        assert self.inventory_item.total_amount == 6100
+
+        summary = self.inventory.get_inventory_item_summary(self.inventory_item)
+        assert summary['opening_stock_quantity'] == 15
+        assert summary['quantity_recorded'] == record2.quantity_recorded == 5
+        assert summary['closing_stock_quantity'] == 20
+        assert summary['closing_stock_total_amount'] == 6100
+
+        with self.assertNumQueries(1):
+            assert self.inventory.get_inventory_item_quantity(self.inventory_item) == 20
+
+        self.catalog_item.refresh_from_db()
+        assert self.catalog_item.get_quantity() == 20
+
+    def test_rebuild_stock_levels(self):
+        """."""
+        now = timezone.now()
+        self.make_record(
+            record_date=now - timedelta(days=2), record_type='ADD',
+            quantity_recorded=15, unit_price=300)
+        record2 = self.make_record(
+            record_date=now - timedelta(days=1), record_type='ADD',
+            quantity_recorded=5, unit_price=320)
+        StockLevel.objects.all().delete()
+        assert self.inventory.summary == []
+
+        call_command('rebuild_stock_levels', stdout=StringIO())
+
+        stock_level = StockLevel.objects.get(
+            inventory=self.inventory, inventory_item=self.inventory_item)
+        assert StockLevel.objects.count() == 1
+        assert stock_level.latest_record == record2
+        assert stock_level.quantity == 20
+        assert stock_level.total_amount == 6100
+        assert stock_level.enterprise == self.enterprise_code
@@ -0,0 +1,112 @@
+"""."""
+
+import uuid
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.core.files.storage import default_storage
+
+from elites_retail_portal.enterprises.models import Enterprise
+from elites_retail_portal.customers.models import Customer
+from elites_retail_portal.debit.models import ReportJob, Sale
+from elites_retail_portal.transactions.models import Payment
+
+from model_bakery import baker
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class TestReportJob(TestCase):
+    """."""
+
+    def setUp(self):
+        """."""
+        franchise = baker.make(
+            Enterprise, name='Enterprise One', enterprise_code='EAL-E/EO-MB/2301-01',
+            business_type='SHOP')
+        self.enterprise_code = franchise.enterprise_code
+        self.audit_fields = {
+            'created_by': uuid.uuid4(),
+            'updated_by': uuid.uuid4(),
+            'enterprise': self.enterprise_code,
+        }
+
+    def test_render_report_job(self):
+        """."""
+        report_job = ReportJob.objects.create(
+            report_type='SALES', file_type='XLSX', **self.audit_fields)
+        assert report_job.status == 'SUCCESS'
+        assert report_job.completed_on
+        assert report_job.file_name.startswith('Enterprise One-sales-report-as-at-')
+        assert report_job.file_name.endswith('.xlsx')
+        assert report_job.artifact.name == 'reports/{}.xlsx'.format(report_job.cache_key)
+        assert default_storage.exists(report_job.artifact.name)
+        with report_job.artifact.open('rb') as artifact:
+            assert artifact.read(2) == b'PK'
+
+    def test_render_payments_report_job(self):
+        """."""
+        baker.make(
+            Payment, payment_method='M-PESA', paid_amount='1000', enterprise=self.enterprise_code)
+        for file_type, file_header in [('XLSX', b'PK'), ('PDF', b'%P')]:
+            report_job = ReportJob.objects.create(
+                report_type='PAYMENTS', file_type=file_type, **self.audit_fields)
+            assert report_job.status == 'SUCCESS', report_job.failure_reason
+            assert report_job.file_name.startswith('Enterprise One-payments-report-as-at-')
+            with report_job.artifact.open('rb') as artifact:
+                assert artifact.read(2) == file_header
+
+    def test_reuse_rendered_report(self):
+        """."""
+        report_job = ReportJob.objects.create(
+            report_type='SALES', file_type='XLSX', parameters={'item': None},
+            **self.audit_fields)
+
+        with mock.patch(
+                'elites_retail_portal.debit.tasks.render_report_job_artifact') as render:
+            cached_report_job = ReportJob.objects.create(
+                report_type='SALES', file_type='XLSX', parameters={'item': None},
+                **self.audit_fields)
+            other_report_job = ReportJob.objects.create(
+                report_type='SALES', file_type='XLSX', parameters={'item': str(uuid.uuid4())},
+                **self.audit_fields)
+
+        assert cached_report_job.cache_key == report_job.cache_key
+        assert cached_report_job.status == 'SUCCESS'
+        assert cached_report_job.artifact.name == report_job.artifact.name
+        assert other_report_job.cache_key != report_job.cache_key
+        assert render.call_count == 1
+
+        customer = baker.make(
+            Customer, customer_number=9876, first_name='John', last_name='Wick',
+            phone_no='+254712345678', enterprise=self.enterprise_code)
+        baker.make(Sale, customer=customer, enterprise=self.enterprise_code)
+        new_report_job = ReportJob.objects.create(
+            report_type='SALES', file_type='XLSX', parameters={'item': None},
+            **self.audit_fields)
+        assert new_report_job.watermark != report_job.watermark
+        assert new_report_job.artifact.name != report_job.artifact.name
+        assert new_report_job.status == 'SUCCESS'
+
+    @override_settings(REPORT_JOBS_ASYNC_RENDERING=True)
+    def test_render_report_job_in_background(self):
+        """."""
+        with mock.patch('elites_retail_portal.debit.tasks.render_report_job.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                report_job = ReportJob.objects.create(
+                    report_type='STOCK', file_type='PDF', **self.audit_fields)
+
+        assert report_job.status == 'PENDING'
+        delay.assert_called_once_with(str(report_job.id))
+
+    def test_record_failed_report_job(self):
+        """."""
+        with mock.patch(
+                'elites_retail_portal.debit.helpers.reports.render_pdf_report',
+                side_effect=ValueError('Unable to render the report')):
+            report_job = ReportJob.objects.create(
+                report_type='STOCK', file_type='PDF', **self.audit_fields)
+
+        assert report_job.status == 'FAILED'
+        assert report_job.failure_reason == 'Unable to render the report'
+        assert not report_job.artifact
@@ -1,7 +1,10 @@
 """."""
 
 import pytest
+from datetime import timedelta
 from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from elites_retail_portal.enterprises.models import Enterprise
@@ -239,6 +242,100 @@ def test_create_stock_report():
     }
 
 
+def test_create_stock_report_query_count():
+    """."""
+    franchise = baker.make(Enterprise, name='Elites Age Supermarket')
+    enterprise_code = franchise.enterprise_code
+    cat = baker.make(
+        Category, category_name='Cat One',
+        enterprise=enterprise_code)
+    item_type = baker.make(
+        ItemType, category=cat, type_name='Cooker',
+        enterprise=enterprise_code)
+    brand = baker.make(
+        Brand, brand_name='Samsung', enterprise=enterprise_code)
+    baker.make(
+        BrandItemType, brand=brand, item_type=item_type,
+        enterprise=enterprise_code)
+    s_units = baker.make(Units, units_name='packet', enterprise=enterprise_code)
+    baker.make(UnitsItemType, item_type=item_type, units=s_units, enterprise=enterprise_code)
+    p_units = baker.make(Units, units_name='Dozen', enterprise=enterprise_code)
+    baker.make(UnitsItemType, item_type=item_type, units=p_units, enterprise=enterprise_code)
+    inventory = baker.make(
+        Inventory, inventory_name='Elites Age Supermarket Available Inventory',
+        is_default=True, is_master=True,
+        is_active=True, inventory_type='AVAILABLE', enterprise=enterprise_code)
+    catalog = baker.make(
+        Catalog, catalog_name='Elites Age Supermarket Standard Catalog',
+        is_default=True,
+        description='Standard Catalog', is_standard=True, enterprise=enterprise_code)
+    warehouse = baker.make(
+        Warehouse, warehouse_name='Elites Private Warehouse', is_default=True,
+        is_receiving=True, enterprise=enterprise_code)
+    rule = baker.make(
+        EnterpriseSetupRule, name='Elites Age', is_active=True, enterprise=enterprise_code)
+    baker.make(
+        EnterpriseSetupRuleInventory, rule=rule, inventory=inventory,
+        enterprise=enterprise_code)
+    baker.make(
+        EnterpriseSetupRuleWarehouse, rule=rule, warehouse=warehouse,
+        enterprise=enterprise_code)
+    baker.make(
+        EnterpriseSetupRuleCatalog, rule=rule, catalog=catalog,
+        enterprise=enterprise_code)
+
+    def add_stocked_item(count):
+        item_model = baker.make(
+            ItemModel, brand=brand, item_type=item_type, model_name=f'GE731K-{count} SUT',
+            enterprise=enterprise_code)
+        item = baker.make(
+            Item, item_model=item_model, barcode=f'8383838838{count}', make_year=2020,
+            enterprise=enterprise_code)
+        baker.make(
+            ItemUnits, item=item, sales_units=s_units, purchases_units=p_units,
+            quantity_of_sale_units_per_purchase_unit=12, enterprise=enterprise_code)
+        inventory_item = baker.make(InventoryItem, item=item, enterprise=enterprise_code)
+        warehouse_item = baker.make(WarehouseItem, item=item, enterprise=enterprise_code)
+        baker.make(
+            WarehouseWarehouseItem, warehouse=warehouse, warehouse_item=warehouse_item,
+            enterprise=enterprise_code)
+        baker.make(
+            WarehouseRecord, warehouse=warehouse, warehouse_item=warehouse_item,
+            record_type='ADD', quantity_recorded=3, unit_price=60000,
+            enterprise=enterprise_code)
+        baker.make(
+            InventoryInventoryItem, inventory=inventory, inventory_item=inventory_item,
+            enterprise=enterprise_code)
+        baker.make(
+            InventoryRecord, inventory=inventory, inventory_item=inventory_item,
+            record_type='ADD', quantity_recorded=5, unit_price=60000,
+            enterprise=enterprise_code)
+        baker.make(
+            CatalogItem, inventory_item=inventory_item, enterprise=enterprise_code,
+            marked_price=60000)
+
+    add_stocked_item(1)
+    with CaptureQueriesContext(connection) as one_item_queries:
+        report = generate_stock_report(enterprise_code)
+    assert report['totals_data'] == {
+        'quantity_in_catalog': 5.0,
+        'quantity_in_inventory': 5.0,
+        'quantity_in_warehouse': 3.0
+    }
+
+    for count in range(2, 6):
+        add_stocked_item(count)
+    with CaptureQueriesContext(connection) as five_items_queries:
+        report = generate_stock_report(enterprise_code)
+    assert len(report['stock_data']) == 5
+    assert report['totals_data'] == {
+        'quantity_in_catalog': 25.0,
+        'quantity_in_inventory': 25.0,
+        'quantity_in_warehouse': 15.0
+    }
+    assert len(five_items_queries) == len(one_item_queries)
+
+
 def test_generate_items_history():
     """."""
     franchise = baker.make(Enterprise, name='Elites Age Supermarket')
@@ -498,3 +595,92 @@ def test_generate_items_history():
             'unit_price': 60000.0
         }
     ]
+
+
+def test_generate_items_history_window_and_pages():
+    """."""
+    franchise = baker.make(Enterprise, name='Elites Age Supermarket')
+    enterprise_code = franchise.enterprise_code
+    cat = baker.make(
+        Category, category_name='Cat One',
+        enterprise=enterprise_code)
+    item_type = baker.make(
+        ItemType, category=cat, type_name='Cooker',
+        enterprise=enterprise_code)
+    brand = baker.make(
+        Brand, brand_name='Samsung', enterprise=enterprise_code)
+    baker.make(
+        BrandItemType, brand=brand, item_type=item_type,
+        enterprise=enterprise_code)
+    s_units = baker.make(Units, units_name='packet', enterprise=enterprise_code)
+    baker.make(UnitsItemType, item_type=item_type, units=s_units, enterprise=enterprise_code)
+    p_units = baker.make(Units, units_name='Dozen', enterprise=enterprise_code)
+    baker.make(UnitsItemType, item_type=item_type, units=p_units, enterprise=enterprise_code)
+    inventory = baker.make(
+        Inventory, inventory_name='Elites Age Supermarket Available Inventory',
+        is_default=True, is_master=True,
+        is_active=True, inventory_type='AVAILABLE', enterprise=enterprise_code)
+    catalog = baker.make(
+        Catalog, catalog_name='Elites Age Supermarket Standard Catalog',
+        is_default=True,
+        description='Standard Catalog', is_standard=True, enterprise=enterprise_code)
+    warehouse = baker.make(
+        Warehouse, warehouse_name='Elites Private Warehouse', is_default=True,
+        is_receiving=True, enterprise=enterprise_code)
+    rule = baker.make(
+        EnterpriseSetupRule, name='Elites Age', is_active=True, enterprise=enterprise_code)
+    baker.make(
+        EnterpriseSetupRuleInventory, rule=rule, inventory=inventory,
+        enterprise=enterprise_code)
+    baker.make(
+        EnterpriseSetupRuleWarehouse, rule=rule, warehouse=warehouse,
+        enterprise=enterprise_code)
+    baker.make(
+        EnterpriseSetupRuleCatalog, rule=rule, catalog=catalog,
+        enterprise=enterprise_code)
+    record_date = timezone.now()
+
+    def add_recorded_item(count, records):
+        item_model = baker.make(
+            ItemModel, brand=brand, item_type=item_type, model_name=f'GE731K-{count} SUT',
+            enterprise=enterprise_code)
+        item = baker.make(
+            Item, item_model=item_model, barcode=f'8383838838{count}', make_year=2020,
+            enterprise=enterprise_code)
+        baker.make(
+            ItemUnits, item=item, sales_units=s_units, purchases_units=p_units,
+            quantity_of_sale_units_per_purchase_unit=12, enterprise=enterprise_code)
+        item.activate()
+        inventory_item = InventoryItem.objects.get(item=item, enterprise=enterprise_code)
+        for days in range(records):
+            baker.make(
+                InventoryRecord, inventory=inventory, inventory_item=inventory_item,
+                record_date=record_date + timedelta(days=days), record_type='ADD',
+                quantity_recorded=2, unit_price=60000, enterprise=enterprise_code)
+        return item
+
+    item1 = add_recorded_item(1, 3)
+    with CaptureQueriesContext(connection) as few_records_queries:
+        history = generate_items_history(enterprise_code, item1)
+    assert [
+        (entry['opening_quantity'], entry['closing_quantity'], entry['type'])
+        for entry in history[str(item1.id)]['history']] == [
+            (0, 2.0, 'ONBOARDING'), (2.0, 4.0, 'ADDITION'), (4.0, 6.0, 'ADDITION')]
+
+    history = generate_items_history(
+        enterprise_code, item1, start_date=record_date + timedelta(hours=1),
+        end_date=record_date + timedelta(days=1, hours=1))
+    assert [
+        (entry['opening_quantity'], entry['closing_quantity'])
+        for entry in history[str(item1.id)]['history']] == [(2.0, 4.0)]
+
+    item2 = add_recorded_item(2, 6)
+    with CaptureQueriesContext(connection) as more_records_queries:
+        history = generate_items_history(enterprise_code, item2)
+    assert history[str(item2.id)]['history'][-1]['closing_quantity'] == 12.0
+    assert len(more_records_queries) == len(few_records_queries)
+
+    first_page = generate_items_history(enterprise_code, page=1, page_size=1)
+    second_page = generate_items_history(enterprise_code, page=2, page_size=1)
+    assert len(first_page) == len(second_page) == 1
+    assert set(first_page) | set(second_page) == {str(item1.id), str(item2.id)}
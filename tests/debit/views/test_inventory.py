@@ -1,5 +1,6 @@
 
 import pytest
+from unittest import mock
 from rest_framework.test import APITestCase
 from django.urls import reverse
 
@@ -8,7 +9,7 @@ from elites_retail_portal.enterprises.models import Enterprise
 from elites_retail_portal.items.models import (
     Brand, BrandItemType, Category, Item, ItemModel, ItemType,)
 from elites_retail_portal.debit.models import (
-    Inventory, InventoryItem, InventoryInventoryItem, InventoryRecord,)
+    Inventory, InventoryItem, InventoryInventoryItem, InventoryRecord, ReportJob)
 from tests.utils.login_mixins import authenticate_test_user
 from elites_retail_portal.catalog.models import Catalog
 from elites_retail_portal.enterprise_mgt.models import (
@@ -68,6 +69,46 @@ class TestInventoryItemView(APITests, APITestCase):
 
     url = 'v1:debit:inventoryitem'
 
+    def test_generate_items_history_pages(self):
+        """."""
+        client = authenticate_test_user()
+        url = reverse(self.url + '-list') + 'generate_items_history/'
+        for page in ({'page': 'one'}, {'page': 0}, {'page_size': -1}, {'page_size': 'all'}):
+            resp = client.post(url, page)
+            assert resp.status_code == 400, page
+
+        with mock.patch(
+                'elites_retail_portal.debit.views.inventory.generate_items_history',
+                return_value={}) as generate:
+            resp = client.post(url, {'page': 2, 'page_size': 10000})
+            assert resp.status_code == 201
+            assert generate.call_args.args[-2:] == (2, 200)
+
+            resp = client.post(url, {})
+            assert resp.status_code == 201
+            assert generate.call_args.args[-2:] == (None, 50)
+
+
+    def test_export_stock_report(self):
+        """."""
+        client = authenticate_test_user()
+        url = reverse(self.url + '-list') + 'export_stock_report/'
+        with mock.patch(
+                'elites_retail_portal.debit.views.inventory.generate_stock_report') as generate:
+            resp = client.post(url, {'file_type': 'PDF'})
+        assert resp.status_code == 200
+        assert resp['Content-Type'] == 'application/pdf'
+        assert not generate.called
+        assert ReportJob.objects.get(report_type='STOCK').status == 'SUCCESS'
+
+        # The report rendered for the same data is served without a new rendering
+        with mock.patch(
+                'elites_retail_portal.debit.helpers.reports.render_stock_report') as render:
+            resp = client.post(url, {'file_type': 'PDF'})
+        assert resp.status_code == 200
+        assert not render.called
+        assert ReportJob.objects.filter(report_type='STOCK').count() == 2
+
 
 class TestInventoryInventoryItemView(APITests, APITestCase):
     """."""
@@ -0,0 +1,67 @@
+"""Report jobs views tests file."""
+
+import uuid
+import pytest
+import tempfile
+
+from django.urls import reverse
+from django.test import override_settings
+
+from rest_framework.test import APITestCase
+
+from elites_retail_portal.debit.models import ReportJob
+from tests.utils.login_mixins import authenticate_test_user
+
+pytestmark = pytest.mark.django_db
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class TestReportJobView(APITestCase):
+    """."""
+
+    url = 'v1:debit:reportjob'
+
+    def test_create_and_download_report_job(self):
+        """."""
+        self.client = authenticate_test_user()
+
+        url = reverse(self.url + '-list')
+        resp = self.client.post(
+            url, {'report_type': 'SALES', 'file_type': 'XLSX', 'parameters': {}},
+            format='json')
+        assert resp.status_code == 201
+        assert resp.data['status'] == 'SUCCESS'
+        assert resp.data['cache_key']
+
+        report_job_url = reverse(self.url + '-detail', kwargs={'pk': resp.data['id']})
+        resp = self.client.get(report_job_url)
+        assert resp.status_code == 200
+        assert resp.data['status'] == 'SUCCESS'
+
+        download_url = reverse(self.url + '-download', kwargs={'pk': resp.data['id']})
+        resp = self.client.get(download_url)
+        assert resp.status_code == 200
+        assert resp.streaming
+        assert resp['Content-Type'] == (
+            'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+        assert 'attachment' in resp['Content-Disposition']
+        assert b''.join(resp.streaming_content).startswith(b'PK')
+
+    def test_download_pending_report_job(self):
+        """."""
+        self.client = authenticate_test_user()
+
+        url = reverse(self.url + '-list')
+        resp = self.client.post(
+            url, {'report_type': 'STOCK', 'file_type': 'PDF'}, format='json')
+        assert resp.status_code == 201
+        ReportJob.objects.filter(id=resp.data['id']).update(status='PENDING', artifact=None)
+
+        download_url = reverse(self.url + '-download', kwargs={'pk': resp.data['id']})
+        resp = self.client.get(download_url)
+        assert resp.status_code == 409
+        assert resp.data['status'] == 'PENDING'
+
+        download_url = reverse(self.url + '-download', kwargs={'pk': uuid.uuid4()})
+        resp = self.client.get(download_url)
+        assert resp.status_code == 404
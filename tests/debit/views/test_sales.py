@@ -3,9 +3,11 @@
 import uuid
 import pytest
 import datetime
+from unittest import mock
 
 from django.utils import timezone
 from django.urls import reverse
+from django.test import override_settings
 from django.contrib.auth import get_user_model
 
 from rest_framework.test import APITestCase
@@ -22,7 +24,7 @@ from elites_retail_portal.items.models import (
     Brand, BrandItemType, Category, Item, ItemModel, ItemType,
     ItemUnits, UnitsItemType, Units)
 from elites_retail_portal.debit.models import (
-    Inventory, InventoryItem, InventoryRecord, Sale, SaleItem)
+    Inventory, InventoryItem, InventoryRecord, ReportJob, Sale, SaleItem)
 from elites_retail_portal.catalog.models import CatalogItem
 from elites_retail_portal.customers.models import Customer
 from tests.utils.api import APITests
@@ -141,3 +143,25 @@ class TestSaleView(APITests, APITestCase):
         url = reverse(self.url + '-export-report')
         resp = self.client.post(url, {'file_type': "PDF"})
         assert resp.status_code == 200
+        assert resp['Content-Type'] == 'application/pdf'
+        assert b''.join(resp.streaming_content).startswith(b'%PDF')
+        report_job = ReportJob.objects.get(report_type='SALES')
+        assert report_job.status == 'SUCCESS'
+
+        # A report rendered in the background is returned as a pending report job
+        with override_settings(REPORT_JOBS_ASYNC_RENDERING=True), mock.patch(
+                'elites_retail_portal.debit.tasks.render_report_job.delay') as render:
+            with self.captureOnCommitCallbacks(execute=True):
+                resp = self.client.post(url, {'file_type': "PDF", 'start_date': '2020-01-01'})
+        assert resp.status_code == 202
+        assert resp.data['status'] == 'PENDING'
+        assert resp.data['parameters'] == {'start_date': '2020-01-01'}
+        render.assert_called_once_with(str(resp.data['id']))
+
+        resp = self.client.post(url, {'file_type': "XLSX"})
+        assert resp.status_code == 200
+        assert resp.streaming
+        assert resp['Content-Type'] == (
+            'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+        assert 'attachment' in resp['Content-Disposition']
+        assert b''.join(resp.streaming_content).startswith(b'PK')
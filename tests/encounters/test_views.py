@@ -241,3 +241,19 @@ class TestEncounterView(APITests, APITestCase):
         assert resp.status_code == status_code == 200
 
         return instance, resp
+
+    def test_processing_status(self, status_code=200):
+        """."""
+        self.client = authenticate_test_user()
+        for model in self.get_model()._meta.related_objects:
+            model.related_model.objects.all().delete()
+        self.get_model().objects.all().delete()
+        instance = self.make()
+        url = reverse(
+            self.url + '-list') + str(instance.id) + '/processing_status/'
+        resp = self.client.get(url)
+        assert resp.status_code == status_code == 200
+        assert resp.data['processing_status'] == 'SUCCESS'
+        assert resp.data['processing_stage'] == 'SETTLEMENT'
+
+        return instance, resp
@@ -0,0 +1,177 @@
+"""."""
+
+import pytest
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.core.exceptions import ValidationError
+
+from elites_retail_portal.common.middleware import request_cache_scope
+from elites_retail_portal.enterprises.models import Enterprise
+from elites_retail_portal.debit.models import Inventory
+from elites_retail_portal.catalog.models import Catalog
+from elites_retail_portal.warehouses.models import Warehouse
+from elites_retail_portal.enterprise_mgt.helpers import get_valid_enterprise_setup_rules
+from elites_retail_portal.enterprise_mgt.models import (
+    EnterpriseSetupRule, EnterpriseSetupRuleWarehouse,
+    EnterpriseSetupRuleCatalog, EnterpriseSetupRuleInventory)
+
+from model_bakery import baker
+
+
+def make_enterprise_setup_rule(enterprise_code):
+    """."""
+    inventory = baker.make(
+        Inventory, inventory_name='Elites Age Supermarket Available Inventory',
+        is_default=True, is_master=True,
+        is_active=True, inventory_type='AVAILABLE', enterprise=enterprise_code)
+    catalog = baker.make(
+        Catalog, catalog_name='Elites Age Supermarket Standard Catalog',
+        is_default=True,
+        description='Standard Catalog', is_standard=True, enterprise=enterprise_code)
+    warehouse = baker.make(
+        Warehouse, warehouse_name='Elites Private Warehouse', is_default=True,
+        is_receiving=True, enterprise=enterprise_code)
+    rule = baker.make(
+        EnterpriseSetupRule, name='Elites Age', is_active=True, enterprise=enterprise_code)
+    baker.make(
+        EnterpriseSetupRuleInventory, rule=rule, inventory=inventory,
+        enterprise=enterprise_code)
+    baker.make(
+        EnterpriseSetupRuleWarehouse, rule=rule, warehouse=warehouse,
+        enterprise=enterprise_code)
+    baker.make(
+        EnterpriseSetupRuleCatalog, rule=rule, catalog=catalog,
+        enterprise=enterprise_code)
+
+    return rule, inventory, catalog, warehouse
+
+
+class TestGetValidEnterpriseSetupRules(TestCase):
+    """."""
+
+    def setUp(self) -> None:
+        """."""
+        self.enterprise = baker.make(
+            Enterprise, name='Enterprise One', enterprise_code='EAL-E/EO-MB/2301-01',
+            enterprise_type='FRANCHISE', business_type='SHOP')
+        self.rule, self.inventory, self.catalog, self.warehouse = make_enterprise_setup_rule(
+            self.enterprise.enterprise_code)
+
+        return super().setUp()
+
+    def test_memoize_rule_for_request(self):
+        """."""
+        enterprise_code = self.enterprise.enterprise_code
+        with request_cache_scope():
+            rule = get_valid_enterprise_setup_rules(enterprise_code)
+            assert rule == self.rule
+            assert rule.available_inventory == self.inventory
+
+            with CaptureQueriesContext(connection) as context:
+                rule = get_valid_enterprise_setup_rules(enterprise_code)
+                assert rule.available_inventory == self.inventory
+            assert len(context.captured_queries) == 0
+
+            self.rule.is_active = False
+            self.rule.save()
+            assert get_valid_enterprise_setup_rules(enterprise_code) is None
+
+    def test_keep_setup_rule_errors(self):
+        """."""
+        rule = get_valid_enterprise_setup_rules(self.enterprise.enterprise_code)
+        rule.preload()
+        with CaptureQueriesContext(connection) as context:
+            assert rule.default_warehouse == self.warehouse
+            for _ in range(2):
+                with pytest.raises(ValidationError) as ve:
+                    rule.allocated_inventory
+                assert 'allocated_inventory' in ve.value.message_dict
+        assert len(context.captured_queries) == 0
+
+
+class TestSharedEnterpriseSetupRules(TransactionTestCase):
+    """."""
+
+    def tearDown(self) -> None:
+        """."""
+        cache.clear()
+        return super().tearDown()
+
+    def test_share_rule_across_requests(self):
+        """."""
+        enterprise = baker.make(
+            Enterprise, name='Enterprise One', enterprise_code='EAL-E/EO-MB/2301-01',
+            enterprise_type='FRANCHISE', business_type='SHOP')
+        enterprise_code = enterprise.enterprise_code
+        rule, inventory, catalog, warehouse = make_enterprise_setup_rule(enterprise_code)
+
+        with request_cache_scope():
+            get_valid_enterprise_setup_rules(enterprise_code)
+
+        with request_cache_scope(), CaptureQueriesContext(connection) as context:
+            cached_rule = get_valid_enterprise_setup_rules(enterprise_code)
+            assert cached_rule == rule
+            assert cached_rule.available_inventory == inventory
+            assert cached_rule.standard_catalog == catalog
+            assert cached_rule.default_catalog == catalog
+            assert cached_rule.default_warehouse == warehouse
+            with pytest.raises(ValidationError):
+                cached_rule.allocated_inventory
+        assert len(context.captured_queries) == 0
+
+        allocated_inventory = baker.make(
+            Inventory, inventory_name='Elites Age Supermarket Allocated Inventory',
+            is_active=True, inventory_type='ALLOCATED', enterprise=enterprise_code)
+        baker.make(
+            EnterpriseSetupRuleInventory, rule=rule, inventory=allocated_inventory,
+            enterprise=enterprise_code)
+
+        with request_cache_scope():
+            cached_rule = get_valid_enterprise_setup_rules(enterprise_code)
+            assert cached_rule.allocated_inventory == allocated_inventory
+
+        rule.delete()
+        assert get_valid_enterprise_setup_rules(enterprise_code) is None
+
+    def test_drop_shared_rule_on_setup_record_change(self):
+        """."""
+        enterprise = baker.make(
+            Enterprise, name='Enterprise One', enterprise_code='EAL-E/EO-MB/2301-01',
+            enterprise_type='FRANCHISE', business_type='SHOP')
+        enterprise_code = enterprise.enterprise_code
+        _, inventory, catalog, warehouse = make_enterprise_setup_rule(enterprise_code)
+        get_valid_enterprise_setup_rules(enterprise_code)
+
+        inventory.is_master = False
+        inventory.save()
+        cached_rule = get_valid_enterprise_setup_rules(enterprise_code)
+        assert cached_rule.available_inventory.is_master is False
+
+        catalog.catalog_name = 'Renamed Catalog'
+        catalog.save()
+        assert get_valid_enterprise_setup_rules(
+            enterprise_code).standard_catalog.catalog_name == 'Renamed Catalog'
+
+        warehouse.warehouse_name = 'Renamed Warehouse'
+        warehouse.save()
+        assert get_valid_enterprise_setup_rules(
+            enterprise_code).default_warehouse.warehouse_name == 'Renamed Warehouse'
+
+    def test_share_rule_read_in_transaction_on_commit(self):
+        """."""
+        enterprise = baker.make(
+            Enterprise, name='Enterprise One', enterprise_code='EAL-E/EO-MB/2301-01',
+            enterprise_type='FRANCHISE', business_type='SHOP')
+        enterprise_code = enterprise.enterprise_code
+        rule, *_ = make_enterprise_setup_rule(enterprise_code)
+
+        with transaction.atomic():
+            assert get_valid_enterprise_setup_rules(enterprise_code) == rule
+
+        with CaptureQueriesContext(connection) as context:
+            assert get_valid_enterprise_setup_rules(enterprise_code) == rule
+        assert len(context.captured_queries) == 0
+
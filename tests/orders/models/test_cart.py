@@ -3,7 +3,9 @@
 import uuid
 import pytest
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.core.exceptions import ValidationError
 from django.contrib.auth import get_user_model
 
@@ -232,6 +234,107 @@ class TestCart(TestCase):
         order.refresh_from_db()
         assert not order.is_site
 
+    def test_checkout_cart_in_bulk(self):
+        """."""
+        franchise = baker.make(Enterprise, name='Elites Age Supermarket')
+        enterprise_code = franchise.enterprise_code
+        inventory = baker.make(
+            Inventory, inventory_name='Elites Age Supermarket Available Inventory',
+            is_default=True, is_master=True,
+            is_active=True, inventory_type='AVAILABLE', enterprise=enterprise_code)
+        catalog = baker.make(
+            Catalog, catalog_name='Elites Age Supermarket Standard Catalog',
+            is_default=True,
+            description='Standard Catalog', is_standard=True, enterprise=enterprise_code)
+        rule = baker.make(
+            EnterpriseSetupRule, name='Elites Age', is_active=True, enterprise=enterprise_code)
+        baker.make(
+            EnterpriseSetupRuleInventory, rule=rule, inventory=inventory,
+            enterprise=enterprise_code)
+        baker.make(
+            EnterpriseSetupRuleCatalog, rule=rule, catalog=catalog,
+            enterprise=enterprise_code)
+        cat = baker.make(
+            Category, category_name='Cat One',
+            enterprise=enterprise_code)
+        item_type = baker.make(
+            ItemType, category=cat, type_name='Cooker',
+            enterprise=enterprise_code)
+        brand = baker.make(
+            Brand, brand_name='Samsung', enterprise=enterprise_code)
+        baker.make(
+            BrandItemType, brand=brand, item_type=item_type,
+            enterprise=enterprise_code)
+        s_units = baker.make(Units, units_name='packet', enterprise=enterprise_code)
+        baker.make(UnitsItemType, item_type=item_type, units=s_units, enterprise=enterprise_code)
+        p_units = baker.make(Units, units_name='Dozen', enterprise=enterprise_code)
+        baker.make(UnitsItemType, item_type=item_type, units=p_units, enterprise=enterprise_code)
+        catalog_items = []
+        for count, unit_price in enumerate([350, 1000, 2750, 1250]):
+            item_model = baker.make(
+                ItemModel, brand=brand, item_type=item_type, model_name=f'GE731K-{count}/SUT',
+                enterprise=enterprise_code)
+            item = baker.make(
+                Item, item_model=item_model, barcode=f'83838388567{count}', make_year=2020,
+                enterprise=enterprise_code)
+            baker.make(
+                ItemUnits, item=item, sales_units=s_units, purchases_units=p_units,
+                quantity_of_sale_units_per_purchase_unit=12, enterprise=enterprise_code)
+            inventory_item = baker.make(InventoryItem, item=item, enterprise=enterprise_code)
+            baker.make(
+                InventoryInventoryItem, inventory=inventory, inventory_item=inventory_item)
+            baker.make(
+                InventoryRecord, inventory=inventory, inventory_item=inventory_item,
+                record_type='ADD', quantity_recorded=20, unit_price=unit_price,
+                enterprise=enterprise_code)
+            catalog_item = baker.make(
+                CatalogItem, inventory_item=inventory_item, enterprise=enterprise_code)
+            baker.make(
+                CatalogCatalogItem, catalog=catalog, catalog_item=catalog_item,
+                enterprise=enterprise_code)
+            catalog_items.append(catalog_item)
+
+        cart = baker.make(Cart, cart_code='EAS-C-10001', enterprise=enterprise_code)
+        baker.make(
+            CartItem, cart=cart, catalog_item=catalog_items[0], quantity_added=3,
+            selling_price=350, enterprise=enterprise_code)
+        baker.make(
+            CartItem, cart=cart, catalog_item=catalog_items[1], quantity_added=1,
+            selling_price=1000, is_installment=True, enterprise=enterprise_code)
+        baker.make(
+            CartItem, cart=cart, catalog_item=catalog_items[2], quantity_added=2,
+            selling_price=2750, is_installment=True, enterprise=enterprise_code)
+        with CaptureQueriesContext(connection) as first_checkout:
+            cart.checkout_cart()
+
+        cart.refresh_from_db()
+        assert cart.is_checked_out
+        assert not CartItem.objects.exclude(status='SUCCESS').exists()
+        instant_order_item = InstantOrderItem.objects.get(order__id=cart.order_guid)
+        assert instant_order_item.quantity == 3
+        assert instant_order_item.quantity_awaiting_clearance == 3
+        assert instant_order_item.total_amount == 1050
+        installment_order_items = InstallmentsOrderItem.objects.filter(
+            order__id=cart.order_guid).order_by('total_amount')
+        assert [item.total_amount for item in installment_order_items] == [1000, 5500]
+        assert [item.amount_due for item in installment_order_items] == [1000, 5500]
+        assert [item.share_value for item in installment_order_items] == [1000 / 5500, 1]
+        assert [item.quantity_without_deposit for item in installment_order_items] == [1, 2]
+        assert not installment_order_items.filter(is_cleared=True).exists()
+
+        baker.make(
+            CartItem, cart=cart, catalog_item=catalog_items[3], quantity_added=2,
+            selling_price=1250, enterprise=enterprise_code)
+        with CaptureQueriesContext(connection) as second_checkout:
+            cart.checkout_cart()
+
+        assert len(second_checkout) <= len(first_checkout)
+        assert Order.objects.count() == 1
+        assert InstantOrderItem.objects.count() == 2
+        assert InstallmentsOrderItem.objects.count() == 2
+        assert InstantOrderItem.objects.get(
+            cart_item__catalog_item=catalog_items[3]).total_amount == 2500
+
     def test_fail_checkout_specific_items_empyt_cart(self):
         """."""
         franchise = baker.make(Enterprise, name='Elites Age Supermarket')
@@ -952,6 +1055,9 @@ class TestCartItem(TestCase):
             ],
             'grand_total': 2170.0
         }
+        assert cart.grand_total == 2170
+        with self.assertNumQueries(1):
+            assert Cart.objects.with_totals().get(id=cart.id).grand_total == 2170
 
     def test_complete_order_for_single_cart_item(self):
         """."""
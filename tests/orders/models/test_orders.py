@@ -2,6 +2,10 @@
 
 import pytest
 
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.test import TestCase
 from django.utils import timezone
 from django.forms import ValidationError
@@ -308,6 +312,144 @@ class TestInsantOrderItem(TestCase):
         assert InstantOrderItem.objects.count() == 1
 
 
+class TestOrderSummary(TestCase):
+    """."""
+
+    def setUp(self):
+        """."""
+        franchise = baker.make(Enterprise, name='Elites Age Supermarket')
+        self.enterprise_code = franchise.enterprise_code
+        enterprise_code = self.enterprise_code
+        cat = baker.make(Category, category_name='Cat One', enterprise=enterprise_code)
+        item_type = baker.make(
+            ItemType, category=cat, type_name='Cooker', enterprise=enterprise_code)
+        brand = baker.make(Brand, brand_name='Samsung', enterprise=enterprise_code)
+        baker.make(
+            BrandItemType, brand=brand, item_type=item_type, enterprise=enterprise_code)
+        s_units = baker.make(Units, units_name='packet', enterprise=enterprise_code)
+        baker.make(UnitsItemType, item_type=item_type, units=s_units, enterprise=enterprise_code)
+        s_units.item_types.set([item_type])
+        s_units.save()
+        inventory = baker.make(
+            Inventory, inventory_name='Elites Age Supermarket Available Inventory',
+            is_default=True, is_master=True,
+            is_active=True, inventory_type='AVAILABLE', enterprise=enterprise_code)
+        catalog = baker.make(
+            Catalog, catalog_name='Elites Age Supermarket Standard Catalog',
+            is_default=True,
+            description='Standard Catalog', is_standard=True, enterprise=enterprise_code)
+        warehouse = baker.make(
+            Warehouse, warehouse_name='Elites Private Warehouse', is_default=True,
+            is_receiving=True, enterprise=enterprise_code)
+        rule = baker.make(
+            EnterpriseSetupRule, name='Elites Age', is_active=True, enterprise=enterprise_code)
+        baker.make(
+            EnterpriseSetupRuleInventory, rule=rule, inventory=inventory,
+            enterprise=enterprise_code)
+        baker.make(
+            EnterpriseSetupRuleWarehouse, rule=rule, warehouse=warehouse,
+            enterprise=enterprise_code)
+        baker.make(
+            EnterpriseSetupRuleCatalog, rule=rule, catalog=catalog,
+            enterprise=enterprise_code)
+        customer = baker.make(
+            Customer, customer_number=9876, first_name='John',
+            last_name='Wick', other_names='Baba Yaga',
+            phone_no='+254712345678', email='johnwick@parabellum.com')
+        cart = baker.make(
+            Cart, cart_code='EAS-C-10001', customer=customer, enterprise=enterprise_code)
+        self.cart_items = []
+        for index, model_name in enumerate(['GE731K-B SUT', 'GE731L-C SUT']):
+            item_model = baker.make(
+                ItemModel, brand=brand, item_type=item_type, model_name=model_name,
+                enterprise=enterprise_code)
+            item = baker.make(
+                Item, item_model=item_model, barcode='8383838838{}'.format(index),
+                make_year=2020, enterprise=enterprise_code)
+            baker.make(
+                ItemUnits, item=item, sales_units=s_units, purchases_units=s_units,
+                quantity_of_sale_units_per_purchase_unit=1, enterprise=enterprise_code)
+            inventory_item = baker.make(InventoryItem, item=item, enterprise=enterprise_code)
+            baker.make(
+                InventoryInventoryItem, inventory=inventory, inventory_item=inventory_item,
+                enterprise=enterprise_code)
+            baker.make(
+                InventoryRecord, inventory=inventory, inventory_item=inventory_item,
+                record_type='ADD', quantity_recorded=20, unit_price=350,
+                enterprise=enterprise_code)
+            catalog_item = baker.make(
+                CatalogItem, inventory_item=inventory_item, selling_price=350,
+                enterprise=enterprise_code)
+            self.cart_items.append(baker.make(
+                CartItem, cart=cart, catalog_item=catalog_item, quantity_added=2,
+                enterprise=enterprise_code))
+
+        self.order = baker.make(
+            Order, customer=customer, order_number='#1001', enterprise=enterprise_code)
+
+    def test_maintain_order_summary(self):
+        """."""
+        assert self.order.order_name == '#1001 '
+        assert self.order.item_count == 0
+        assert self.order.order_total == 0
+
+        instant_order_item = baker.make(
+            InstantOrderItem, order=self.order, cart_item=self.cart_items[0],
+            amount_paid=300, enterprise=self.enterprise_code)
+        baker.make(
+            InstallmentsOrderItem, order=self.order, cart_item=self.cart_items[1],
+            deposit_amount=200, enterprise=self.enterprise_code)
+
+        self.order.refresh_from_db()
+        assert self.order.order_name == '#1001 SAMSUNG GE731K-B SUT COOKER, SAMSUNG GE731L-C SUT COOKER'
+        assert self.order.heading == self.order.order_name
+        assert self.order.item_count == 2
+        assert self.order.instant_order_items_total == 700
+        assert self.order.installment_order_items_total == 700
+        assert self.order.order_total == 1400
+        assert self.order.amount_paid == 500
+        assert self.order.amount_due == 900
+        assert self.order.summary['order_total'] == 1400
+        assert self.order.summary['paid_total'] == 500
+
+        # Saving a stale order leaves its summary as it is
+        order = Order.objects.get(id=self.order.id)
+        instant_order_item.delete()
+        order.is_active = False
+        order.save()
+
+        self.order.refresh_from_db()
+        assert not self.order.is_active
+        assert self.order.order_name == '#1001 SAMSUNG GE731L-C SUT COOKER'
+        assert self.order.item_count == 1
+        assert self.order.instant_order_items_total == 0
+        assert self.order.order_total == 700
+        assert self.order.amount_paid == 200
+        assert self.order.amount_due == 500
+
+    def test_rebuild_order_summaries(self):
+        """."""
+        baker.make(
+            InstantOrderItem, order=self.order, cart_item=self.cart_items[0],
+            amount_paid=300, enterprise=self.enterprise_code)
+        Order.objects.filter(id=self.order.id).update(
+            order_name='#1001 ', item_count=0, order_total=0)
+
+        out = StringIO()
+        with pytest.raises(CommandError):
+            call_command('rebuild_order_summaries', '--check', stdout=out)
+        assert 'Order #1001 order_name' in out.getvalue()
+        self.order.refresh_from_db()
+        assert self.order.order_total == 0
+
+        call_command('rebuild_order_summaries', stdout=StringIO())
+        self.order.refresh_from_db()
+        assert self.order.order_name == '#1001 SAMSUNG GE731K-B SUT COOKER'
+        assert self.order.item_count == 1
+        assert self.order.order_total == 700
+        call_command('rebuild_order_summaries', '--check', stdout=StringIO())
+
+
 class TestInstallmentOrderItem(TestCase):
     """."""
 
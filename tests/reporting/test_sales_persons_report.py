@@ -0,0 +1,182 @@
+"""Sales persons report test file."""
+
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from elites_retail_portal.catalog.models import Catalog, CatalogItem
+from elites_retail_portal.debit.models import (
+    Inventory, InventoryInventoryItem, InventoryItem, InventoryRecord, Sale, SaleItem)
+from elites_retail_portal.encounters.models import Encounter
+from elites_retail_portal.enterprise_mgt.models import (
+    EnterpriseSetupRule, EnterpriseSetupRuleInventory,
+    EnterpriseSetupRuleCatalog, EnterpriseSetupRuleWarehouse)
+from elites_retail_portal.enterprises.models import Enterprise, Staff
+from elites_retail_portal.items.models import (
+    Brand, BrandItemType, Category, Item, ItemModel, ItemType,
+    ItemUnits, UnitsItemType, Units)
+from elites_retail_portal.orders.models import Order
+from elites_retail_portal.reporting.sales_persons_report import get_sales_person_sales_data
+from elites_retail_portal.warehouses.models import Warehouse
+
+from model_bakery import baker
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def sales_setup():
+    """."""
+    enterprise = baker.make(Enterprise, name='Elites Age Supermarket')
+    enterprise_code = enterprise.enterprise_code
+    inventory = baker.make(
+        Inventory, inventory_name='Elites Age Supermarket Available Inventory',
+        is_default=True, is_master=True,
+        is_active=True, inventory_type='AVAILABLE', enterprise=enterprise_code)
+    catalog = baker.make(
+        Catalog, catalog_name='Elites Age Supermarket Standard Catalog',
+        is_default=True,
+        description='Standard Catalog', is_standard=True, enterprise=enterprise_code)
+    warehouse = baker.make(
+        Warehouse, warehouse_name='Elites Private Warehouse', is_default=True,
+        is_receiving=True, enterprise=enterprise_code)
+    rule = baker.make(
+        EnterpriseSetupRule, name='Elites Age', is_active=True, enterprise=enterprise_code)
+    baker.make(
+        EnterpriseSetupRuleInventory, rule=rule, inventory=inventory,
+        enterprise=enterprise_code)
+    baker.make(
+        EnterpriseSetupRuleWarehouse, rule=rule, warehouse=warehouse,
+        enterprise=enterprise_code)
+    baker.make(
+        EnterpriseSetupRuleCatalog, rule=rule, catalog=catalog,
+        enterprise=enterprise_code)
+
+    brand = baker.make(Brand, brand_name='Samsung', enterprise=enterprise_code)
+    units = baker.make(Units, units_name='packet', enterprise=enterprise_code)
+    catalog_items = []
+    for category_name, type_name, model_name, barcode in [
+            ('Cookers', 'Cooker', 'GE731K-B SUT', '83838388383'),
+            ('Fridges', 'Fridge', 'RT38K5932S8', '83838388384')]:
+        category = baker.make(
+            Category, category_name=category_name, enterprise=enterprise_code)
+        item_type = baker.make(
+            ItemType, category=category, type_name=type_name, enterprise=enterprise_code)
+        baker.make(
+            BrandItemType, brand=brand, item_type=item_type, enterprise=enterprise_code)
+        item_model = baker.make(
+            ItemModel, brand=brand, item_type=item_type, model_name=model_name,
+            enterprise=enterprise_code)
+        item = baker.make(
+            Item, item_model=item_model, barcode=barcode, make_year=2020,
+            enterprise=enterprise_code)
+        baker.make(UnitsItemType, item_type=item_type, units=units, enterprise=enterprise_code)
+        baker.make(
+            ItemUnits, item=item, sales_units=units, purchases_units=units,
+            quantity_of_sale_units_per_purchase_unit=1, enterprise=enterprise_code)
+        inventory_item = baker.make(InventoryItem, item=item, enterprise=enterprise_code)
+        baker.make(
+            InventoryInventoryItem, inventory=inventory, inventory_item=inventory_item)
+        baker.make(
+            InventoryRecord, inventory=inventory, inventory_item=inventory_item,
+            record_type='ADD', quantity_recorded=50, unit_price=300,
+            enterprise=enterprise_code)
+        catalog_items.append(baker.make(
+            CatalogItem, inventory_item=inventory_item, marked_price=300,
+            threshold_price=200, enterprise=enterprise_code))
+
+    return {'enterprise_code': enterprise_code, 'catalog_items': catalog_items}
+
+
+def make_staff_sales(sales_setup, staff_number, sale_items):
+    """Make a staff member and a sale with the sale items in an encounter they served."""
+    enterprise_code = sales_setup['enterprise_code']
+    staff_member = baker.make(
+        Staff, first_name='Staff', last_name=str(staff_number),
+        staff_number=str(staff_number), enterprise=enterprise_code)
+    order = baker.make(
+        Order, order_number='#{}'.format(staff_number), enterprise=enterprise_code)
+    sale = Sale.objects.get(order=order)
+    Encounter.objects.bulk_create([baker.prepare(
+        Encounter, billing=[], sales_person=staff_member, order_guid=order.id,
+        enterprise=enterprise_code)])
+    for catalog_item_index, quantity_sold, selling_price in sale_items:
+        baker.make(
+            SaleItem, sale=sale, quantity_sold=quantity_sold, selling_price=selling_price,
+            amount_paid=quantity_sold * selling_price,
+            catalog_item=sales_setup['catalog_items'][catalog_item_index],
+            enterprise=enterprise_code)
+
+    return staff_member
+
+
+def get_report(enterprise_code, by_category=False):
+    """."""
+    with CaptureQueriesContext(connection) as context:
+        report = get_sales_person_sales_data(enterprise_code, by_category=by_category)
+
+    return {
+        data['sales_person']['staff_number']: data['report_data'] for data in report
+    }, len(context.captured_queries)
+
+
+def test_get_sales_person_sales_data(sales_setup):
+    """."""
+    enterprise_code = sales_setup['enterprise_code']
+    make_staff_sales(sales_setup, 1, [(0, 2, 500), (1, 1, 3000)])
+    make_staff_sales(sales_setup, 2, [(0, 1, 450)])
+    make_staff_sales(sales_setup, 3, [])
+
+    report, query_count = get_report(enterprise_code)
+    assert len(report) == 3
+    assert len(report['1']['sales_data']) == 2
+    assert report['1']['totals_data'] == {
+        'amount_paid': 4000, 'total_price': 4000, 'total_quantity': 3, 'sales_count': 1}
+    assert report['2']['totals_data'] == {
+        'amount_paid': 450, 'total_price': 450, 'total_quantity': 1, 'sales_count': 1}
+    assert report['3'] == {
+        'sales_data': [],
+        'totals_data': {
+            'amount_paid': 0, 'total_price': 0, 'total_quantity': 0, 'sales_count': 0},
+        'period_totals_data': {
+            period: {
+                'amount_paid': 0, 'total_price': 0, 'total_quantity': 0, 'sales_count': 0}
+            for period in ['day', 'week', 'month']},
+    }
+
+    # The totals match the totals of the sale item rows
+    for report_data in report.values():
+        for total, row_field in [
+                ('amount_paid', 'amount_paid'), ('total_price', 'total_price'),
+                ('total_quantity', 'quantity_sold')]:
+            assert report_data['totals_data'][total] == sum(
+                row[row_field] for row in report_data['sales_data'])
+
+        # The sales were made today
+        for period_totals in report_data['period_totals_data'].values():
+            assert period_totals == report_data['totals_data']
+
+    for staff_number in range(4, 7):
+        make_staff_sales(sales_setup, staff_number, [(0, 1, 450), (1, 1, 3000)])
+    report, more_staff_query_count = get_report(enterprise_code)
+    assert len(report) == 6
+    assert report['6']['totals_data']['total_price'] == 3450
+    assert more_staff_query_count == query_count
+
+
+def test_get_sales_person_sales_data_by_category(sales_setup):
+    """."""
+    enterprise_code = sales_setup['enterprise_code']
+    make_staff_sales(sales_setup, 1, [(0, 2, 500), (1, 1, 3000)])
+
+    report, _ = get_report(enterprise_code, by_category=True)
+    category_totals = {
+        category_totals['category']: category_totals['totals_data']
+        for category_totals in report['1']['category_totals_data']}
+    assert category_totals == {
+        'COOKERS': {
+            'amount_paid': 1000, 'total_price': 1000, 'total_quantity': 2, 'sales_count': 1},
+        'FRIDGES': {
+            'amount_paid': 3000, 'total_price': 3000, 'total_quantity': 1, 'sales_count': 1},
+    }
@@ -1 +1,14 @@
-from elites_retail_portal.config.settings import *
\ No newline at end of file
+import tempfile
+
+from elites_retail_portal.config.settings import *
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+REPORT_JOBS_ASYNC_RENDERING = False
+
+# Keep the files uploaded by the tests out of the media files of the project
+MEDIA_ROOT = tempfile.mkdtemp(prefix='elites_retail_portal_media_')
@@ -1,7 +1,14 @@
 """Payment Gateway Tests file."""
 # get_transaction_object sample data to mock
 # callback_handler
-from django.test import TestCase
+import json
+import time
+import importlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from elites_retail_portal.transactions.helpers.payments.gateways import MpesaGateWay
 from elites_retail_portal.transactions.models import (
     Transaction, Payment, PaymentRequest)
@@ -47,6 +54,125 @@ SAMPLE_CALLBACK_DATA = {
 }
 
 
+class MpesaStubHandler(BaseHTTPRequestHandler):
+    """Answer the M-Pesa API requests of the gateway."""
+
+    def log_message(self, *args):
+        """."""
+
+    def send_json(self, status_code, data):
+        """."""
+        body = json.dumps(data).encode()
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        """Issue an access token."""
+        stub = self.server.stub
+        time.sleep(stub['token_delay'])
+        with stub['lock']:
+            stub['token_requests'] += 1
+            token = 'token-{}'.format(stub['token_requests'])
+        self.send_json(200, {'access_token': token, 'expires_in': '3599'})
+
+    def do_POST(self):
+        """Accept an STK push request made with a valid access token."""
+        stub = self.server.stub
+        self.rfile.read(int(self.headers['Content-Length']))
+        authorization = self.headers['Authorization']
+        stub['push_requests'].append(authorization)
+        if authorization in stub['revoked_tokens']:
+            return self.send_json(401, {'errorMessage': 'Invalid Access Token'})
+
+        self.send_json(200, {
+            'CheckoutRequestID': 'ws_CO_1', 'CustomerMessage': 'Success', 'ResponseCode': '0'})
+
+
+class TestMpesaGatewayAPI(TestCase):
+    """."""
+
+    def setUp(self):
+        """."""
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), MpesaStubHandler)
+        self.server.stub = {
+            'lock': threading.Lock(), 'token_delay': 0, 'token_requests': 0,
+            'push_requests': [], 'revoked_tokens': set()}
+        threading.Thread(
+            target=self.server.serve_forever, kwargs={'poll_interval': 0.01},
+            daemon=True).start()
+        self.api_url = 'http://127.0.0.1:{}'.format(self.server.server_address[1])
+        cache.clear()
+
+    def tearDown(self):
+        """."""
+        self.server.shutdown()
+        self.server.server_close()
+        cache.clear()
+
+    def stk_push(self, gateway):
+        """."""
+        return gateway.stk_push_request({
+            'BusinessShortCode': '174379', 'PassKey': 'passkey', 'Amount': 10,
+            'PartyA': 600989, 'PartyB': 174379, 'PhoneNumber': '0712345678'})
+
+    def test_create_gateway_lazily(self):
+        """."""
+        with override_settings(MPESA_BASE_URL=self.api_url):
+            from elites_retail_portal.adapters.mobile_money.mpesa import views
+            importlib.reload(views)
+            MpesaGateWay()
+        assert self.server.stub['token_requests'] == 0
+
+    def test_share_access_token(self):
+        """."""
+        with override_settings(MPESA_BASE_URL=self.api_url):
+            status_code, response_data = self.stk_push(MpesaGateWay())
+            assert status_code == 200
+            assert response_data['CheckoutRequestID'] == 'ws_CO_1'
+            self.stk_push(MpesaGateWay())
+
+        assert self.server.stub['token_requests'] == 1
+        assert self.server.stub['push_requests'] == ['Bearer token-1', 'Bearer token-1']
+        assert MpesaGateWay(api_url=self.api_url).session is MpesaGateWay().session
+
+    def test_refresh_access_token_once(self):
+        """."""
+        self.server.stub['token_delay'] = 0.2
+        gateways = [MpesaGateWay(api_url=self.api_url) for _ in range(5)]
+        tokens = []
+        threads = [
+            threading.Thread(target=lambda gateway=gateway: tokens.append(
+                gateway.get_access_token())) for gateway in gateways]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert tokens == ['token-1'] * 5
+        assert self.server.stub['token_requests'] == 1
+
+    @override_settings(MPESA_ACCESS_TOKEN_EXPIRY_MARGIN=3599)
+    def test_refresh_expiring_access_token(self):
+        """."""
+        gateway = MpesaGateWay(api_url=self.api_url)
+        assert gateway.get_access_token() == 'token-1'
+        time.sleep(1.1)
+        assert gateway.get_access_token() == 'token-2'
+
+    def test_retry_revoked_access_token(self):
+        """."""
+        gateway = MpesaGateWay(api_url=self.api_url)
+        gateway.get_access_token()
+        self.server.stub['revoked_tokens'].add('Bearer token-1')
+
+        status_code, _ = self.stk_push(gateway)
+        assert status_code == 200
+        assert self.server.stub['push_requests'] == ['Bearer token-1', 'Bearer token-2']
+
+
 class TestMpesaGateway(TestCase):
     """."""
 
@@ -1,8 +1,15 @@
 """."""
 
 import pytest
+import datetime
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
 from elites_retail_portal.enterprises.models import Enterprise
+from elites_retail_portal.customers.models import Customer
 from elites_retail_portal.transactions.models import Payment
 from elites_retail_portal.transactions.helpers.payments.reports import generate_payments_report
 
@@ -19,5 +26,41 @@ def test_generate_payments_report():
 
     assert payment
     assert Payment.objects.count() == 1
-    
-    generate_payments_report(enterprise_code)
\ No newline at end of file
+    generate_payments_report(enterprise_code)
+
+
+def test_payments_report_totals():
+    """."""
+    franchise = baker.make(Enterprise, name='Elites Age Supermarket')
+    enterprise_code = franchise.enterprise_code
+    customer = baker.make(
+        Customer, title='Mr', first_name='John', last_name='Wick', enterprise=enterprise_code)
+    today = timezone.localtime().replace(hour=10)
+    yesterday = today - datetime.timedelta(days=1)
+    payments = [
+        ('CASH', '1000', today, customer), ('CASH', '500', today, None),
+        ('M-PESA', '2000', today, customer), ('M-PESA', '250', yesterday, None)]
+    for payment_method, paid_amount, payment_time, payment_customer in payments:
+        baker.make(
+            Payment, payment_method=payment_method, paid_amount=paid_amount,
+            payment_time=payment_time, customer=payment_customer, enterprise=enterprise_code)
+    baker.make(Payment, paid_amount='700', enterprise='EAL-E/EO-MB/2301-99')
+
+    start_date = yesterday.date()
+    with CaptureQueriesContext(connection) as context:
+        data = generate_payments_report(enterprise_code, start_date=start_date)
+    assert len(context.captured_queries) == 4
+
+    assert len(data['payments_data']) == 4
+    assert data['payments_data'][0]['customer'] == 'Mr John Wick'
+    assert data['payments_data'][-1]['payment_method'] == 'M-PESA'
+    assert data['totals_data'] == {'paid_amount': Decimal('3750'), 'payments_count': 4}
+    assert data['payment_method_totals_data'] == [
+        {'payment_method': 'CASH', 'paid_amount': Decimal('1500'), 'payments_count': 2},
+        {'payment_method': 'M-PESA', 'paid_amount': Decimal('2250'), 'payments_count': 2},
+    ]
+    assert data['daily_totals_data'] == [
+        {'payment_date': yesterday.date(), 'paid_amount': Decimal('250'), 'payments_count': 1},
+        {'payment_date': today.date(), 'paid_amount': Decimal('3500'), 'payments_count': 3},
+    ]
+    assert sum(row['paid_amount'] for row in data['payments_data']) == Decimal('3750')
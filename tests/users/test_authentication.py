@@ -0,0 +1,124 @@
+import uuid
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from elites_retail_portal.enterprises.models import Enterprise
+from elites_retail_portal.users.models import Group, GroupPermission, Permission, User
+
+from model_bakery import baker
+
+IDENTITY_TABLES = ('users_user', 'users_group', 'users_permission', 'enterprises_enterprise')
+
+
+class TestCachedJWTAuthentication(TransactionTestCase):
+    """."""
+
+    def setUp(self):
+        """."""
+        self.enterprise = baker.make(
+            Enterprise, name='Enterprise One', enterprise_code='EAL-E/EO-MB/2301-01',
+            enterprise_type='FRANCHISE', business_type='SHOP')
+        self.user = User.objects.create_user(
+            email='testuser@email.com', first_name='Test', last_name='User',
+            guid=uuid.uuid4(), password='Testpass254$',
+            enterprise=self.enterprise.enterprise_code)
+        audit_fields = {
+            'created_by': self.user.id,
+            'updated_by': self.user.id,
+            'enterprise': self.enterprise.enterprise_code,
+        }
+        self.group = Group.objects.create(name='Cashiers', **audit_fields)
+        permission = baker.make(Permission, name='View Section', value='catalog.view_section')
+        self.group_permission = GroupPermission.objects.create(
+            group=self.group, permission=permission, **audit_fields)
+        self.user.group = self.group
+        self.user.save()
+
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION='JWT {}'.format(AccessToken.for_user(self.user)))
+        self.url = reverse('v1:catalog:section-list')
+
+    def tearDown(self) -> None:
+        """."""
+        cache.clear()
+        return super().tearDown()
+
+    def get_identity_queries(self):
+        """."""
+        with CaptureQueriesContext(connection) as context:
+            resp = self.client.get(self.url)
+        assert resp.status_code == 200, resp.content
+
+        return [
+            query['sql'] for query in context.captured_queries
+            if any(table in query['sql'] for table in IDENTITY_TABLES)]
+
+    def test_resolve_identity_from_cache(self):
+        """."""
+        assert self.get_identity_queries()
+        assert self.get_identity_queries() == []
+
+        request = self.client.get(self.url).wsgi_request
+        assert request.user.id == self.user.id
+        assert request.user.enterprise == self.enterprise.enterprise_code
+        assert request.user.permissions == {'catalog.view_section'}
+
+    def test_invalidate_identity(self):
+        """."""
+        self.get_identity_queries()
+
+        self.group_permission.delete()
+        assert self.get_identity_queries()
+        request = self.client.get(self.url).wsgi_request
+        assert request.user.permissions == set()
+
+        self.enterprise.name = 'Enterprise Two'
+        self.enterprise.save()
+        assert self.get_identity_queries()
+
+        self.user.is_active = False
+        self.user.save()
+        resp = self.client.get(self.url)
+        assert resp.status_code == 401
+
+    def test_invalidate_identity_on_group_permissions_change(self):
+        """."""
+        permission = self.group_permission.permission
+        self.get_identity_queries()
+
+        self.group.permissions.remove(permission)
+        assert self.client.get(self.url).wsgi_request.user.permissions == set()
+
+        self.group.permissions.add(permission, through_defaults={
+            'created_by': self.user.id, 'updated_by': self.user.id,
+            'enterprise': self.enterprise.enterprise_code})
+        assert self.client.get(self.url).wsgi_request.user.permissions == {
+            'catalog.view_section'}
+
+        self.group.permissions.clear()
+        assert self.client.get(self.url).wsgi_request.user.permissions == set()
+
+        GroupPermission.objects.create(
+            group=self.group, permission=permission, created_by=self.user.id,
+            updated_by=self.user.id, enterprise=self.enterprise.enterprise_code)
+        self.get_identity_queries()
+        GroupPermission.objects.filter(group=self.group).delete()
+        assert self.client.get(self.url).wsgi_request.user.permissions == set()
+
+    def test_save_cached_user(self):
+        """."""
+        self.get_identity_queries()
+        user = self.client.get(self.url).wsgi_request.user
+        user.first_name = 'Cached'
+        user.save()
+
+        self.user.refresh_from_db()
+        assert self.user.first_name == 'Cached'
+        assert self.user.check_password('Testpass254$')